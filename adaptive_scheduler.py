@@ -0,0 +1,216 @@
+import time
+import subprocess
+import os
+import sys
+import glob
+import logging
+import re
+from datetime import datetime, timedelta
+
+from auto_scheduler import IST, generate_artifacts, commit_and_push_changes
+from result_merge import is_complete, real_winners, load_changes, clear_changes
+from publisher import Publisher
+from storage import pipeline_lock
+from note_files import NOTE_DIR
+from metrics import COMPLETE_AFTER_3PM, write_textfile
+import jsonio
+
+# Draw states for the current day
+NOT_PUBLISHED = "not_published"
+PARTIAL = "partial"
+COMPLETE = "complete"
+
+# Result window (same as main.is_within_optimal_time_window)
+WINDOW_START = (14, 45)
+WINDOW_END = (17, 30)
+
+# Poll intervals in seconds
+PENDING_INTERVAL = 60      # window open, nothing published yet
+PARTIAL_INTERVAL = 30      # tiers are being filled in
+COMPLETE_BACKOFF_START = 300
+COMPLETE_BACKOFF_MAX = 3600
+
+# The fixed clock times used by auto_scheduler.run_scheduler
+FIXED_SCHEDULE = ["15:15", "15:30", "15:45", "16:15", "16:30"]
+
+# main.py fetches the index page plus a detail and a result page per link (5 links);
+# used for the fixed schedule and when a run does not report its own count
+REQUESTS_PER_SCRAPE = 11
+
+
+def classify_draw(data):
+    """Classify a parsed note file as not published, partial or complete (result_merge.is_complete)."""
+    if is_complete(data):
+        return COMPLETE
+    prizes = data.get("prizes") if isinstance(data, dict) else None
+    if isinstance(prizes, dict) and any(real_winners(p) for p in prizes.values()):
+        return PARTIAL
+    return NOT_PUBLISHED
+
+
+def todays_note_files(day):
+    return sorted(glob.glob(os.path.join(NOTE_DIR, f"*-{day.isoformat()}.json")))
+
+
+def get_draw_state(day):
+    """Return the most advanced state among the given day's note files."""
+    best = NOT_PUBLISHED
+    rank = {NOT_PUBLISHED: 0, PARTIAL: 1, COMPLETE: 2}
+    for path in todays_note_files(day):
+        try:
+            data = jsonio.load(path)
+        except Exception as e:
+            logging.warning(f"Could not read {path}: {e}")
+            continue
+        state = classify_draw(data)
+        if rank[state] > rank[best]:
+            best = state
+    return best
+
+
+def window_bounds(now):
+    start = now.replace(hour=WINDOW_START[0], minute=WINDOW_START[1], second=0, microsecond=0)
+    end = now.replace(hour=WINDOW_END[0], minute=WINDOW_END[1], second=0, microsecond=0)
+    return start, end
+
+
+def run_scrape():
+    """Run one scrape of the result site. Returns the number of requests it made."""
+    try:
+        result = subprocess.run([sys.executable, 'main.py'], capture_output=True, text=True, timeout=300)
+    except subprocess.TimeoutExpired:
+        logging.error("Scrape timed out after 5 minutes")
+        return REQUESTS_PER_SCRAPE
+    if result.returncode != 0:
+        logging.error(f"Scrape failed: {result.stderr}")
+    m = re.search(r"^Requests: (\d+)$", result.stdout or "", re.M)
+    return int(m.group(1)) if m else REQUESTS_PER_SCRAPE
+
+
+class DayStats:
+    """Request and detection bookkeeping for one draw day."""
+
+    def __init__(self, day):
+        self.day = day
+        self.polls = 0
+        self.requests = 0
+        self.skipped_polls = 0
+        self.first_seen = None
+        self.complete_at = None
+
+    def fixed_schedule_detection(self):
+        """First fixed clock time at or after the moment results were complete."""
+        if not self.complete_at:
+            return None
+        for slot in FIXED_SCHEDULE:
+            hour, minute = map(int, slot.split(":"))
+            slot_time = self.complete_at.replace(hour=hour, minute=minute, second=0, microsecond=0)
+            if slot_time >= self.complete_at:
+                return slot_time
+        return None
+
+    def report(self):
+        fixed_requests = len(FIXED_SCHEDULE) * REQUESTS_PER_SCRAPE
+        logging.info(f"Adaptive summary for {self.day}: {self.polls} polls ({self.requests} requests), "
+                     f"fixed schedule: {len(FIXED_SCHEDULE)} runs ({fixed_requests} requests)")
+        per_poll = self.requests / self.polls if self.polls else REQUESTS_PER_SCRAPE
+        logging.info(f"Requests avoided versus constant {PARTIAL_INTERVAL}s polling: "
+                     f"{round(self.skipped_polls * per_poll)} ({self.skipped_polls} polls)")
+        if not self.complete_at:
+            logging.info("Complete results were not detected in today's window")
+            return
+        fixed_at = self.fixed_schedule_detection()
+        detected = self.complete_at.strftime('%H:%M:%S')
+        if fixed_at:
+            lead = (fixed_at - self.complete_at).total_seconds()
+            logging.info(f"Complete results detected at {detected} IST, "
+                         f"{int(lead)}s before the fixed schedule ({fixed_at.strftime('%H:%M')})")
+        else:
+            logging.info(f"Complete results detected at {detected} IST, "
+                         f"after the last fixed run; the fixed schedule would have missed them today")
+
+
+def next_interval(state, backoff):
+    """Return (sleep seconds, next backoff) for the current draw state."""
+    if state == PARTIAL:
+        return PARTIAL_INTERVAL, COMPLETE_BACKOFF_START
+    if state == NOT_PUBLISHED:
+        return PENDING_INTERVAL, COMPLETE_BACKOFF_START
+    return backoff, min(backoff * 2, COMPLETE_BACKOFF_MAX)
+
+
+def poll_once(stats, publisher):
+    """Scrape, classify today's draw and publish if any prize tier changed."""
+    stats.polls += 1
+    stats.requests += run_scrape()
+    state = get_draw_state(stats.day)
+    now = datetime.now(IST)
+    if state != NOT_PUBLISHED and not stats.first_seen:
+        stats.first_seen = now
+        logging.info(f"First results for {stats.day} seen at {now.strftime('%H:%M:%S')} IST")
+    if state == COMPLETE and not stats.complete_at:
+        stats.complete_at = now
+        logging.info(f"Results for {stats.day} complete at {now.strftime('%H:%M:%S')} IST")
+        three_pm = now.replace(hour=15, minute=0, second=0, microsecond=0)
+        COMPLETE_AFTER_3PM.set(round((now - three_pm).total_seconds()), date=stats.day.isoformat())
+
+    with pipeline_lock():
+        changes = load_changes()
+        if changes:
+            logging.info(f"Changed results: {changes}")
+            generate_artifacts()
+            commit_and_push_changes(changes, publisher)
+            clear_changes()
+    if state == COMPLETE and publisher.pending:
+        # Push complete results right away instead of waiting for the batch window
+        publisher.flush()
+    return state
+
+
+def run_day(now):
+    """Poll through one day's result window."""
+    stats = DayStats(now.date())
+    _, end = window_bounds(now)
+    backoff = COMPLETE_BACKOFF_START
+    publisher = Publisher()
+
+    while True:
+        state = poll_once(stats, publisher)
+        delay, backoff = next_interval(state, backoff)
+        now = datetime.now(IST)
+        if now + timedelta(seconds=delay) > end:
+            break
+        if delay > PARTIAL_INTERVAL:
+            stats.skipped_polls += delay // PARTIAL_INTERVAL - 1
+        logging.info(f"Draw state {state}; next poll in {delay}s")
+        time.sleep(delay)
+
+    publisher.flush()
+    stats.report()
+    write_textfile()
+    return stats
+
+
+def run_scheduler():
+    logging.info("Adaptive scheduler started")
+    logging.info(f"Window: {WINDOW_START[0]:02d}:{WINDOW_START[1]:02d} - {WINDOW_END[0]:02d}:{WINDOW_END[1]:02d} IST")
+    while True:
+        now = datetime.now(IST)
+        start, end = window_bounds(now)
+        if start <= now <= end:
+            run_day(now)
+            next_start = start + timedelta(days=1)
+        elif now < start:
+            next_start = start
+        else:
+            next_start = start + timedelta(days=1)
+        wait = max(0, (next_start - datetime.now(IST)).total_seconds())
+        logging.info(f"Outside result window; sleeping {int(wait)}s until the next draw window")
+        time.sleep(wait)
+
+
+if __name__ == "__main__":
+    try:
+        run_scheduler()
+    except KeyboardInterrupt:
+        logging.info("Adaptive scheduler stopped by user")
@@ -0,0 +1,298 @@
+"""In-memory index of note/: the manifest, history and listing entry of every note file.
+
+ArchiveIndex.refresh() stats the note directory and reads only the files whose size
+or mtime changed since the last refresh, so a process that keeps the index (the
+scheduler daemon, process_manual_uploads) rebuilds result_manifest.json, history.json
+and listing/ with work proportional to the changed files rather than the archive.
+
+manifest_entry() and history_entry() build entries exactly like generate-manifest.js
+and generate-history.js, and write() produces the same bytes as the two scripts;
+`python archive_index.py --check` compares them on the current archive. Like
+generate-history.js, the history numbers come from the draw's lookup table
+(draw_lookup) where it matches the note, and from the winner strings otherwise.
+
+The index can be checkpointed to a file (save/load) so a restarted process only
+rereads what changed while it was down.
+"""
+import os
+import re
+import sys
+import time
+from collections import Counter
+from datetime import date
+from urllib.parse import quote
+
+import jsonio
+from draw_lookup import load_lookup, tier_numbers
+from note_files import NOTE_DIR, MANIFEST_FILE, HISTORY_FILE, SKIP_FILES, NOTE_NAME_RE
+from note_listing import listing_entry, sort_entries
+from result_merge import is_complete, is_placeholder, MIN_COMPLETE_TIERS
+from storage import atomic_write, write_if_changed
+
+GITHUB_NOTE_URL = "https://raw.githubusercontent.com/santhkhd/kerala_loto/main/note/"
+STATE_VERSION = 2
+
+LOTTERY_CODE_RE = re.compile(r"\(([A-Z]{2,3})\)")
+FILE_CODE_RE = re.compile(r"^([A-Z]{2,3})-")
+DIGITS_RE = {4: re.compile(r"\b(\d{4})\b", re.ASCII), 6: re.compile(r"\b(\d{6})\b", re.ASCII)}
+
+# Tiers generate-history.js collects into numbers4 / numbers6 for prediction.html
+NUMBERS4_TIERS = ("4th_prize", "5th_prize", "6th_prize", "7th_prize", "8th_prize", "9th_prize")
+NUMBERS6_TIERS = ("1st_prize", "2nd_prize", "3rd_prize", "consolation_prize")
+
+
+def _js_str(value):
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def manifest_entry(filename, data):
+    """The generate-manifest.js entry for a note file, before its future-date filter,
+    or None if the file is left out of the manifest."""
+    m = NOTE_NAME_RE.match(filename)
+    if not m or not isinstance(data, dict) or not data.get("prizes"):
+        return None
+    return {"code": m.group(1), "draw_number": m.group(2), "date": m.group(3), "filename": filename}
+
+
+def _tier_numbers(key, prize, digits, lookup=None):
+    winners = prize.get("winners") if isinstance(prize.get("winners"), list) else []
+    numbers = tier_numbers(lookup, key, winners) if lookup else None
+    if numbers is not None:
+        return [n for n in numbers if isinstance(n, str) and len(n) == digits]
+    found = []
+    for w in winners:
+        m = DIGITS_RE[digits].search(_js_str(w))
+        if m:
+            found.append(m.group(1))
+    return found
+
+
+def history_entry(filename, data, lookup=None):
+    """The generate-history.js entry for a note file, or None if it is left out.
+    lookup is the note's lookup table, if it has one."""
+    if not isinstance(data, dict):
+        return None
+    lottery = ""
+    if isinstance(data.get("lottery_name"), str) and data["lottery_name"]:
+        m = LOTTERY_CODE_RE.search(data["lottery_name"])
+        lottery = m.group(1) if m else ""
+    if not lottery:
+        m = FILE_CODE_RE.match(filename)
+        lottery = m.group(1) if m else ""
+    draw = _js_str(data["draw_number"]).rjust(2, "0") if data.get("draw_number") else ""
+    prizes = []
+    numbers4 = {}
+    numbers6 = {}
+    if isinstance(data.get("prizes"), dict):
+        for key, prize in data["prizes"].items():
+            prize = prize if isinstance(prize, dict) else {}
+            prizes.append({
+                "prize_key": key,
+                "label": prize.get("label") or "",
+                "amount": prize.get("amount") or 0,
+                "winners": prize["winners"] if isinstance(prize.get("winners"), list) else [],
+            })
+            if key in NUMBERS4_TIERS:
+                numbers4.update(dict.fromkeys(_tier_numbers(key, prize, 4, lookup)))
+            elif key in NUMBERS6_TIERS:
+                numbers6.update(dict.fromkeys(_tier_numbers(key, prize, 6, lookup)))
+    entry = {
+        "date": data.get("draw_date") or "",
+        "lottery": lottery,
+        "draw": draw,
+        "filename": filename,
+        "github_url": GITHUB_NOTE_URL + quote(filename, safe="-_.!~*'()"),
+        "prizes": prizes,
+        "numbers4": list(numbers4),
+        "numbers6": list(numbers6),
+        "downloadLink": data.get("downloadLink") or "",
+    }
+    return entry if entry["date"] and prizes else None
+
+
+def _iso_date(text):
+    try:
+        return date.fromisoformat(text)
+    except (TypeError, ValueError):
+        return None
+
+
+def build_manifest(entries, today=None):
+    """result_manifest.json from manifest entries in file name order."""
+    today = today or date.today()
+    valid, invalid = [], []
+    for entry in entries:
+        day = _iso_date(entry["date"])
+        if day is None:
+            invalid.append(entry)
+        elif day <= today:
+            valid.append(entry)
+    valid.sort(key=lambda e: e["date"], reverse=True)
+    manifest = []
+    seen = set()
+    for entry in valid + invalid:
+        key = f"{entry['date']}-{entry['code']}"
+        if key not in seen:
+            seen.add(key)
+            manifest.append(entry)
+    return manifest
+
+
+def _entry_complete(entry):
+    """is_complete() of the note a history entry was built from."""
+    prizes = entry["prizes"]
+    return len(prizes) >= MIN_COMPLETE_TIERS and all(
+        p["winners"] and not any(is_placeholder(_js_str(w)) for w in p["winners"]) for p in prizes)
+
+
+def build_history(entries):
+    """history.json from history entries in file name order.
+
+    history.json keeps one draw per date. Of several on one date it keeps a complete
+    result over a pending one, then the lottery drawn most often on that weekday (the
+    day's own draw over a postponed draw or a bumper), then the first by file name.
+    """
+    # Unparseable dates ("Unknown-Date", "13/07/2025") last, in file name order
+    valid = [(e, _iso_date(e["date"])) for e in entries if _iso_date(e["date"])]
+    weekday_codes = Counter((day.weekday(), e["lottery"]) for e, day in valid)
+    valid.sort(key=lambda v: (v[1], _entry_complete(v[0]), weekday_codes[v[1].weekday(), v[0]["lottery"]]),
+               reverse=True)
+    history = [e for e, _ in valid] + [e for e in entries if not _iso_date(e["date"])]
+    unique = []
+    seen = set()
+    for entry in history:
+        if entry["date"] != "Unknown-Date" and entry["date"] in seen:
+            continue
+        seen.add(entry["date"])
+        unique.append(entry)
+    return unique
+
+
+class ArchiveIndex:
+    """{note file name: record} with each record holding the file's stat, listing,
+    manifest and history entries and whether the result is complete."""
+
+    def __init__(self, note_dir=NOTE_DIR):
+        self.note_dir = note_dir
+        self.records = {}
+
+    def _stat_all(self):
+        stats = {}
+        with os.scandir(self.note_dir) as it:
+            for e in it:
+                if e.name.endswith(".json") and e.is_file():
+                    st = e.stat()
+                    stats[e.name] = (st.st_mtime_ns, st.st_size)
+        return stats
+
+    def refresh(self, names=None):
+        """Reread new and changed note files (all of them, or only names) and drop
+        removed ones. Returns the names whose record changed."""
+        if names is None:
+            stats = self._stat_all()
+            removed = [n for n in self.records if n not in stats]
+        else:
+            stats, removed = {}, []
+            for name in names:
+                try:
+                    st = os.stat(os.path.join(self.note_dir, name))
+                    stats[name] = (st.st_mtime_ns, st.st_size)
+                except FileNotFoundError:
+                    if name in self.records:
+                        removed.append(name)
+        changed = []
+        for name in removed:
+            del self.records[name]
+            changed.append(name)
+        for name, stat in stats.items():
+            record = self.records.get(name)
+            if record is not None and (record["mtime"], record["size"]) == stat:
+                continue
+            with open(os.path.join(self.note_dir, name), "rb") as f:
+                raw = f.read()
+            try:
+                data = jsonio.loads(raw)
+            except ValueError:
+                data = None
+            self.add(name, raw, data, stat)
+            changed.append(name)
+        return changed
+
+    def add(self, name, raw, data, stat=None, lookup=None):
+        """Index note file name from its bytes and decoded data (None if not JSON).
+        The note's lookup table is read unless it is passed in."""
+        if stat is None:
+            st = os.stat(os.path.join(self.note_dir, name))
+            stat = (st.st_mtime_ns, st.st_size)
+        self.records[name] = {
+            "mtime": stat[0],
+            "size": stat[1],
+            "listing": listing_entry(name, raw) if name not in SKIP_FILES else None,
+            "manifest": manifest_entry(name, data),
+            "history": history_entry(name, data, lookup or load_lookup(name)) if isinstance(data, dict) else None,
+            "complete": is_complete(data),
+        }
+
+    def _in_order(self, field):
+        return [r[field] for _, r in sorted(self.records.items()) if r[field] is not None]
+
+    def manifest(self, today=None):
+        return build_manifest(self._in_order("manifest"), today)
+
+    def history(self):
+        return build_history(self._in_order("history"))
+
+    def listing(self):
+        return sort_entries(self._in_order("listing"))
+
+    def complete_draws(self):
+        """{"SS-498", ...}: draws whose note has every tier filled."""
+        return {f"{r['manifest']['code']}-{r['manifest']['draw_number']}"
+                for r in self.records.values() if r["complete"] and r["manifest"]}
+
+    def write(self, manifest_file=MANIFEST_FILE, history_file=HISTORY_FILE, today=None):
+        """Write result_manifest.json and history.json where they changed. Returns the paths written."""
+        written = []
+        if write_if_changed(manifest_file, jsonio.dumps(self.manifest(today))):
+            written.append(manifest_file)
+        if write_if_changed(history_file, jsonio.dumps(self.history())):
+            written.append(history_file)
+        return written
+
+    def save(self, path):
+        atomic_write(path, jsonio.dumps({"version": STATE_VERSION, "note_dir": self.note_dir,
+                                         "records": self.records}, pretty=False))
+
+    @classmethod
+    def load(cls, path, note_dir=NOTE_DIR):
+        """An index restored from a save() checkpoint; empty if there is none or it does not fit."""
+        index = cls(note_dir)
+        try:
+            state = jsonio.load(path)
+        except (OSError, ValueError):
+            return index
+        if isinstance(state, dict) and state.get("version") == STATE_VERSION and state.get("note_dir") == note_dir:
+            index.records = state["records"]
+        return index
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    index = ArchiveIndex()
+    index.refresh()
+    elapsed = time.perf_counter() - start
+    print(f"Indexed {len(index.records)} note files in {elapsed * 1000:.1f} ms")
+    if "--check" in sys.argv:
+        # Compare with the files generate-manifest.js / generate-history.js last wrote
+        same = True
+        for path, data in ((MANIFEST_FILE, index.manifest()), (HISTORY_FILE, index.history())):
+            with open(path, "rb") as f:
+                ok = f.read() == jsonio.dumps(data)
+            same = same and ok
+            print(f"  {path}: {'identical' if ok else 'DIFFERENT'}")
+        sys.exit(0 if same else 1)
+    print(f"Written: {', '.join(index.write()) or 'nothing changed'}")
@@ -10,6 +10,13 @@ import sys
 import requests
 import json
 
+from result_merge import load_changes, clear_changes
+from publisher import Publisher, ARTIFACT_FILES
+from tracing import span
+from storage import pipeline_lock
+from note_listing import write_listing
+from manifest_pages import write_pages
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -34,31 +41,28 @@ def run_lottery_scraper():
             if result.stdout:
                 logging.info(f"Output: {result.stdout}")
             
-            # Run the manifest generation script
-            manifest_result = subprocess.run(['node', 'generate-manifest.js'], capture_output=True, text=True, timeout=120)
-            if manifest_result.returncode == 0:
-                logging.info("Manifest generation completed successfully")
-            else:
-                logging.warning(f"Manifest generation had issues: {manifest_result.stderr}")
+            # Hold the lock so a manual-upload or cron run cannot write between
+            # reading the changes and clearing them
+            with pipeline_lock():
+                # Skip regeneration and publishing when no prize tier actually changed
+                changes = load_changes()
+                if not changes:
+                    logging.info("No result changes - skipping manifest, history and git")
+                    return
+                logging.info(f"Changed results: {changes}")
 
-            # Run the history generation script (optional but kept for compatibility)
-            hist_result = subprocess.run(['node', 'generate-history.js'], capture_output=True, text=True, timeout=120)  # 2 minute timeout
-            if hist_result.returncode == 0:
-                logging.info("History generation completed successfully")
-            else:
-                logging.warning(f"History generation had issues: {hist_result.stderr}")
-                    
-            # Check if there are actual changes worth committing
-            # We rely on git status in commit_and_push_changes, so we proceed if scripts ran fine.
-            if True:
-                # If GitHub token is set, commit and push changes
-                # Also try pushing if git is configured with SSH/credential helper (implied if token is missing but user wants automation)
-                github_token = os.environ.get('GITHUB_TOKEN')
-                if github_token or True: # Try pushing regardless, let git handle auth errors if any
-                    try:
-                        commit_and_push_changes()
-                    except Exception as e:
-                        logging.error(f"Error during git operations: {e}")
+                generate_artifacts()
+                        
+                if True:
+                    # If GitHub token is set, commit and push changes
+                    # Also try pushing if git is configured with SSH/credential helper (implied if token is missing but user wants automation)
+                    github_token = os.environ.get('GITHUB_TOKEN')
+                    if github_token or True: # Try pushing regardless, let git handle auth errors if any
+                        try:
+                            commit_and_push_changes(changes)
+                        except Exception as e:
+                            logging.error(f"Error during git operations: {e}")
+                clear_changes()
         else:
             logging.error(f"Error running lottery scraper: {result.stderr}")
     except subprocess.TimeoutExpired:
@@ -66,34 +70,48 @@ def run_lottery_scraper():
     except Exception as e:
         logging.error(f"Exception occurred while running scraper: {e}")
 
+def generate_artifacts():
+    """Regenerate result_manifest.json, history.json and listing/ from the note folder"""
+    # Run the manifest generation script
+    with span("manifest"):
+        manifest_result = subprocess.run(['node', 'generate-manifest.js'], capture_output=True, text=True, timeout=120)
+    if manifest_result.returncode == 0:
+        logging.info("Manifest generation completed successfully")
+    else:
+        logging.warning(f"Manifest generation had issues: {manifest_result.stderr}")
+
+    # Run the history generation script (optional but kept for compatibility)
+    with span("history"):
+        hist_result = subprocess.run(['node', 'generate-history.js'], capture_output=True, text=True, timeout=120)  # 2 minute timeout
+    if hist_result.returncode == 0:
+        logging.info("History generation completed successfully")
+    else:
+        logging.warning(f"History generation had issues: {hist_result.stderr}")
+
+    # Paged file listing for scrollresult.html
+    with span("listing"):
+        written = write_listing()
+    logging.info(f"Listing: {len(written)} page(s) updated")
+
+    # recent.json and manifest/page-N.json for the landing pages
+    with span("manifest_pages"):
+        changed = write_pages()
+    logging.info(f"Manifest pages: {len(changed)} file(s) updated")
+
 def has_actual_results():
     """Deprecated: Check performed via git status."""
     return True
 
-def commit_and_push_changes():
-    """Commit and push changes to GitHub"""
+def commit_and_push_changes(changed_files, publisher=None):
+    """Commit and push only the changed note files and the generated artifacts"""
     try:
-        logging.info("Checking for git changes...")
-        
-        # Check if there are any changes
-        result = subprocess.run(['git', 'status', '--porcelain'], capture_output=True, text=True)
-        if not result.stdout.strip():
-            logging.info("No changes to commit")
-            return
-            
-        # Add all changes
-        subprocess.run(['git', 'add', '.'], check=True)
-        
-        # Commit changes
+        logging.info("Publishing changed files...")
+        publisher = publisher or Publisher(batch_window=0)
         commit_message = f"Update lottery results - {datetime.now(IST).strftime('%Y-%m-%d %H:%M:%S')} IST"
-        subprocess.run(['git', 'commit', '-m', commit_message], check=True)
-        
-        # Push changes
-        subprocess.run(['git', 'push'], check=True)
-        
-        logging.info("Changes successfully pushed to GitHub")
+        with span("commit_and_push_changes", files=len(changed_files)) as s:
+            s.set("pushed", publisher.publish(list(changed_files) + ARTIFACT_FILES, message=commit_message, force=publisher.batch_window == 0))
     except subprocess.CalledProcessError as e:
-        logging.error(f"Git operation failed: {e}")
+        logging.error(f"Git operation failed: {e.stderr or e}")
     except Exception as e:
         logging.error(f"Unexpected error during git operations: {e}")
 
@@ -138,8 +156,12 @@ if __name__ == "__main__":
         else:
             logging.warning("GITHUB_TOKEN not set. Auto-push to GitHub will not work.")
         
-        # Start the scheduler
-        run_scheduler()
+        # Start the scheduler; --daemon keeps state warm between ticks (see result_daemon.py)
+        if "--daemon" in sys.argv:
+            from result_daemon import run_daemon
+            run_daemon(publish=commit_and_push_changes)
+        else:
+            run_scheduler()
     except KeyboardInterrupt:
         logging.info("Scheduler stopped by user")
     except Exception as e:
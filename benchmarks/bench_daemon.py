@@ -0,0 +1,155 @@
+"""Cold per-tick regeneration vs the warm result_daemon, against a local stub site.
+
+Works on a copy of note/, result_manifest.json and history.json in a temp directory.
+The stub serves the archive plus a synthetic result for the draw main.py predicts for
+today, and sources.json points the fast path at the stub. Measured:
+  cold artifacts   what auto_scheduler does after a scrape: both node generators and a
+                   listing rebuilt from every note file (node runs are skipped without node)
+  daemon start     building the ArchiveIndex from scratch
+  tick 1           scrape today's draw, refresh the index, write the artifacts
+  tick 2           the same with nothing new
+  restart          loading the checkpoint and refreshing it
+Checks: tick 1 writes and publishes today's note, the manifest and history the daemon
+writes are byte-identical to the node generators' output, the restart rereads nothing,
+and the signal loop ticks once at start and once on SIGUSR1, reloads on SIGHUP and
+checkpoints on SIGTERM.
+
+Usage: python benchmarks/bench_daemon.py
+"""
+import io
+import os
+import sys
+import time
+import shutil
+import signal
+import tempfile
+import threading
+import contextlib
+import subprocess
+from datetime import date
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, ROOT)
+os.environ.setdefault("LOTTERY_TRACE", "0")
+
+import jsonio
+import main
+from archive_index import ArchiveIndex
+from manifest_pages import write_pages
+from note_listing import write_listing
+from result_daemon import ResultDaemon
+from result_validator import validate, errors
+from fixtures import Draw, load_corpus
+from stub_server import StubSite
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def todays_draw(corpus, today):
+    """A synthetic result for the draw main.py predicts today, from the newest valid one of that lottery."""
+    code, number = main.predict_todays_draw(today)
+    for d in sorted(corpus, key=lambda d: d.date, reverse=True):
+        if d.code == code and not errors(validate(d.data, d.filename)):
+            return Draw(code, number, today, d.data)
+    raise SystemExit(f"no valid {code} draw in the archive to copy")
+
+
+def run_node(script):
+    shutil.copy(os.path.join(ROOT, script), ".")
+    subprocess.run(["node", script], check=True, capture_output=True)
+
+
+def cold_artifacts():
+    if shutil.which("node"):
+        run_node("generate-manifest.js")
+        run_node("generate-history.js")
+    write_listing()
+    write_pages()
+
+
+def main_cli():
+    corpus = load_corpus()
+    today = date.today()
+    cwd = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix="bench_daemon_")
+    failures = []
+    try:
+        shutil.copytree(os.path.join(ROOT, "note"), os.path.join(workdir, "note"))
+        for name in ("result_manifest.json", "history.json"):
+            shutil.copy(os.path.join(ROOT, name), workdir)
+        os.chdir(workdir)
+        today_draw = todays_draw(corpus, today)
+        main.is_within_optimal_time_window = lambda: True
+        with StubSite(corpus + [today_draw]) as site:
+            main.BASE_URL = site.url
+            jsonio.dump([{"name": "stub", "base_url": site.url, "parser": "table"}], "sources.json")
+
+            _, cold = timed(cold_artifacts)
+            published = []
+            daemon = ResultDaemon(publish=published.append, state_file="daemon_state.json")
+            _, start = timed(daemon.index.refresh)
+            changes1, tick1 = timed(daemon.tick)
+            changes2, tick2 = timed(daemon.tick)
+            print(f"{len(daemon.index.records)} notes; today's draw {today_draw.filename}")
+            print(f"  cold artifacts {cold * 1000:8.1f} ms  (node generators + full listing + pages)")
+            print(f"  daemon start   {start * 1000:8.1f} ms  (index built from scratch)")
+            print(f"  tick 1         {tick1 * 1000:8.1f} ms  (scrape, 1 new note, artifacts, publish)")
+            print(f"  tick 2         {tick2 * 1000:8.1f} ms  (nothing new)")
+
+            note_path = f"note/{today_draw.filename}"
+            if note_path not in changes1 or published != [changes1]:
+                failures.append(f"tick 1 did not publish {note_path}: {changes1}")
+            if changes2:
+                failures.append(f"tick 2 found changes: {changes2}")
+            if shutil.which("node"):
+                with open("result_manifest.json", "rb") as f:
+                    manifest = f.read()
+                with open("history.json", "rb") as f:
+                    history = f.read()
+                run_node("generate-manifest.js")
+                run_node("generate-history.js")
+                for path, ours in (("result_manifest.json", manifest), ("history.json", history)):
+                    with open(path, "rb") as f:
+                        if f.read() != ours:
+                            failures.append(f"{path} differs from the node generator's")
+
+            restarted = ResultDaemon(state_file="daemon_state.json")
+            reread, restart = timed(restarted.index.refresh)
+            print(f"  restart        {restart * 1000:8.1f} ms  ({len(reread)} notes reread from the checkpoint)")
+            if reread:
+                failures.append(f"restart reread {len(reread)} notes")
+
+            # Signal loop: initial tick, SIGUSR1 tick, SIGHUP reload, SIGTERM stop
+            looped = ResultDaemon(state_file="daemon_state.json", tick_times=())
+            looped.install_signal_handlers()
+            reloads = []
+            reload = looped.reload
+            looped.reload = lambda: (reloads.append(1), reload())
+            pid = os.getpid()
+            for delay, sig in ((1.0, signal.SIGUSR1), (2.5, signal.SIGHUP), (3.5, signal.SIGTERM)):
+                threading.Timer(delay, os.kill, (pid, sig)).start()
+            _, loop = timed(looped.run)
+            print(f"  signal loop    {looped.ticks} ticks, {len(reloads)} reload, stopped after {loop:.1f}s")
+            if looped.ticks != 2 or len(reloads) != 1 or not os.path.exists("daemon_state.json"):
+                failures.append(f"signal loop: {looped.ticks} ticks, {len(reloads)} reloads")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if failures:
+        print("FAILED:")
+        for f in failures:
+            print(f"  {f}")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,84 @@
+"""Load/dump timings of history.json, the manifest and the note files on each installed jsonio backend.
+
+Usage: python benchmarks/bench_json.py [--repeat 5]
+
+Also checks that every backend writes the same bytes as the stdlib.
+"""
+import os
+import sys
+import glob
+import time
+import argparse
+import importlib
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+
+import jsonio
+
+
+def backend(name):
+    """jsonio reloaded with LOTTERY_JSON_BACKEND=name, or None if it is not installed."""
+    os.environ["LOTTERY_JSON_BACKEND"] = name
+    module = importlib.reload(jsonio)
+    return module if module.BACKEND == name else None
+
+
+def best_of(repeat, fn, *args):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def load_notes(io, paths):
+    for path in paths:
+        io.load_note(path)
+
+
+def dump_notes(io, notes):
+    for note in notes:
+        io.dumps(note)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="jsonio backend timings")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    history_path = os.path.join(ROOT, "history.json")
+    manifest_path = os.path.join(ROOT, "result_manifest.json")
+    note_paths = sorted(glob.glob(os.path.join(ROOT, "note", "*-*-*.json")))
+
+    with open(history_path, "rb") as f:
+        history_raw = f.read()
+    print(f"history.json {len(history_raw) / 1024 / 1024:.1f} MiB, {len(note_paths)} note files\n")
+    print(f"{'backend':10}{'history load':>14}{'history dump':>14}{'manifest dump':>15}"
+          f"{'notes load':>12}{'notes dump':>12}")
+
+    reference = None
+    for name in jsonio.BACKENDS[::-1]:
+        io = backend(name)
+        if io is None:
+            print(f"{name:10}  not installed")
+            continue
+        history = io.loads(history_raw)
+        manifest = io.load(manifest_path)
+        notes = [io.load_note(p) for p in note_paths]
+        output = (io.dumps(history), io.dumps(manifest), [io.dumps(n) for n in notes])
+        if reference is None:
+            reference = output
+        identical = "identical" if output == reference else "DIFFERENT OUTPUT"
+        print(f"{name:10}"
+              f"{best_of(args.repeat, io.loads, history_raw) * 1000:12.1f}ms"
+              f"{best_of(args.repeat, io.dumps, history) * 1000:12.1f}ms"
+              f"{best_of(args.repeat, io.dumps, manifest) * 1000:13.1f}ms"
+              f"{best_of(args.repeat, load_notes, io, note_paths) * 1000:10.1f}ms"
+              f"{best_of(args.repeat, dump_notes, io, notes) * 1000:10.1f}ms  {identical}")
+
+
+if __name__ == "__main__":
+    main()
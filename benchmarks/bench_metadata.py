@@ -0,0 +1,132 @@
+"""Per-page micro-benchmark of result metadata extraction: the old inline code vs result_metadata.
+
+Usage: python benchmarks/bench_metadata.py [--repeat 5]
+
+Fails (exit 1) if the extractor's output differs from the inline code it replaced.
+"""
+import os
+import re
+import sys
+import time
+import argparse
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from bs4 import BeautifulSoup
+
+from result_metadata import extract_page_metadata, extract_title_metadata, CODE_NAMES
+from fixtures import load_corpus, render_result_page
+
+
+def legacy_page_metadata(result_soup, result_url):
+    """main.process_result_page metadata code as it was before result_metadata."""
+    title_text = ""
+    title_tag = result_soup.find("h1")
+    if title_tag and title_tag.text.strip().lower() not in ["lottery results", "kerala lottery results"]:
+        title_text = title_tag.text.strip()
+    if not title_text:
+        title_tag = result_soup.find("title")
+        if title_tag and title_tag.text.strip():
+            title_text = title_tag.text.strip()
+    if not title_text:
+        for tag in ["h2", "h3"]:
+            t = result_soup.find(tag)
+            if t and t.text.strip():
+                title_text = t.text.strip()
+                break
+    if not title_text:
+        title_text = "Unknown Lottery"
+
+    date_match = re.search(r"(\d{2})[./-](\d{2})[./-](\d{4})", title_text)
+    draw_number_match = re.search(r"\(([^)]+)\)", title_text)
+    lottery_name_match = re.search(r"([A-Za-z\s]+)\s*\(", title_text)
+    lottery_code_match = re.search(r'/kerala-lottery-result-([A-Z]+)-', result_url)
+
+    venue = ""
+    venue_tag = result_soup.find(string=re.compile(r"Venue|At", re.I))
+    if venue_tag and isinstance(venue_tag, str):
+        venue_match = re.search(r"(?:Venue|At)[:\-]?\s*([A-Za-z0-9, .()]+)", venue_tag.strip())
+        if venue_match:
+            venue = venue_match.group(1).strip()
+
+    return {
+        "title": title_text,
+        "draw_date": f"{date_match.group(3)}-{date_match.group(2)}-{date_match.group(1)}" if date_match else "Unknown-Date",
+        "draw_number": draw_number_match.group(1) if draw_number_match else "XX",
+        "lottery_name": lottery_name_match.group(1).strip().upper() if lottery_name_match else "Unknown",
+        "lottery_code": lottery_code_match.group(1) if lottery_code_match else "XX",
+        "venue": venue,
+    }
+
+
+def legacy_title_metadata(title_text):
+    """updateloto.scrape_lottery_result title code as it was before result_metadata."""
+    lottery_name = "Unknown Lottery"
+    draw_number = "XX"
+    code = "XX"
+    number = None
+    m_draw = re.search(r"\(([A-Z]+)-(\d+)\)", title_text)
+    if m_draw:
+        code = m_draw.group(1)
+        number = m_draw.group(2)
+        draw_number = f"{code}-{m_draw.group(2)}"
+    clean_title = title_text
+    clean_title = re.sub(r'Kerala Lottery Result Today', '', clean_title, flags=re.IGNORECASE)
+    clean_title = re.sub(r'\d+[./-]\d+[./-]\d+', '', clean_title)
+    clean_title = re.sub(r'\([^\)]+\)', '', clean_title)
+    clean_title = clean_title.replace('|', '').replace('-', '').strip()
+    if clean_title:
+        lottery_name = clean_title.upper()
+    if lottery_name == "UNKNOWN LOTTERY" or len(lottery_name) < 3:
+        if code in CODE_NAMES:
+            lottery_name = CODE_NAMES[code]
+    return {"code": code, "number": number, "draw_number": draw_number, "lottery_name": lottery_name}
+
+
+def timed(fn, args, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(*args)
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Metadata extraction micro-benchmark")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pages = []
+    for draw in load_corpus():
+        url = f"https://www.kllotteryresult.com/{draw.slug}"
+        soup = BeautifulSoup(render_result_page(draw), "html.parser")
+        pages.append((url, soup, soup.title.string.strip()))
+
+    totals = {"page (legacy)": 0.0, "page (extractor)": 0.0, "title (legacy)": 0.0, "title (extractor)": 0.0}
+    mismatches = 0
+    for url, soup, title in pages:
+        t_old, old = timed(legacy_page_metadata, (soup, url), args.repeat)
+        t_new, new = timed(extract_page_metadata, (soup, url), args.repeat)
+        totals["page (legacy)"] += t_old
+        totals["page (extractor)"] += t_new
+        mismatches += old != new
+
+        t_old, old = timed(legacy_title_metadata, (title,), args.repeat)
+        t_new, new = timed(extract_title_metadata, (title,), args.repeat)
+        totals["title (legacy)"] += t_old
+        totals["title (extractor)"] += t_new
+        mismatches += old != new
+
+    n = len(pages)
+    print(f"{n} pages, {args.repeat} repeats each")
+    for name, total in totals.items():
+        print(f"  {name:20} {total / n * 1e6:9.1f} us/page")
+    print(f"  page speedup  {totals['page (legacy)'] / totals['page (extractor)']:.2f}x")
+    print(f"  title speedup {totals['title (legacy)'] / totals['title (extractor)']:.2f}x")
+    print(f"Output mismatches: {mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""Memory and load time of the whole archive as JSON dicts vs the result_model classes.
+
+Usage: python benchmarks/bench_model.py [--scale 1]
+
+--scale N loads the archive N times over to show how the footprint grows.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+
+from result_model import Draw
+
+NOTE_DIR = os.path.join(ROOT, "note")
+
+
+def note_texts():
+    texts = []
+    for name in sorted(os.listdir(NOTE_DIR)):
+        if name.endswith(".json") and name != "latest.json":
+            with open(os.path.join(NOTE_DIR, name), "r", encoding="utf-8") as f:
+                texts.append(f.read())
+    return texts
+
+
+def as_dicts(texts):
+    return [d for d in map(json.loads, texts) if isinstance(d, dict)]
+
+
+def as_model(texts):
+    return [Draw.from_dict(d) for d in map(json.loads, texts) if isinstance(d, dict)]
+
+
+def measure(loader, texts):
+    tracemalloc.start()
+    start = time.perf_counter()
+    archive = loader(texts)
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return archive, current, peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive memory footprint: dicts vs result_model")
+    parser.add_argument("--scale", type=int, default=1)
+    args = parser.parse_args()
+
+    texts = note_texts() * args.scale
+    print(f"{len(texts)} note files")
+    results = {}
+    for name, loader in (("dicts", as_dicts), ("model", as_model)):
+        archive, current, peak, elapsed = measure(loader, texts)
+        results[name] = current
+        print(f"  {name:6} retained {current / 1024 / 1024:7.2f} MiB  peak {peak / 1024 / 1024:7.2f} MiB  "
+              f"load {elapsed:5.2f}s")
+        del archive
+    print(f"  model retains {results['model'] / results['dicts']:.0%} of the dict footprint")
+
+
+if __name__ == "__main__":
+    main()
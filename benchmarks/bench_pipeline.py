@@ -0,0 +1,194 @@
+"""Replay the scrape -> publish pipeline against a local stub of the result site.
+
+Usage: python benchmarks/bench_pipeline.py [--scales 1 10 100] [--json results.json]
+
+Each stage is timed separately and the parsed results are checked against the
+archived note files they were rendered from (the golden JSON). main.py's notes are
+compared without the entries result_validator strips before writing (amounts and
+years the archived notes picked up below the last list).
+"""
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import contextlib
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, ROOT)
+# Spans are not part of what is being measured here
+os.environ.setdefault("LOTTERY_TRACE", "0")
+
+from bs4 import BeautifulSoup
+
+import main
+import updateloto
+from result_merge import write_merged
+from result_validator import strip_invalid
+from fixtures import load_corpus, scale_corpus
+from stub_server import StubSite
+
+DISTRICT_RE = re.compile(r"\s*\([^)]*\)\s*$")
+
+
+class Timer:
+    def __init__(self):
+        self.totals = {}
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.totals[name] = self.totals.get(name, 0.0) + time.perf_counter() - start
+
+
+def golden_winners(draw, strip_district, strip_entries=False):
+    prizes = (strip_invalid(draw.data)[0] if strip_entries else draw.data)["prizes"]
+    tiers = {}
+    for key, prize in prizes.items():
+        winners = [str(w) for w in prize.get("winners", [])]
+        if strip_district:
+            winners = [DISTRICT_RE.sub("", w) for w in winners]
+        tiers[key] = winners
+    return tiers
+
+
+def parsed_winners(data):
+    return {k: list(p.get("winners", [])) for k, p in data.get("prizes", {}).items()}
+
+
+def run_node(script, workdir):
+    shutil.copy(os.path.join(ROOT, script), workdir)
+    result = subprocess.run(["node", script], cwd=workdir, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(f"  {script} failed: {result.stderr.strip()[:200]}")
+
+
+def run_scale(corpus, factor, keep=False):
+    draws = scale_corpus(corpus, factor)
+    timer = Timer()
+    mismatches = {"updateloto": [], "main": []}
+    rejected = []
+    workdir = tempfile.mkdtemp(prefix=f"lottery-bench-{factor}x-")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    os.makedirs("note", exist_ok=True)
+    os.makedirs("note_updateloto", exist_ok=True)
+    try:
+        with StubSite(draws) as site, open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            main.BASE_URL = site.url
+            by_slug = site.by_slug
+
+            # Discovery: follow the "Older Posts" chain, extracting result links from every index page
+            links = []
+            with timer.stage("discovery"):
+                page_url = site.url + "/"
+                page = 1
+                while page_url:
+                    updateloto.MAIN_URL = page_url
+                    # updateloto joins relative hrefs onto MAIN_URL, so rebuild each link from its slug
+                    links.extend(f"{site.url}/{l.rsplit('/', 1)[1]}" for l in updateloto.get_last_n_result_links())
+                    page += 1
+                    page_url = f"{site.url}/page/{page}" if (page - 1) * site.per_page < len(draws) else None
+            links = sorted(set(links))
+
+            for url in links:
+                draw = by_slug.get(url.rsplit("/", 1)[1])
+                if draw is None:
+                    continue
+                with timer.stage("fetch"):
+                    text = updateloto.fetch_page_text(url)
+                with timer.stage("parse (updateloto)"):
+                    data = updateloto.scrape_lottery_result(url, text)
+                with timer.stage("note write"):
+                    write_merged(os.path.join("note_updateloto", data["filename"]), data)
+                if parsed_winners(data) != golden_winners(draw, strip_district=True):
+                    mismatches["updateloto"].append(draw.filename)
+
+                with timer.stage("parse+write (main)"):
+                    main.process_result_page(BeautifulSoup(text, "html.parser"), url)
+                if not os.path.exists(os.path.join("note", draw.filename)):
+                    # Refused by result_validator after its retry
+                    rejected.append(draw.filename)
+                    continue
+                with open(os.path.join("note", draw.filename), "r", encoding="utf-8") as f:
+                    written = json.load(f)
+                if parsed_winners(written) != golden_winners(draw, strip_district=False, strip_entries=True):
+                    mismatches["main"].append(draw.filename)
+
+            requests_made = site.requests
+
+        if shutil.which("node"):
+            with timer.stage("manifest build"):
+                run_node("generate-manifest.js", workdir)
+            with timer.stage("history build"):
+                run_node("generate-history.js", workdir)
+    finally:
+        os.chdir(cwd)
+        if not keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "scale": factor,
+        "draws": len(draws),
+        "links": len(links),
+        "requests": requests_made,
+        "stages": {k: round(v, 4) for k, v in timer.totals.items()},
+        "golden_mismatches": {k: len(v) for k, v in mismatches.items()},
+        "mismatch_examples": {k: v[:5] for k, v in mismatches.items()},
+        "validation_rejects": rejected,
+    }
+
+
+def print_report(results):
+    stages = []
+    for r in results:
+        for name in r["stages"]:
+            if name not in stages:
+                stages.append(name)
+    header = f"{'stage':22}" + "".join(f"{str(r['scale']) + 'x (' + str(r['draws']) + ')':>18}" for r in results)
+    print(header)
+    print("-" * len(header))
+    for name in stages:
+        row = f"{name:22}"
+        for r in results:
+            seconds = r["stages"].get(name)
+            per_draw = seconds / r["draws"] * 1000 if seconds is not None else None
+            row += f"{seconds:9.2f}s {per_draw:5.2f}ms" if seconds is not None else f"{'-':>18}"
+        print(row)
+    print()
+    for r in results:
+        print(f"{r['scale']}x: {r['requests']} stub requests, golden mismatches {r['golden_mismatches']}")
+        for parser, names in r["mismatch_examples"].items():
+            if names:
+                print(f"  {parser}: {', '.join(names)}")
+        if r["validation_rejects"]:
+            print(f"  not written (failed validation): {', '.join(r['validation_rejects'])}")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10], help="corpus multipliers (e.g. 1 10 100)")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--keep", action="store_true", help="keep the temporary work directories")
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    print(f"Corpus: {len(corpus)} archived draws\n")
+    results = [run_scale(corpus, factor, keep=args.keep) for factor in args.scales]
+    print_report(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main_cli()
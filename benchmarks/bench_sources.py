@@ -0,0 +1,115 @@
+"""Race result_sources against local stub mirrors with known behaviour.
+
+Four stub sites serve the same corpus subset:
+  fast     answers at once
+  slow     holds every response back --slow-delay seconds
+  broken   answers 503
+  stale    serves the previous draw of the lottery (a mirror that lags behind)
+
+Every draw is raced over all four with a fresh scoreboard in a temp directory.
+Checks: the fast source wins every race, a race finishes well before the slow
+source could answer (it is cancelled, not waited for), the broken and stale
+sources never win, and the scoreboard ranks fast first afterwards. A second
+round without the fast mirror checks that the slow one is then waited for.
+
+Usage: python benchmarks/bench_sources.py [--draws 20] [--slow-delay 1.0]
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, ROOT)
+os.environ.setdefault("LOTTERY_TRACE", "0")
+
+from result_sources import Source, Scoreboard, race_draw
+from result_validator import validate, errors
+from fixtures import load_corpus
+from stub_server import StubSite
+
+
+def pick_draws(corpus, count):
+    """The newest draws that pass validation and have an older draw of the same lottery."""
+    codes = {}
+    for d in corpus:
+        codes.setdefault(d.code, []).append(d.date)
+    picked = []
+    for d in sorted(corpus, key=lambda d: d.date, reverse=True):
+        if min(codes[d.code]) < d.date and not errors(validate(d.data, d.filename)):
+            picked.append(d)
+        if len(picked) == count:
+            break
+    return picked
+
+
+def race_all(draws, sources, scoreboard):
+    results = []
+    for d in draws:
+        start = time.perf_counter()
+        won = race_draw(d.code, d.number, sources=sources, scoreboard=scoreboard, width=len(sources))
+        results.append((d, won, time.perf_counter() - start))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Race stub result mirrors")
+    parser.add_argument("--draws", type=int, default=20)
+    parser.add_argument("--slow-delay", type=float, default=1.0)
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    draws = pick_draws(corpus, args.draws)
+    cwd = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix="bench_sources_")
+    os.chdir(workdir)
+    failures = []
+    try:
+        with StubSite(corpus) as fast, StubSite(corpus, delay=args.slow_delay) as slow, \
+                StubSite(corpus, status=503) as broken, StubSite(corpus, stale=True) as stale:
+            sources = [Source(name, site.url) for name, site in
+                       (("slow", slow), ("broken", broken), ("stale", stale), ("fast", fast))]
+
+            scoreboard = Scoreboard(os.path.join(workdir, "scores.json"))
+            results = race_all(draws, sources, scoreboard)
+            times = sorted(elapsed for _, _, elapsed in results)
+            for d, won, elapsed in results:
+                if won is None or won.source != "fast":
+                    failures.append(f"{d.filename}: won by {won.source if won else 'nobody'}")
+                elif won.filename != d.filename:
+                    failures.append(f"{d.filename}: got {won.filename}")
+                if elapsed >= args.slow_delay:
+                    failures.append(f"{d.filename}: race took {elapsed:.2f}s, slow source was waited for")
+            print(f"All four mirrors, {len(results)} draws: race median {times[len(times) // 2] * 1000:.1f} ms, "
+                  f"max {times[-1] * 1000:.1f} ms (slow mirror answers after {args.slow_delay * 1000:.0f} ms)")
+            ranking = [s.name for s in scoreboard.rank(sources)]
+            print(f"  ranking: {' > '.join(ranking)}")
+            for name in ranking:
+                print(f"  {name:7} {scoreboard.scores[name]}")
+            if ranking[0] != "fast":
+                failures.append(f"ranking starts with {ranking[0]}")
+
+            # Without the fast mirror the slow one is the only valid source left
+            fallback = race_all(draws[:3], [s for s in sources if s.name != "fast"], Scoreboard(None))
+            for d, won, elapsed in fallback:
+                if won is None or won.source != "slow":
+                    failures.append(f"{d.filename} without fast: won by {won.source if won else 'nobody'}")
+            print(f"Without the fast mirror: {', '.join(f'{won.source if won else None} in {e:.2f}s' for _, won, e in fallback)}")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if failures:
+        print("FAILED:")
+        for f in failures:
+            print(f"  {f}")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Import time of the CLI entry points, from `python -X importtime`.
+
+For each module the cumulative import time is taken from the importtime report:
+  cached    the tree's own __pycache__ is warm (repeat runs on one machine)
+  uncached  the .py files are copied to an empty directory and run with -B, so every
+            module of the tree is compiled again (a fresh checkout on Actions or Colab;
+            installed packages keep their bytecode either way)
+and the heavy third-party packages each import pulls in are listed. Entry points that
+never touch the network (OFFLINE) must not import an HTTP or HTML library.
+
+Usage: python benchmarks/bench_startup.py [--repeat 7] [--root path/to/other/checkout]
+"""
+import os
+import re
+import sys
+import glob
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+
+ENTRY_POINTS = ("main", "updateloto", "process_manual_uploads", "reparse", "result_validator")
+OFFLINE = ("process_manual_uploads", "reparse", "result_validator")
+HEAVY = ("requests", "urllib3", "bs4", "cloudscraper", "pytz", "schedule")
+NETWORK_LIBS = ("requests", "urllib3", "bs4", "cloudscraper")
+
+LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$")
+
+
+def import_report(module, cwd, extra_args=()):
+    """(cumulative microseconds, set of imported module names) for one import of module."""
+    env = dict(os.environ, LOTTERY_TRACE="0")
+    result = subprocess.run([sys.executable, "-X", "importtime", *extra_args, "-c", f"import {module}"],
+                            cwd=cwd, env=env, capture_output=True, text=True)
+    total = None
+    names = set()
+    for line in result.stderr.splitlines():
+        m = LINE_RE.match(line)
+        if not m:
+            continue
+        names.add(m.group(4))
+        if m.group(4) == module and not m.group(3):
+            total = int(m.group(2))
+    if total is None:
+        raise RuntimeError(f"import {module} failed: {result.stderr.strip()[-300:]}")
+    return total, names
+
+
+def fresh_copy(root):
+    work = tempfile.mkdtemp(prefix="bench_startup_")
+    for path in glob.glob(os.path.join(root, "*.py")):
+        shutil.copy(path, work)
+    return work
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Entry point import times")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--root", default=ROOT, help="checkout to measure (default: this one)")
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'entry point':24}{'cached':>10}{'uncached':>10}  heavy imports")
+    for module in ENTRY_POINTS:
+        if not os.path.exists(os.path.join(args.root, module + ".py")):
+            continue
+        cached = min(import_report(module, args.root)[0] for _ in range(args.repeat))
+        uncached = []
+        for _ in range(args.repeat):
+            work = fresh_copy(args.root)
+            try:
+                total, names = import_report(module, work, ("-B",))
+            finally:
+                shutil.rmtree(work)
+            uncached.append(total)
+        heavy = [name for name in HEAVY if name in names]
+        print(f"{module:24}{cached / 1000:8.1f}ms{min(uncached) / 1000:8.1f}ms  {', '.join(heavy) or '-'}")
+        if module in OFFLINE and any(name in names for name in NETWORK_LIBS):
+            failures.append(f"{module} imports {', '.join(n for n in NETWORK_LIBS if n in names)}")
+    if failures:
+        print("FAILED: " + "; ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Throughput of ticket_checker against the per-ticket scan scanner.html does.
+
+Usage: python benchmarks/bench_tickets.py [--tickets 100000] [--from 2025-01-01] [--to 2026-12-31]
+
+Each ticket is sold for one draw of the selection; 5% are copied from that draw's
+winners and the rest are random. The scan baseline (find the draw, walk its winners)
+is timed on a sample and extrapolated.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+
+from result_merge import load_note
+from ticket_checker import TicketChecker, select_notes, NOTE_DIR
+
+SERIES = "ABCDEFGHJKLM"
+
+
+def make_tickets(notes, n, seed=7):
+    """(ticket, draw, date) rows, each ticket sold for one draw like a partner's upload."""
+    rng = random.Random(seed)
+    draws = []
+    for draw, date, path in notes:
+        winners = []
+        for prize in (load_note(path).get("prizes") or {}).values():
+            winners += [w for w in prize.get("winners", []) if len(w) >= 8]
+        draws.append((draw, date, winners))
+    rows = []
+    for _ in range(n):
+        draw, date, winners = rng.choice(draws)
+        if winners and rng.random() < 0.05:
+            ticket = rng.choice(winners).split("(")[0].strip()
+        else:
+            ticket = f"{rng.choice('KPSDB')}{rng.choice(SERIES)} {rng.randrange(1000000):06d}"
+        rows.append((ticket, draw, date))
+    return rows
+
+
+def scan_check(ticket, result):
+    """scanner.html's matching: walk every winner of the ticket's draw."""
+    needle = ticket.replace(" ", "").lower()
+    found = []
+    for prize in (result.get("prizes") or {}).values():
+        for w in prize.get("winners", []):
+            w_clean = w.replace(" ", "").lower()
+            if w_clean == needle or w_clean.startswith(needle) or w_clean.endswith(needle[-4:]):
+                found.append(prize.get("amount"))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ticket checker throughput benchmark")
+    parser.add_argument("--tickets", type=int, default=100000)
+    parser.add_argument("--from", dest="start")
+    parser.add_argument("--to", dest="end")
+    parser.add_argument("--scan-sample", type=int, default=2000)
+    args = parser.parse_args()
+
+    note_dir = os.path.join(ROOT, NOTE_DIR)
+    notes = select_notes(note_dir, start=args.start, end=args.end)
+    tickets = make_tickets(notes, args.tickets)
+
+    start = time.perf_counter()
+    checker = TicketChecker.from_notes(note_dir, start=args.start, end=args.end)
+    indexed = time.perf_counter()
+    winning = sum(1 for _, matches in checker.check_rows(tickets) if matches)
+    checked = time.perf_counter()
+
+    results = {draw: load_note(path) for draw, _, path in notes}
+    sample = tickets[:args.scan_sample]
+    scan_start = time.perf_counter()
+    for ticket, draw, _ in sample:
+        scan_check(ticket, results[draw])
+    per_scan = (time.perf_counter() - scan_start) / len(sample)
+
+    per_index = (checked - indexed) / len(tickets)
+    print(f"{len(checker.draws)} draws, {len(tickets)} tickets, {winning} winning")
+    print(f"  index build         {indexed - start:8.2f}s")
+    print(f"  indexed check       {checked - indexed:8.2f}s  {1 / per_index:12,.0f} tickets/s")
+    print(f"  scan (extrapolated) {per_scan * len(tickets):8.2f}s  {1 / per_scan:12,.0f} tickets/s")
+    print(f"  speedup             {per_scan / per_index:8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Throughput of process_manual_uploads for a bulk upload, against archives of growing size.
+
+Works on a copy of note/ in a temp directory, grown to each --scales multiple of
+the archive with shifted copies (fixtures.scale_corpus); the manifest, history and
+listing are rebuilt to match before anything is timed. Then --batch more shifted
+copies are written to note/ and merged
+with 1 worker and with --workers. Checks that the manifest and history after the
+merge are byte-identical to a rebuild from every note file (archive_index).
+
+Usage: python benchmarks/bench_uploads.py [--scales 1 4] [--batch 300] [--workers 4]
+"""
+import io
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import contextlib
+from datetime import timedelta
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, ROOT)
+os.environ.setdefault("LOTTERY_TRACE", "0")
+
+import jsonio
+import process_manual_uploads as uploads
+from archive_index import ArchiveIndex
+from fixtures import Draw, load_corpus, scale_corpus
+
+# Upload batches are shifted further back than any scaled copy of the archive
+BATCH_SHIFT_DAYS = 400 * 50
+BATCH_DRAW_OFFSET = 10000 * 50
+
+
+def note_data(draw):
+    """The note of a shifted copy, dated and numbered as the copy."""
+    data = dict(draw.data)
+    data.update(draw_number=f"{draw.code}-{draw.number}", draw_date=draw.date.isoformat(), filename=draw.filename)
+    return data
+
+
+def write_notes(draws):
+    for d in draws:
+        jsonio.dump(note_data(d), os.path.join("note", d.filename))
+
+
+def quiet(fn, *args):
+    with contextlib.redirect_stdout(io.StringIO()) as out:
+        start = time.perf_counter()
+        fn(*args)
+        return time.perf_counter() - start, out.getvalue()
+
+
+def snapshot():
+    files = {}
+    for name in ("result_manifest.json", "history.json"):
+        with open(name, "rb") as f:
+            files[name] = f.read()
+    return files
+
+
+def run_scale(corpus, factor, batch, workers):
+    work = tempfile.mkdtemp(prefix=f"bench_uploads_{factor}x_")
+    cwd = os.getcwd()
+    results = {}
+    try:
+        shutil.copytree(os.path.join(ROOT, "note"), os.path.join(work, "note"))
+        os.chdir(work)
+        write_notes(scale_corpus(corpus, factor)[len(corpus):])
+        quiet(uploads.rebuild_all)
+        archive = len(os.listdir("note"))
+        baseline = snapshot()
+
+        shift = timedelta(days=BATCH_SHIFT_DAYS)
+        pool = (corpus * (batch // len(corpus) + 1))[:batch]
+        new = [Draw(d.code, d.number + BATCH_DRAW_OFFSET + i // len(corpus) * 1000,
+                    d.date - shift - timedelta(days=400 * (i // len(corpus))), d.data) for i, d in enumerate(pool)]
+        for count in (1, workers):
+            # Same batch each time, from the same starting point
+            for name, data in baseline.items():
+                with open(name, "wb") as f:
+                    f.write(data)
+            write_notes(new)
+            elapsed, out = quiet(uploads.process_manual_uploads, [d.filename for d in new], count)
+            results[count] = elapsed
+            merged = snapshot()
+            index = ArchiveIndex()
+            index.refresh()
+            if merged != {"result_manifest.json": jsonio.dumps(index.manifest()),
+                          "history.json": jsonio.dumps(index.history())}:
+                raise SystemExit(f"{factor}x, {count} worker(s): merge differs from a full rebuild")
+        return archive, results
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk upload throughput")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--batch", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    print(f"Batch of {args.batch} uploaded notes, {os.cpu_count()} CPU(s)")
+    for factor in args.scales:
+        archive, results = run_scale(corpus, factor, args.batch, args.workers)
+        line = f"  archive {archive:5} notes:"
+        for count, elapsed in results.items():
+            line += f"  {count} worker(s) {elapsed:6.2f}s ({args.batch / elapsed:5.0f} files/s)"
+        print(line)
+    print("OK: merged manifest and history match a full rebuild")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""History build from the winner strings vs from the parsed rows in lookup/.
+
+Copies note/ and lookup/ into a temp directory and builds history.json twice, with
+the lookup tables (numbers from their parsed rows, draw_lookup) and without them
+(every winner string run through the regex), both with generate-history.js (needs
+node; skipped without it) and with archive_index. Checks that every build gives the
+same history.json, and prints the size of note/ and lookup/ and how many winners
+needed a parsed row.
+
+Usage: python benchmarks/bench_winners.py [--repeat 5]
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+
+import jsonio
+from archive_index import ArchiveIndex
+
+
+def dir_size(path):
+    return sum(e.stat().st_size for e in os.scandir(path) if e.is_file())
+
+
+def row_counts(lookup_dir):
+    winners = rows = series = districts = tables = 0
+    for name in os.listdir(lookup_dir):
+        table = jsonio.load(os.path.join(lookup_dir, name))
+        tables += 1
+        winners += sum(t[3] for t in table["tiers"])
+        rows += sum(len(r) for r in table["parsed"])
+        series += len(table["series"])
+        districts += len(table["districts"])
+    return tables, winners, rows, series, districts
+
+
+def time_node(work, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(["node", "generate-history.js"], cwd=work, check=True, capture_output=True)
+        best = min(best, time.perf_counter() - start)
+    with open(os.path.join(work, "history.json"), "rb") as f:
+        return best, f.read()
+
+
+def time_index(repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        index = ArchiveIndex()
+        index.refresh()
+        body = jsonio.dumps(index.history())
+        best = min(best, time.perf_counter() - start)
+    return best, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description="History build with and without the lookup tables")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    work = tempfile.mkdtemp(prefix="bench_winners_")
+    cwd = os.getcwd()
+    try:
+        shutil.copytree(os.path.join(ROOT, "note"), os.path.join(work, "note"))
+        shutil.copytree(os.path.join(ROOT, "lookup"), os.path.join(work, "lookup"))
+        shutil.copy(os.path.join(ROOT, "generate-history.js"), work)
+        os.chdir(work)
+        tables, winners, rows, series, districts = row_counts("lookup")
+        print(f"note/ {dir_size('note') / 1024:.1f} KiB, lookup/ {dir_size('lookup') / 1024:.1f} KiB "
+              f"({tables} tables); {rows} of {winners} winners need a parsed row; "
+              f"{series / tables:.1f} series and {districts / tables:.1f} districts per draw")
+        histories = []
+        for form in ("lookup rows", "strings"):
+            if form == "strings":
+                shutil.rmtree("lookup")
+            line = f"  {form:12}"
+            elapsed, body = time_index(args.repeat)
+            histories.append(body)
+            line += f"  archive_index {elapsed * 1000:6.1f} ms"
+            if shutil.which("node"):
+                elapsed, body = time_node(work, args.repeat)
+                histories.append(body)
+                line += f"  generate-history.js {elapsed * 1000:6.1f} ms"
+            print(line)
+        same = all(h == histories[0] for h in histories)
+        print(f"  history.json {len(histories[0]) / 1024:.1f} KiB, {'identical' if same else 'DIFFERENT'} for every build")
+        if not same:
+            sys.exit(1)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
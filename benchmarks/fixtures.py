@@ -0,0 +1,107 @@
+import os
+import re
+import json
+import html
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+NOTE_DIR = os.path.join(ROOT, "note")
+# Pages saved by record.py; replayed instead of the synthesized HTML when present
+RECORDED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+FILENAME_RE = re.compile(r"^([A-Z]{1,3})-(\d+)-(\d{4}-\d{2}-\d{2})\.json$")
+
+# Synthetic copies are shifted back this far so dates never collide with the real archive
+COPY_SHIFT_DAYS = 400
+COPY_DRAW_OFFSET = 10000
+
+
+class Draw:
+    __slots__ = ("code", "number", "date", "data", "slug")
+
+    def __init__(self, code, number, draw_date, data):
+        self.code = code
+        self.number = number
+        self.date = draw_date
+        self.data = data
+        self.slug = f"kerala-lottery-result-{code}-{number}"
+
+    @property
+    def filename(self):
+        return f"{self.code}-{self.number}-{self.date.isoformat()}.json"
+
+
+def load_corpus(note_dir=NOTE_DIR):
+    """Every archived draw with a proper CODE-N-DATE filename and real prize data."""
+    draws = []
+    for name in sorted(os.listdir(note_dir)):
+        m = FILENAME_RE.match(name)
+        if not m:
+            continue
+        with open(os.path.join(note_dir, name), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        prizes = data.get("prizes")
+        if not isinstance(prizes, dict) or not prizes:
+            continue
+        if not any(p.get("winners") for p in prizes.values()):
+            continue
+        draws.append(Draw(m.group(1), int(m.group(2)), date.fromisoformat(m.group(3)), data))
+    return draws
+
+
+def scale_corpus(draws, factor):
+    """Repeat the corpus factor times with shifted dates and draw numbers."""
+    scaled = list(draws)
+    for k in range(1, factor):
+        shift = timedelta(days=COPY_SHIFT_DAYS * k)
+        for d in draws:
+            scaled.append(Draw(d.code, d.number + COPY_DRAW_OFFSET * k, d.date - shift, d.data))
+    return scaled
+
+
+def _lottery_title(draw):
+    name = draw.data.get("lottery_name") or draw.code
+    name = re.sub(r"[^A-Za-z ]", "", name).strip().title() or draw.code
+    return f"{name} ({draw.code}-{draw.number}) {draw.date.strftime('%d.%m.%Y')}"
+
+
+def render_result_page(draw):
+    """Result page markup in the layout both main.py and updateloto.py parse."""
+    recorded = os.path.join(RECORDED_DIR, draw.slug + ".html")
+    if os.path.exists(recorded):
+        with open(recorded, "r", encoding="utf-8") as f:
+            return f.read()
+
+    title = html.escape(_lottery_title(draw))
+    rows = []
+    for key, prize in draw.data["prizes"].items():
+        # Rendered from the key: some archived labels are raw keys such as "7th_prize"
+        label = html.escape(key.split("_")[0].capitalize() + " Prize")
+        rows.append(f"<tr><th>{label} Rs {prize.get('amount', 0)}/-</th></tr>")
+        for winner in prize.get("winners", []):
+            rows.append(f"<tr><td>{html.escape(str(winner))}</td></tr>")
+    return (
+        "<!DOCTYPE html><html><head>"
+        f"<title>Kerala Lottery Result Today {title}</title></head><body>"
+        f"<h1>{title}</h1>"
+        "<p>Venue: Gorky Bhavan, Near Bakery Junction, Thiruvananthapuram</p>"
+        "<table class=\"w-full\">" + "".join(rows) + "</table>"
+        "</body></html>"
+    )
+
+
+def render_index_page(draws, page, per_page):
+    """One page of the result listing, newest first, with an "Older Posts" link."""
+    recorded = os.path.join(RECORDED_DIR, f"index-{page}.html")
+    if os.path.exists(recorded):
+        with open(recorded, "r", encoding="utf-8") as f:
+            return f.read()
+
+    chunk = draws[(page - 1) * per_page:page * per_page]
+    items = "".join(
+        f"<li><a href=\"/{d.slug}\">{html.escape(_lottery_title(d))}</a></li>" for d in chunk
+    )
+    older = ""
+    if page * per_page < len(draws):
+        older = f"<a href=\"/page/{page + 1}\">Older Posts</a>"
+    return f"<!DOCTYPE html><html><head><title>Kerala Lottery Results</title></head><body><ul>{items}</ul>{older}</body></html>"
@@ -0,0 +1,38 @@
+"""Record live index and result pages into benchmarks/fixtures for the stub server to replay.
+
+Usage: python benchmarks/record.py [result-url ...]
+
+With no arguments the home page and every result page linked from it are recorded.
+"""
+import os
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import updateloto
+from fixtures import RECORDED_DIR
+
+
+def save(name, text):
+    os.makedirs(RECORDED_DIR, exist_ok=True)
+    path = os.path.join(RECORDED_DIR, name)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    print(f"Recorded {path} ({len(text)} chars)")
+
+
+def record(urls=None):
+    if not urls:
+        save("index-1.html", updateloto.fetch_page_text(updateloto.MAIN_URL))
+        urls = updateloto.get_last_n_result_links()
+    for url in urls:
+        slug = url.rstrip("/").rsplit("/", 1)[1]
+        try:
+            save(slug + ".html", updateloto.fetch_page_text(url))
+        except Exception as e:
+            print(f"Failed to record {url}: {e}")
+
+
+if __name__ == "__main__":
+    record(sys.argv[1:])
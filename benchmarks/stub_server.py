@@ -0,0 +1,78 @@
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from fixtures import render_result_page, render_index_page
+
+INDEX_PAGE_SIZE = 50
+
+
+class StubSite:
+    """Local stand-in for the result site, serving the index and result pages of a corpus.
+
+    For mirror tests: delay holds every response back that many seconds, status
+    answers every request with that error code, and stale serves the previous draw
+    of the same lottery in place of the requested one (a mirror that lags behind).
+    """
+
+    def __init__(self, draws, per_page=INDEX_PAGE_SIZE, delay=0.0, status=None, stale=False):
+        self.draws = sorted(draws, key=lambda d: (d.date, d.number), reverse=True)
+        self.by_slug = {d.slug: d for d in self.draws}
+        self.per_page = per_page
+        self.delay = delay
+        self.status = status
+        self.stale = stale
+        self.requests = 0
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                site.requests += 1
+                if site.delay:
+                    time.sleep(site.delay)
+                if site.status:
+                    self.send_error(site.status)
+                    return
+                path = self.path.split("?")[0].strip("/")
+                if path == "" or path.startswith("page/"):
+                    page = int(path.split("/")[1]) if path else 1
+                    body = render_index_page(site.draws, page, site.per_page)
+                elif path in site.by_slug:
+                    draw = site.by_slug[path]
+                    if site.stale:
+                        draw = site.previous(draw)
+                        if draw is None:
+                            self.send_error(404)
+                            return
+                    body = render_result_page(draw)
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def previous(self, draw):
+        """The draw of the same lottery before this one, if the corpus has it."""
+        return next((d for d in self.draws if d.code == draw.code and d.date < draw.date), None)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
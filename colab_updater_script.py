@@ -14,6 +14,10 @@
 
 import os
 import sys
+import time
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 # --- CONFIGURATION (FILL THIS CAREFULLY) ---
 # Your GitHub Repository URL (must be HTTPS)
@@ -41,6 +45,9 @@ def run_command(cmd):
         # Don't exit, try to continue cleaning up or reporting
     return ret
 
+# Absolute so repeated scheduled runs reuse the same clone
+REPO_DIR = os.path.abspath(REPO_URL.split("/")[-1].replace(".git", ""))
+
 def main():
     print("Starting Lottery Auto-Update on Colab...")
 
@@ -51,21 +58,23 @@ def main():
     else:
         authed_url = REPO_URL
 
-    repo_name = REPO_URL.split("/")[-1].replace(".git", "")
-
-    # 2. Remove previous runs to start fresh
-    if os.path.exists(repo_name):
-        print("Cleaning up previous run...")
-        run_command(f"rm -rf {repo_name}")
-
-    # 3. Clone the Repository
-    print("Cloning repository...")
-    if run_command(f"git clone {authed_url}") != 0:
-        print("Failed to clone. Check your Token and URL.")
-        return
+    # 2. Clone once (shallow); later runs reuse the clone and only fetch new commits
+    if not os.path.isdir(os.path.join(REPO_DIR, ".git")):
+        print("Cloning repository...")
+        start = time.time()
+        if run_command(f"git clone --depth 1 {authed_url} {REPO_DIR}") != 0:
+            print("Failed to clone. Check your Token and URL.")
+            return
+        print(f"Cloned in {time.time() - start:.2f}s")
+
+    # 3. Bring the existing clone up to date
+    sys.path.insert(0, REPO_DIR)
+    from publisher import Publisher, ARTIFACT_FILES, sync_clone
+    print("Fetching latest changes...")
+    sync_clone(authed_url, REPO_DIR)
 
     # 4. Enter Directory
-    os.chdir(repo_name)
+    os.chdir(REPO_DIR)
 
     # 5. Install Python Dependencies
     print("Installing dependencies...")
@@ -76,29 +85,31 @@ def main():
     # Using 'updateloto.py' as improved in the previous steps
     run_command("python updateloto.py")
 
+    from result_merge import load_changes, clear_changes
+    changes = load_changes()
+    if not changes:
+        print("No new results found. Nothing to push.")
+        return
+
     # 7. Run Node.js generators (Colab usually has Node installed by default)
     print("Generating manifests...")
     run_command("node generate-manifest.js")
     run_command("node generate-history.js")
+    run_command("python note_listing.py")
+    run_command("python manifest_pages.py")
 
     # 8. Configure Git Identity (Virtual Bot)
     run_command('git config user.email "colab-bot@example.com"')
     run_command('git config user.name "Colab Updater"')
 
-    # 9. Commit and Push
+    # 9. Commit and Push only the changed files
     print("Pushing changes to GitHub...")
-    run_command("git add .")
-    
-    # Check if there are changes
-    status = os.popen("git status --porcelain").read()
-    if not status:
-        print("No new results found. Nothing to push.")
+    publisher = Publisher(batch_window=0)
+    if publisher.publish(list(changes) + ARTIFACT_FILES, message="chore: daily result update from Colab", force=True):
+        print("✅ SUCCESS: Results updated and pushed to GitHub!")
     else:
-        run_command('git commit -m "chore: daily result update from Colab"')
-        if run_command("git push") == 0:
-            print("✅ SUCCESS: Results updated and pushed to GitHub!")
-        else:
-            print("❌ FAILED: Could not push to GitHub.")
+        print("❌ Nothing pushed (no staged changes or push failed).")
+    clear_changes()
 
 def job():
     print(f"\n[Scheduler] Starting job at {datetime.now()}")
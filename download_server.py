@@ -1,9 +1,19 @@
 
-from flask import Flask, send_from_directory, jsonify, render_template_string
+from flask import Flask, send_from_directory, jsonify, render_template_string, request, g, Response
 import os
+import time
+import hashlib
+
+from metrics import HTTP_SECONDS, render as render_metrics
+from note_listing import NOTE_DIR, build_pages, listing_entries
+import jsonio
 
 app = Flask(__name__)
 
+# Listing pages built from note/ and kept in memory; rebuilt when the note
+# directory changes (every atomic note write renames into it)
+_listing = {'mtime': None, 'pages': {}}
+
 # HTML template for the download page
 HTML_TEMPLATE = """
 <!DOCTYPE html>
@@ -52,6 +62,51 @@ HTML_TEMPLATE = """
 </html>
 """
 
+@app.before_request
+def start_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_latency(response):
+    start = getattr(g, 'request_start', None)
+    if start is not None:
+        # Label by route pattern, not path, to keep the series count bounded
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        HTTP_SECONDS.observe(time.perf_counter() - start, route=route, status=response.status_code)
+    return response
+
+@app.route('/metrics')
+def metrics():
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+def listing_pages():
+    """{page number: (body, etag)} for the current note directory."""
+    mtime = os.stat(NOTE_DIR).st_mtime_ns
+    if _listing['mtime'] != mtime:
+        pages = {}
+        for page in build_pages(listing_entries(NOTE_DIR)):
+            body = jsonio.dumps(page, pretty=False)
+            pages[page['page']] = (body, hashlib.sha256(body).hexdigest()[:16])
+        _listing.update(mtime=mtime, pages=pages)
+    return _listing['pages']
+
+@app.route('/listing/page-<int:page>.json')
+def listing_page(page):
+    # Same pages as the static listing/ artifact, served from memory
+    if not os.path.exists(NOTE_DIR):
+        return jsonify({'error': 'No results yet'}), 404
+    cached = listing_pages().get(page)
+    if cached is None:
+        return jsonify({'error': 'Page not found'}), 404
+    body, etag = cached
+    if etag in request.if_none_match:
+        return Response(status=304)
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = 60
+    return response
+
 @app.route('/')
 def index():
     # Get all JSON files from the note directory
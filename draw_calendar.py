@@ -0,0 +1,304 @@
+"""Draw calendar: which lottery is drawn on a day, and its draw number.
+
+The weekly lotteries each keep a weekday (BT Monday, SS Tuesday, DL Wednesday, ...)
+and number their draws one a week; bumpers (BR) are numbered the same way but drawn
+every couple of months, alongside the weekly draw. DrawCalendar learns both from
+result_manifest.json:
+  - the rotation: for each weekday, the most common weekly code among the last
+    ROTATION_WINDOW draws on that weekday, so a postponed draw does not move it and a
+    lottery taking over a weekday (DL after FF) does within a few weeks;
+  - an anchor per code, its latest (date, draw number). The weekly draw on a day is
+    the anchor's number plus the weeks since, less the weeks a bumper was drawn on
+    its weekday without it (the bumper took its place); a bumper's next draw is the
+    anchor's number plus one, due from the shortest gap seen between its draws on.
+A code is weekly unless most of its gaps do not advance the draw number by the weeks
+between (a code seen once counts as weekly). A weekly draw missing the day before,
+while the calendar is up to date, is expected a day late (draws are postponed for
+holidays and elections).
+
+Building is one pass over the manifest; expected(), draws_on(), date_of() and
+drawn_on() after that do not depend on the size of the archive. backtest() replays
+the archive in date order, predicting each day from the draws before it.
+
+  python draw_calendar.py [YYYY-MM-DD]    # expected draws and result page paths
+  python draw_calendar.py --backtest
+"""
+import sys
+import time
+from collections import Counter, deque
+from datetime import date, timedelta
+
+import jsonio
+from note_files import MANIFEST_FILE
+from result_sources import DEFAULT_PATH
+
+WEEK = 7
+# Draws per weekday the rotation is voted from
+ROTATION_WINDOW = 8
+# A bumper is looked for from BUMPER_SLACK days before its shortest gap so far until
+# BUMPER_LATE times its longest (gaps run 49-73 days); outside that window the home
+# page links still find it
+BUMPER_SLACK = 7
+BUMPER_LATE = 1.5
+
+
+class Draw:
+    __slots__ = ("code", "number", "day", "bumper")
+
+    def __init__(self, code, number, day, bumper=False):
+        self.code = code
+        self.number = number
+        self.day = day
+        self.bumper = bumper
+
+    @property
+    def key(self):
+        return f"{self.code}-{self.number}"
+
+    @property
+    def filename(self):
+        return f"{self.code}-{self.number}-{self.day.isoformat()}.json"
+
+    @property
+    def path(self):
+        """Result page path, /kerala-lottery-result-<CODE>-<N>."""
+        return DEFAULT_PATH.format(code=self.code, draw=self.number)
+
+    def __repr__(self):
+        return f"Draw({self.key}, {self.day}{', bumper' if self.bumper else ''})"
+
+
+class _Code:
+    """Anchor and gap statistics of one lottery code."""
+    __slots__ = ("day", "number", "gaps", "weekly_gaps", "min_gap", "max_gap")
+
+    def __init__(self, day, number):
+        self.day = day
+        self.number = number
+        self.gaps = 0
+        self.weekly_gaps = 0
+        self.min_gap = None
+        self.max_gap = None
+
+    @property
+    def weekly(self):
+        return self.weekly_gaps * 2 >= self.gaps
+
+    def add(self, day, number):
+        gap = (day - self.day).days
+        if gap > 0 and number > self.number:
+            self.gaps += 1
+            weeks = round(gap / WEEK)
+            if weeks and number - self.number == weeks:
+                self.weekly_gaps += 1
+            elif number - self.number == 1:
+                self.min_gap = gap if self.min_gap is None else min(self.min_gap, gap)
+                self.max_gap = gap if self.max_gap is None else max(self.max_gap, gap)
+        if (day, number) > (self.day, self.number):
+            self.day, self.number = day, number
+
+
+class DrawCalendar:
+    def __init__(self):
+        self.codes = {}
+        self.recent = [deque(maxlen=ROTATION_WINDOW) for _ in range(WEEK)]
+        # {"SS-498": date} and {date: {code: number}} of the draws added
+        self.drawn = {}
+        self.by_day = {}
+        self.last_day = None
+
+    @classmethod
+    def from_entries(cls, entries):
+        """A calendar of manifest entries ({"code", "draw_number", "date"}), in any order."""
+        calendar = cls()
+        for day, number, code in sorted(_draws(entries)):
+            calendar.add(code, number, day)
+        return calendar
+
+    @classmethod
+    def from_manifest(cls, path=MANIFEST_FILE):
+        return cls.from_entries(jsonio.load(path))
+
+    def add(self, code, number, day):
+        """Record a draw; draws are expected in date order. Returns False for a draw already seen."""
+        key = f"{code}-{number}"
+        if key in self.drawn:
+            return False
+        self.drawn[key] = day
+        self.by_day.setdefault(day, {})[code] = number
+        state = self.codes.get(code)
+        if state is None:
+            self.codes[code] = _Code(day, number)
+        else:
+            state.add(day, number)
+        self.recent[day.weekday()].append(code)
+        if self.last_day is None or day > self.last_day:
+            self.last_day = day
+        return True
+
+    # --- lookups ---
+
+    def rotation(self, weekday):
+        """The weekly code drawn on weekday (0 = Monday), or None."""
+        votes = Counter(c for c in reversed(self.recent[weekday]) if self.codes[c].weekly)
+        return votes.most_common(1)[0][0] if votes else None
+
+    def _bumped(self, code, since, until):
+        """Days on until's weekday after since and before until with a bumper drawn but not code."""
+        bumped = 0
+        day = since + timedelta(days=(until.weekday() - since.weekday()) % WEEK or WEEK)
+        # Only the weeks since the code's last draw, within the archive
+        while day < until and day <= self.last_day:
+            drawn = self.by_day.get(day, {})
+            if code not in drawn and any(not self.codes[c].weekly for c in drawn):
+                bumped += 1
+            day += timedelta(weeks=1)
+        return bumped
+
+    def expected(self, day):
+        """The weekly Draw on day, or None if no weekly lottery has that weekday."""
+        code = self.rotation(day.weekday())
+        if code is None:
+            return None
+        state = self.codes[code]
+        weeks = round((day - state.day).days / WEEK)
+        return Draw(code, state.number + weeks - self._bumped(code, state.day, day), day)
+
+    def postponed(self, day):
+        """Yesterday's weekly Draw, moved to day, if it is missing from an up-to-date calendar."""
+        yesterday = day - timedelta(days=1)
+        if self.last_day is None or self.last_day < yesterday - timedelta(days=1) or self.last_day >= day:
+            return None
+        draw = self.expected(yesterday)
+        if draw is None or draw.code in self.by_day.get(yesterday, {}):
+            return None
+        return Draw(draw.code, draw.number, day)
+
+    def due_bumpers(self, day):
+        """Bumper Draws that may be drawn on day: the next number of each code whose last
+        draw is within its bumper window (BUMPER_SLACK, BUMPER_LATE) before day."""
+        due = []
+        for code, state in self.codes.items():
+            if state.weekly or state.min_gap is None:
+                continue
+            gap = (day - state.day).days
+            if state.min_gap - BUMPER_SLACK <= gap <= state.max_gap * BUMPER_LATE:
+                due.append(Draw(code, state.number + 1, day, bumper=True))
+        return due
+
+    def draws_on(self, day):
+        """Expected draws on day: the weekly draw, a postponed one, then any bumper that is due."""
+        return [d for d in (self.expected(day), self.postponed(day)) if d] + self.due_bumpers(day)
+
+    def drawn_on(self, day):
+        """Keys of the draws added for day ("SS-498", ...)."""
+        return [f"{code}-{number}" for code, number in self.by_day.get(day, {}).items()]
+
+    def date_of(self, code, number):
+        """Date of a draw: when it was drawn if it was added, else projected from the
+        code's anchor onto its weekday. None for an unseen bumper draw."""
+        day = self.drawn.get(f"{code}-{number}")
+        if day is not None:
+            return day
+        state = self.codes.get(code)
+        if state is None or not state.weekly:
+            return None
+        day = state.day + timedelta(weeks=number - state.number)
+        # A postponed anchor is a day off the code's weekday
+        home = next((wd for wd in range(WEEK) if self.rotation(wd) == code), None)
+        if home is not None:
+            day += timedelta(days=(home - day.weekday() + 3) % WEEK - 3)
+        return day
+
+
+def expected_draws(day, manifest_path=MANIFEST_FILE):
+    """draws_on(day) of the calendar of manifest_path, or [] if it cannot be read."""
+    try:
+        return DrawCalendar.from_manifest(manifest_path).draws_on(day)
+    except Exception as e:
+        print(f"Could not load {manifest_path}: {e}")
+        return []
+
+
+def _draws(entries):
+    for entry in entries:
+        try:
+            yield date.fromisoformat(entry["date"]), int(entry["draw_number"]), entry["code"]
+        except (KeyError, TypeError, ValueError):
+            continue
+
+
+def backtest(entries):
+    """Replay manifest entries in date order, predicting each day's draws from the ones
+    before it. Returns (counts, misses). Whether a code is weekly or a bumper is taken
+    from the whole archive."""
+    days = {}
+    for day, number, code in sorted(_draws(entries)):
+        days.setdefault(day, []).append((code, number))
+    hindsight = DrawCalendar.from_entries(entries)
+    calendar = DrawCalendar()
+    stats = Counter()
+    misses = []
+    for day, draws in days.items():
+        expected = {d.key: d for d in calendar.draws_on(day)}
+        drawn = set()
+        for code, number in draws:
+            key = f"{code}-{number}"
+            if code not in calendar.codes:
+                stats["first draw"] += 1
+            elif key in calendar.drawn:
+                stats["duplicate"] += 1
+            else:
+                kind = "weekly" if hindsight.codes[code].weekly else "bumper"
+                stats[kind] += 1
+                if key in expected:
+                    stats[kind + " right"] += 1
+                else:
+                    misses.append(f"{day} {key} (expected {', '.join(expected) or 'nothing'})")
+                if kind == "bumper" and number == calendar.codes[code].number + 1:
+                    stats["bumper number right"] += 1
+            drawn.add(key)
+        for key, draw in expected.items():
+            kind = "bumper" if draw.bumper else "weekly"
+            stats[kind + " expected"] += 1
+            if key not in drawn:
+                stats[kind + " expected, not drawn"] += 1
+        for code, number in draws:
+            calendar.add(code, number, day)
+    return stats, misses
+
+
+def _percent(part, whole):
+    return f"{part}/{whole} ({100 * part / whole:.1f}%)" if whole else "0/0"
+
+
+if __name__ == "__main__":
+    entries = jsonio.load(MANIFEST_FILE)
+    start = time.perf_counter()
+    calendar = DrawCalendar.from_entries(entries)
+    built = time.perf_counter() - start
+    if "--backtest" in sys.argv:
+        stats, misses = backtest(entries)
+        print(f"Backtest over {len(calendar.drawn)} draws on {len(calendar.by_day)} days:")
+        print(f"  weekly draws expected on the day: {_percent(stats['weekly right'], stats['weekly'])}")
+        print(f"  bumpers expected on the day: {_percent(stats['bumper right'], stats['bumper'])}, "
+              f"draw number right: {_percent(stats['bumper number right'], stats['bumper'])}")
+        # Mostly gaps in the archive for weekly draws; days a due bumper was not drawn
+        print(f"  expected but not in the archive: weekly {_percent(stats['weekly expected, not drawn'], stats['weekly expected'])}, "
+              f"bumper {_percent(stats['bumper expected, not drawn'], stats['bumper expected'])}")
+        print(f"  first draws of a code (not predictable): {stats['first draw']}, duplicates: {stats['duplicate']}")
+        for miss in misses:
+            print(f"  miss: {miss}")
+        n = 10000
+        first = min(calendar.by_day)
+        start = time.perf_counter()
+        for i in range(n):
+            calendar.draws_on(first + timedelta(days=i))
+        lookup = (time.perf_counter() - start) / n
+        print(f"Built in {built * 1000:.1f} ms; draws_on() {lookup * 1e6:.1f} us per day")
+    else:
+        args = [a for a in sys.argv[1:] if not a.startswith("-")]
+        day = date.fromisoformat(args[0]) if args else date.today()
+        print("Rotation: " + ", ".join(f"{date(2024, 1, 1 + wd):%a} {calendar.rotation(wd)}" for wd in range(WEEK)))
+        for draw in calendar.draws_on(day):
+            print(f"{day} {draw.key}{' (bumper)' if draw.bumper else ''}: {draw.path}")
@@ -0,0 +1,193 @@
+"""Per-draw winner lookup tables, written next to every note file.
+
+lookup/KR-738-2026-01-10.json:
+  {"draw": "KR-738", "date": "2026-01-10",
+   "tiers": [["1st_prize", "1st Prize", 10000000, 1], ["consolation_prize", ...], ...],
+   "series": ["KM", "KA", ...], "districts": [...],
+   "parsed": [[[0, 0, "649494", -1]], [[0, 1, "649494", -1], ...], ..., []],
+   "six":  [["579575", 8, 2, -1], ["649494", 0, 0, -1], ...],
+   "four": [["0003", 9], ["0016", 7], ...]}
+
+The winners of the note are parsed once, when the table is written. Series codes and
+district names are interned per draw into "series" and "districts", and rows refer to
+them by index (-1 for none). "tiers" gives each tier's winner count; "parsed" holds, per
+tier, a [winner index, series, number, district] row (number null when the text holds
+none) for each winner that is not a bare "0487"/"649494", so readers such as
+generate-history.js take the numbers from the note and these rows without a regex.
+
+"six" holds the full-number winners as [number, series, tier index, district] sorted
+by number then series; "four" holds [last four digits, tier index] for the lower tiers,
+sorted. Entries PrizeTier.screen() rejects (amounts and years from the page, a six-digit
+number without its series, repeats) are left out of both. Keys are
+zero-padded strings so a client can binary-search either list with plain string
+comparison. The tables live outside note/ because every tool globs note/*.json.
+
+Usage: python draw_lookup.py            # (re)build lookup/ for every note file
+       python draw_lookup.py --check    # every note has an up-to-date table, and no table is orphaned
+"""
+import os
+import re
+import sys
+from bisect import bisect_left
+
+from note_files import NOTE_DIR
+from result_model import Draw, load_archive
+import jsonio
+
+LOOKUP_DIR = "lookup"
+
+NON_ALNUM_RE = re.compile(r"[^A-Z0-9]")
+TICKET_RE = re.compile(r"^([A-Z]{0,3})(\d{6}|\d{4})$")
+
+
+def normalize_ticket(ticket):
+    """("PA", "123456") for "pa-123 456", or None if it is not a ticket number."""
+    m = TICKET_RE.match(NON_ALNUM_RE.sub("", str(ticket).upper()))
+    return (m.group(1), m.group(2)) if m else None
+
+
+def lookup_path(note_path):
+    return os.path.join(LOOKUP_DIR, os.path.basename(note_path))
+
+
+class _Interned:
+    """Indexes of the strings of one table, in first-seen order."""
+    __slots__ = ("values", "ids")
+
+    def __init__(self):
+        self.values = []
+        self.ids = {}
+
+    def __call__(self, value):
+        if not value:
+            return -1
+        i = self.ids.get(value)
+        if i is None:
+            i = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return i
+
+
+def build_lookup(draw):
+    """Lookup table for one Draw."""
+    series, districts = _Interned(), _Interned()
+    tiers, parsed, six, four = [], [], set(), set()
+    for index, tier in enumerate(draw.tiers):
+        tiers.append([tier.key, tier.label, tier.amount, len(tier)])
+        rows = []
+        # Entries that are not winners (amounts, years, repeats; see PrizeTier.screen)
+        # are parsed like the rest but left out of the search lists
+        for i, (w, reason) in enumerate(zip(tier, tier.screen())):
+            if w.series or w.district or w.raw is not None:
+                rows.append([i, series(w.series), w.text or None, districts(w.district)])
+            if reason is not None:
+                continue
+            if w.digits == 6:
+                six.add((w.text, series(w.series), index, districts(w.district)))
+            else:
+                four.add((w.text, index))
+        parsed.append(rows)
+    return {
+        "draw": draw.draw_number,
+        "date": draw.draw_date,
+        "tiers": tiers,
+        "series": series.values,
+        "districts": districts.values,
+        "parsed": parsed,
+        "six": [list(row) for row in sorted(six)],
+        "four": [list(row) for row in sorted(four)],
+    }
+
+
+def tier_numbers(table, key, winners):
+    """Number text (or None) of each of a tier's winners from the table's parsed rows,
+    or None if the table does not have the tier with that many winners (it is stale)."""
+    for tier, rows in zip(table["tiers"], table["parsed"]):
+        if tier[0] == key:
+            if len(tier) < 4 or tier[3] != len(winners):
+                return None
+            numbers = list(winners)
+            for row in rows:
+                numbers[row[0]] = row[2]
+            return numbers
+    return None
+
+
+def _write_table(note_path, table):
+    os.makedirs(LOOKUP_DIR, exist_ok=True)
+    jsonio.dump(table, lookup_path(note_path), pretty=False)
+    return table
+
+
+def load_lookup(note_path):
+    """The lookup table of a note file, or None if it has none that can be read."""
+    try:
+        table = jsonio.load(lookup_path(note_path))
+    except (OSError, ValueError):
+        return None
+    return table if isinstance(table, dict) and "parsed" in table else None
+
+
+def write_lookup(note_path, data):
+    """Write the lookup table for a note file from its Draw or parsed dict. Returns the table."""
+    draw = data if isinstance(data, Draw) else Draw.from_dict(data)
+    return _write_table(note_path, build_lookup(draw))
+
+
+def check(lookup, ticket):
+    """Tier keys a ticket wins in one lookup table, by binary search. Reference client."""
+    parsed = normalize_ticket(ticket)
+    if not parsed:
+        return []
+    series, number = parsed
+    tiers = lookup["tiers"]
+    won = []
+    six = lookup["six"]
+    if len(number) == 6:
+        i = bisect_left(six, [number])
+        while i < len(six) and six[i][0] == number:
+            if six[i][1] < 0 or lookup["series"][six[i][1]] == series:
+                won.append(tiers[six[i][2]][0])
+            i += 1
+    four = lookup["four"]
+    suffix = number[-4:]
+    i = bisect_left(four, [suffix])
+    while i < len(four) and four[i][0] == suffix:
+        won.append(tiers[four[i][1]][0])
+        i += 1
+    return won
+
+
+def rebuild(note_dir=NOTE_DIR):
+    draws = load_archive(note_dir)
+    for name, draw in draws.items():
+        _write_table(name, build_lookup(draw))
+    print(f"Wrote {len(draws)} lookup tables to {LOOKUP_DIR}/")
+
+
+def coverage(note_dir=NOTE_DIR):
+    """Problems between lookup/ and the result notes, as (file name, problem) pairs:
+    a note without a table or with a stale one, or a table without a note. Files in
+    note_dir that are not *.json are not result notes and get no table."""
+    draws = load_archive(note_dir)
+    tables = set(os.listdir(LOOKUP_DIR)) if os.path.isdir(LOOKUP_DIR) else set()
+    problems = []
+    for name, draw in draws.items():
+        if name not in tables:
+            problems.append((name, "no lookup table"))
+        elif load_lookup(name) != build_lookup(draw):
+            problems.append((name, "stale lookup table"))
+    problems.extend((name, "lookup table without a note") for name in sorted(tables - set(draws)))
+    return problems
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if a != "--check"]
+    note_dir = args[0] if args else NOTE_DIR
+    if "--check" in sys.argv:
+        problems = coverage(note_dir)
+        for name, problem in problems:
+            print(f"  {name}: {problem}")
+        print(f"{len(problems)} problem(s) in {LOOKUP_DIR}/")
+        sys.exit(1 if problems else 0)
+    rebuild(note_dir)
@@ -2,8 +2,47 @@ const fs = require('fs');
 const path = require('path');
 
 const NOTE_DIR = path.join(__dirname, 'note');
+const LOOKUP_DIR = path.join(__dirname, 'lookup');
 const OUT_FILE = path.join(__dirname, 'history.json');
 
+// The lookup table written next to a note (see draw_lookup.py), or null
+function readLookup(fileName) {
+  try {
+    const table = JSON.parse(fs.readFileSync(path.join(LOOKUP_DIR, fileName), 'utf8'));
+    return table && Array.isArray(table.parsed) ? table : null;
+  } catch (e) {
+    return null;
+  }
+}
+
+// Ticket numbers of the given length in one prize tier. The lookup table has a parsed
+// [index, series, number, district] row for every winner that is not a bare number;
+// without a table, or with one that does not match the note, the number is pulled out
+// of the winner text.
+function tierNumbers(prize_key, winners, digits, lookup) {
+  const i = lookup ? lookup.tiers.findIndex(t => t[0] === prize_key) : -1;
+  if (i >= 0 && lookup.tiers[i][3] === winners.length) {
+    const numbers = winners.slice();
+    lookup.parsed[i].forEach(row => { numbers[row[0]] = row[2]; });
+    return numbers.filter(n => typeof n === 'string' && n.length === digits);
+  }
+  const re = digits === 4 ? /\b(\d{4})\b/ : /\b(\d{6})\b/;
+  const numbers = [];
+  winners.forEach(w => {
+    const m = String(w).match(re);
+    if (m) numbers.push(m[1]);
+  });
+  return numbers;
+}
+
+// Every tier of a current draw (9 or 10) is in and none shows the "Please wait"
+// placeholder; result_merge.is_complete in the Python tools
+const MIN_COMPLETE_TIERS = 9;
+function isComplete(entry) {
+  return entry.prizes.length >= MIN_COMPLETE_TIERS && entry.prizes.every(p =>
+    p.winners.length > 0 && !p.winners.some(w => String(w).toLowerCase().includes('please wait')));
+}
+
 function parseJsonFile(filePath, fileName) {
   const content = fs.readFileSync(filePath, 'utf8');
   let data;
@@ -32,6 +71,7 @@ function parseJsonFile(filePath, fileName) {
   // For prediction
   const numbers4 = new Set();
   const numbers6 = new Set();
+  const lookup = readLookup(fileName);
   if (data.prizes && typeof data.prizes === 'object') {
     for (const [prize_key, prize_obj] of Object.entries(data.prizes)) {
       prizes.push({
@@ -44,18 +84,12 @@ function parseJsonFile(filePath, fileName) {
       if (["4th_prize","5th_prize","6th_prize","7th_prize","8th_prize","9th_prize"].includes(prize_key)) {
         // 4-digit numbers
         if (Array.isArray(prize_obj.winners)) {
-          prize_obj.winners.forEach(w => {
-            const m = String(w).match(/\b(\d{4})\b/);
-            if (m) numbers4.add(m[1]);
-          });
+          tierNumbers(prize_key, prize_obj.winners, 4, lookup).forEach(n => numbers4.add(n));
         }
       } else if (["1st_prize","2nd_prize","3rd_prize","consolation_prize"].includes(prize_key)) {
         // 6-digit numbers
         if (Array.isArray(prize_obj.winners)) {
-          prize_obj.winners.forEach(w => {
-            const m = String(w).match(/\b(\d{6})\b/);
-            if (m) numbers6.add(m[1]);
-          });
+          tierNumbers(prize_key, prize_obj.winners, 6, lookup).forEach(n => numbers6.add(n));
         }
       }
     }
@@ -87,18 +121,33 @@ function main() {
       history.push(result);
     }
   }
+  // How often each lottery is drawn on each weekday, to pick the day's own draw below
+  const weekdayCodes = new Map();
+  const weekdayCode = e => `${new Date(e.date).getUTCDay()}-${e.lottery}`;
+  for (const entry of history) {
+    if (!isNaN(new Date(entry.date))) {
+      weekdayCodes.set(weekdayCode(entry), (weekdayCodes.get(weekdayCode(entry)) || 0) + 1);
+    }
+  }
   // Sort by date descending
   history.sort((a, b) => {
-    // Handle "Unknown-Date" entries by putting them at the end
-    if (a.date === "Unknown-Date" && b.date === "Unknown-Date") return 0;
-    if (a.date === "Unknown-Date") return 1;
-    if (b.date === "Unknown-Date") return -1;
+    // "Unknown-Date" and other unparseable dates (e.g. "13/07/2025") go to the end;
+    // a NaN from the subtraction below would leave the whole order undefined
+    const dateA = new Date(a.date);
+    const dateB = new Date(b.date);
+    if (isNaN(dateA) && isNaN(dateB)) return 0;
+    if (isNaN(dateA)) return 1;
+    if (isNaN(dateB)) return -1;
     
     // For regular dates, sort descending (newest first)
-    return new Date(b.date) - new Date(a.date);
+    if (dateB - dateA) return dateB - dateA;
+    // Same date: a complete result, then the lottery usually drawn on that weekday
+    // (not a postponed draw or a bumper), then file name order
+    return (isComplete(b) - isComplete(a)) ||
+      (weekdayCodes.get(weekdayCode(b)) - weekdayCodes.get(weekdayCode(a)));
   });
   
-  // Remove duplicate entries for the same date, keeping the most recent one
+  // Remove duplicate entries for the same date, keeping the first one sorted above
   const uniqueHistory = [];
   const seenDates = new Set();
   
@@ -111,7 +160,17 @@ function main() {
     uniqueHistory.push(entry);
   }
   
-  fs.writeFileSync(OUT_FILE, JSON.stringify(uniqueHistory, null, 2), 'utf8');
+  // Write to a temp file and rename so readers never see a half-written history
+  const tmpFile = `${OUT_FILE}.${process.pid}.tmp`;
+  // On disk before the rename: after a crash history.json is the old or the new file, never empty
+  const fd = fs.openSync(tmpFile, 'w');
+  try {
+    fs.writeFileSync(fd, JSON.stringify(uniqueHistory, null, 2), 'utf8');
+    fs.fsyncSync(fd);
+  } finally {
+    fs.closeSync(fd);
+  }
+  fs.renameSync(tmpFile, OUT_FILE);
   console.log(`Generated ${OUT_FILE} with ${uniqueHistory.length} draws.`);
 }
 
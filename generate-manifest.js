@@ -83,6 +83,16 @@ fs.readdir(NOTE_DIR, (err, files) => {
     uniqueManifest.push(entry);
   }
 
-  fs.writeFileSync(MANIFEST_FILE, JSON.stringify(uniqueManifest, null, 2));
+  // Write to a temp file and rename so readers never see a half-written manifest
+  const tmpFile = `${MANIFEST_FILE}.${process.pid}.tmp`;
+  // fsync before the rename, or a crash can leave the new name pointing at an empty file
+  const fd = fs.openSync(tmpFile, 'w');
+  try {
+    fs.writeFileSync(fd, JSON.stringify(uniqueManifest, null, 2), 'utf8');
+    fs.fsyncSync(fd);
+  } finally {
+    fs.closeSync(fd);
+  }
+  fs.renameSync(tmpFile, MANIFEST_FILE);
   console.log(`Manifest written to ${MANIFEST_FILE} with ${uniqueManifest.length} results.`);
 });
\ No newline at end of file
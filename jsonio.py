@@ -0,0 +1,129 @@
+"""JSON load/dump for note files, history and manifest, on the fastest installed backend.
+
+orjson or msgspec are used when installed (neither is required); otherwise the
+stdlib json module. LOTTERY_JSON_BACKEND=stdlib|orjson|msgspec forces one.
+
+Pretty output is byte-identical on every backend to
+json.dumps(obj, indent=2, ensure_ascii=False), and compact output to
+separators=(",", ":"). The one known difference is floats in exponent form
+(1e16 vs 1e+16), which none of our files contain.
+"""
+import os
+import json
+from typing import Dict, List, TypedDict
+
+from storage import atomic_write
+
+BACKENDS = ("orjson", "msgspec", "stdlib")
+
+_requested = os.environ.get("LOTTERY_JSON_BACKEND", "").lower()
+
+
+class PrizeSchema(TypedDict):
+    amount: int
+    label: str
+    winners: List[str]
+
+
+class _NoteRequired(TypedDict):
+    lottery_name: str
+    draw_number: str
+    draw_date: str
+    prizes: Dict[str, PrizeSchema]
+
+
+class NoteSchema(_NoteRequired, total=False):
+    venue: str
+    downloadLink: str
+    filename: str
+    github_url: str
+
+
+def _select_backend():
+    for name in BACKENDS:
+        if _requested and name != _requested:
+            continue
+        if name == "stdlib":
+            return name, None
+        try:
+            return name, __import__(name)
+        except ImportError:
+            if _requested:
+                print(f"{name} is not installed; using the stdlib json module")
+    return "stdlib", None
+
+
+BACKEND, _lib = _select_backend()
+if BACKEND == "msgspec":
+    import msgspec.json  # noqa: F401  (the submodule is not imported by "import msgspec")
+
+
+def _stdlib_dumps(obj, pretty):
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def dumps(obj, pretty=True):
+    """Serialize obj to UTF-8 bytes, 2-space indented when pretty."""
+    try:
+        if BACKEND == "orjson":
+            return _lib.dumps(obj, option=_lib.OPT_INDENT_2 if pretty else 0)
+        if BACKEND == "msgspec":
+            raw = _lib.json.encode(obj)
+            return _lib.json.format(raw, indent=2) if pretty else raw
+    except (TypeError, OverflowError, ValueError):
+        # e.g. non-string dict keys or ints beyond 64 bits; the stdlib handles those
+        pass
+    return _stdlib_dumps(obj, pretty)
+
+
+def loads(data):
+    """Parse JSON from bytes or str."""
+    if BACKEND == "orjson":
+        return _lib.loads(data)
+    if BACKEND == "msgspec":
+        return _lib.json.decode(data)
+    return json.loads(data)
+
+
+def load(path):
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+def dump(obj, path, pretty=True):
+    """Atomically replace path with obj. Returns the number of bytes written."""
+    return atomic_write(path, dumps(obj, pretty))
+
+
+def validate_note(data):
+    """Raise ValueError unless data has the shape of a note file (NoteSchema)."""
+    if BACKEND == "msgspec":
+        try:
+            _lib.convert(data, NoteSchema)
+        except _lib.ValidationError as e:
+            raise ValueError(f"invalid note file: {e}") from None
+        return
+    if not isinstance(data, dict):
+        raise ValueError("invalid note file: expected an object")
+    for key in NoteSchema.__annotations__:
+        if key not in data:
+            if key in NoteSchema.__required_keys__:
+                raise ValueError(f"invalid note file: missing {key}")
+            continue
+        expected = dict if key == "prizes" else str
+        if not isinstance(data[key], expected):
+            raise ValueError(f"invalid note file: {key} is {type(data[key]).__name__}")
+    for key, prize in data["prizes"].items():
+        if not (isinstance(prize, dict) and type(prize.get("amount")) is int
+                and isinstance(prize.get("label"), str) and isinstance(prize.get("winners"), list)
+                and all(isinstance(w, str) for w in prize["winners"])):
+            raise ValueError(f"invalid note file: bad prize tier {key}")
+
+
+def load_note(path):
+    """Load and validate a note file. Raises ValueError for malformed files."""
+    data = load(path)
+    validate_note(data)
+    return data
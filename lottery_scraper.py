@@ -6,6 +6,14 @@ import time
 from datetime import datetime
 import os
 
+from result_merge import write_merged
+from result_validator import validate_or_retry
+from result_page import parse_result_page
+from tracing import span
+from metrics import write_on_exit
+import snapshots
+from page_memo import PageMemo
+
 def get_last_n_result_links(n=50):
     MAIN_URL = "https://www.kllotteryresult.com/"
     links = []
@@ -25,8 +33,7 @@ def get_last_n_result_links(n=50):
                 if url in seen:
                     continue
                 try:
-                    page_res = requests.get(url)
-                    page_soup = BeautifulSoup(page_res.text, "html.parser")
+                    page_soup = pages.get(url)
                 except Exception:
                     continue
                 date_str = None
@@ -60,154 +67,49 @@ def get_last_n_result_links(n=50):
             next_url = None
     return links
 
-# Mappings
-prize_map = {
-    "1st": "1st_prize", "1st Prize": "1st_prize",
-    "Cons": "consolation_prize", "Cons Prize": "consolation_prize",
-    "Cons Prize-Rs": "consolation_prize", "Consolation": "consolation_prize",
-    "Consolation Prize": "consolation_prize", "2nd": "2nd_prize", "2nd Prize": "2nd_prize",
-    "3rd": "3rd_prize", "3rd Prize": "3rd_prize", "4th": "4th_prize", "4th Prize": "4th_prize",
-    "5th": "5th_prize", "5th Prize": "5th_prize", "6th": "6th_prize", "6th Prize": "6th_prize",
-    "7th": "7th_prize", "7th Prize": "7th_prize", "8th": "8th_prize", "8th Prize": "8th_prize",
-    "9th": "9th_prize", "9th Prize": "9th_prize"
-}
-prize_amounts = {
-    "1st_prize": 10000000, "consolation_prize": 5000, "2nd_prize": 3000000,
-    "3rd_prize": 500000, "4th_prize": 5000, "5th_prize": 2000,
-    "6th_prize": 1000, "7th_prize": 500, "8th_prize": 200, "9th_prize": 100
-}
-standard_labels = {
-    "1st_prize": "1st Prize", "consolation_prize": "Consolation Prize",
-    "2nd_prize": "2nd Prize", "3rd_prize": "3rd Prize", "4th_prize": "4th Prize",
-    "5th_prize": "5th Prize", "6th_prize": "6th Prize", "7th_prize": "7th_prize",
-    "8th_prize": "8th Prize", "9th_prize": "9th Prize"
-}
-
 def process_result_page(result_url):
-    try:
+    with span("process_result_page", url=result_url):
+        return _process_result_page(result_url)
+
+def fetch_result_soup(result_url):
+    with span("fetch", url=result_url) as s:
         result_res = requests.get(result_url)
-        result_soup = BeautifulSoup(result_res.text, "html.parser")
+        s.set("status", result_res.status_code)
+        s.set("bytes", len(result_res.content))
+    snapshots.store(result_url, result_res.text, "table")
+    return BeautifulSoup(result_res.text, "html.parser")
+
+# Result pages fetched this run: the link finder and process_result_page share them
+pages = PageMemo(fetch_result_soup)
+
+def _process_result_page(result_url):
+    try:
+        result_soup = pages.get(result_url)
     except Exception as e:
         print(f"Error fetching or parsing {result_url}: {e}")
         return
 
-    title_text = ""
-    title_tag = result_soup.find("h1")
-    if title_tag and title_tag.text.strip().lower() not in ["lottery results", "kerala lottery results"]:
-        title_text = title_tag.text.strip()
-    if not title_text:
-        title_tag = result_soup.find("title")
-        if title_tag and title_tag.text.strip():
-            title_text = title_tag.text.strip()
-    if not title_text:
-        for tag in ["h2", "h3"]:
-            t = result_soup.find(tag)
-            if t and t.text.strip():
-                title_text = t.text.strip()
-                break
-    if not title_text:
-        title_text = "Unknown Lottery"
-    print(f"Processing '{title_text}' from {result_url}")
-
-    date_match = re.search(r"(\d{2})[./-](\d{2})[./-](\d{4})", title_text)
-    draw_date = f"{date_match.group(3)}-{date_match.group(2)}-{date_match.group(1)}" if date_match else "Unknown-Date"
-
-    draw_number_match = re.search(r"\(([^)]+)\)", title_text)
-    draw_number = draw_number_match.group(1) if draw_number_match else "XX"
+    filepath, data = parse_result_page(result_soup, result_url)
 
-    lottery_name_match = re.search(r"([A-Za-z\s]+)\s*\(", title_text)
-    lottery_name = lottery_name_match.group(1).strip().upper() if lottery_name_match else "Unknown"
-    
-    # Extract lottery code from URL
-    lottery_code_match = re.search(r'/kerala-lottery-result-([A-Z]+)-', result_url)
-    lottery_code = lottery_code_match.group(1) if lottery_code_match else "XX"
-
-    # Try to extract venue
-    venue = ""
-    venue_tag = result_soup.find(string=re.compile(r"Venue|At", re.I))
-    if venue_tag and isinstance(venue_tag, str):
-        venue_line = venue_tag.strip()
-        venue_match = re.search(r"(?:Venue|At)[:\-]?\s*([A-Za-z0-9, .()]+)", venue_line)
-        if venue_match:
-            venue = venue_match.group(1).strip()
-
-    # Get download link
-    download_link = ""
-    for a_tag in result_soup.find_all("a", href=True):
-        href = a_tag["href"]
-        if any(href.lower().endswith(ext) for ext in [".pdf", ".jpg", ".jpeg", ".png"]):
-            if not href.startswith("http"):
-                href = "https://www.kllotteryresult.com" + href
-            download_link = href
-            break
-
-    prizes = {}
-    current_key = None
-    result_table = result_soup.find("table", class_="w-full")
-    if result_table and isinstance(result_table, Tag):
-        for row in result_table.find_all("tr"):
-            th = row.find("th")
-            if th:
-                label = th.get_text(strip=True)
-                key = None
-                for k, v in prize_map.items():
-                    if k in label:
-                        key = v
-                        break
-                if key:
-                    current_key = key
-                    prizes[current_key] = {
-                        "amount": prize_amounts.get(current_key, 0),
-                        "label": standard_labels.get(current_key, label),
-                        "winners": []
-                    }
-            tds = row.find_all("td")
-            if tds and current_key:
-                numbers = [td.get_text(strip=True) for td in tds if td.get_text(strip=True)]
-                prizes[current_key]["winners"].extend(numbers)
-
-    # If no prizes found, initialize with default structure
-    if not prizes:
-        for key, label in standard_labels.items():
-            prizes[key] = {
-                "amount": prize_amounts.get(key, 0),
-                "label": label,
-                "winners": ["Please wait, results will be published at 3 PM."]
-            }
-    else:
-        # Add "Please wait" message to any prize category that has no winners
-        for key, prize in prizes.items():
-            if not prize["winners"]:
-                prize["winners"].append("Please wait, results will be published at 3 PM.")
-
-    data = {
-        "lottery_name": lottery_name,
-        "draw_number": draw_number,
-        "draw_date": draw_date,
-        "venue": venue,
-        "prizes": prizes,
-        "downloadLink": download_link
-    }
+    # Check the parse before it can be published; a bad page is fetched once more
+    data, _ = validate_or_retry(data, lambda: parse_result_page(pages.refresh(result_url), result_url)[1],
+                                os.path.basename(filepath))
+    if data is None:
+        return []
 
     # Create note directory if it doesn't exist
     os.makedirs('note', exist_ok=True)
-    
-    # Generate filename in the correct format (e.g., SS-485-2025-09-16.json)
-    # Remove the duplicate lottery code from draw_number if present
-    clean_draw_number = draw_number
-    if draw_number.startswith(lottery_code + "-"):
-        clean_draw_number = draw_number[len(lottery_code) + 1:]
-    
-    filename = f"{lottery_code}-{clean_draw_number}-{draw_date}.json"
-    filepath = f"note/{filename}"
-    
+
     try:
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        print(f"Saved: {filepath}\n")
+        changed = write_merged(filepath, data)
+        if changed:
+            print(f"Saved: {filepath} (changed: {', '.join(changed)})\n")
+        else:
+            print(f"Unchanged: {filepath}\n")
+        return changed
     except Exception as e:
         print(f"Error saving {filepath}: {e}")
-
+        return []
 
 # --- MAIN EXECUTION ---
 # Define the list of URLs to process
@@ -295,10 +197,12 @@ urls_to_process = [
 ]
 
 # Process each URL
+write_on_exit()
 print("Starting to download lottery results...")
 for i, url in enumerate(urls_to_process, 1):
     print(f"Processing {i}/{len(urls_to_process)}: {url}")
     process_result_page(url)
     time.sleep(1)  # Be respectful to the server
 
-print("All lottery results have been downloaded to the 'note' folder.")
\ No newline at end of file
+print("All lottery results have been downloaded to the 'note' folder.")
+print(f"Pages fetched: {pages.loads}, saved by the page memo: {pages.hits}")
\ No newline at end of file
@@ -1,15 +1,61 @@
-import requests
-from bs4 import BeautifulSoup, Tag
-import json
 import re
 import time
 import os
 import subprocess
-from datetime import datetime, time as dt_time
-import pytz
+from datetime import datetime, timedelta, timezone, time as dt_time
 
-# Set Indian timezone
-IST = pytz.timezone('Asia/Kolkata')
+from result_merge import write_merged, is_complete
+from result_validator import validate_or_retry
+from result_sources import race_draw
+from draw_calendar import expected_draws
+from page_memo import PageMemo
+from result_page import parse_result_page
+from note_files import MANIFEST_FILE
+from tracing import span, profiled
+from metrics import write_on_exit
+import snapshots
+import jsonio
+
+# Set Indian timezone. IST has no DST, so a fixed offset is exact (and unlike
+# pytz.timezone it costs nothing at import)
+IST = timezone(timedelta(hours=5, minutes=30), "IST")
+
+BASE_URL = "https://www.kllotteryresult.com"
+
+# Number of HTTP requests made by this run (reported for the schedulers)
+request_count = 0
+
+# One session per process, so connections are kept alive between fetches (and
+# between runs in result_daemon)
+_session = None
+
+def http_session():
+    global _session
+    if _session is None:
+        import requests
+        _session = requests.Session()
+    return _session
+
+def fetch(url):
+    global request_count
+    request_count += 1
+    with span("fetch", url=url) as s:
+        res = http_session().get(url)
+        s.set("status", res.status_code)
+        s.set("bytes", len(res.content))
+    if res.status_code == 200:
+        snapshots.store(url, res.text, "table")
+    return res
+
+def load_page(url):
+    from bs4 import BeautifulSoup
+    res = fetch(url)
+    if res.status_code != 200:
+        raise IOError(f"{url} returned status {res.status_code}")
+    return BeautifulSoup(res.text, "html.parser")
+
+# Result pages fetched this run: the link finder and the processing loop share them
+pages = PageMemo(load_page)
 
 def is_within_optimal_time_window():
     """Check if current time is within the optimal result fetching window (2:45 PM - 5:30 PM IST)."""
@@ -19,13 +65,14 @@ def is_within_optimal_time_window():
     return start_time <= now <= end_time
 
 def get_last_n_result_links(n=10):
-    MAIN_URL = "https://www.kllotteryresult.com/"
+    MAIN_URL = BASE_URL + "/"
     links = []
     seen = set()
     next_url = MAIN_URL
     today = datetime.now().date()
+    from bs4 import BeautifulSoup, Tag
     while next_url and len(links) < n:
-        res = requests.get(next_url)
+        res = fetch(next_url)
         soup = BeautifulSoup(res.text, "html.parser")
         for a in soup.find_all("a", href=True):
             if re.search(r'/kerala-lottery-result-[A-Z]+-\d+', a['href']):
@@ -33,12 +80,11 @@ def get_last_n_result_links(n=10):
                 if not isinstance(url, str):
                     continue
                 if not url.startswith("http"):
-                    url = "https://www.kllotteryresult.com" + url
+                    url = BASE_URL + url
                 if url in seen:
                     continue
                 try:
-                    page_res = requests.get(url)
-                    page_soup = BeautifulSoup(page_res.text, "html.parser")
+                    page_soup = pages.get(url)
                 except Exception:
                     continue
                 date_str = None
@@ -80,7 +126,7 @@ def get_last_n_result_links(n=10):
         next_href = next_link.get('href') if isinstance(next_link, Tag) else None
         if next_href and isinstance(next_href, str) and len(links) < n:
             if not next_href.startswith("http"):
-                next_url = "https://www.kllotteryresult.com" + next_href
+                next_url = BASE_URL + next_href
             else:
                 next_url = next_href
             time.sleep(1)
@@ -88,154 +134,96 @@ def get_last_n_result_links(n=10):
             next_url = None
     return links
 
-# Mappings
-prize_map = {
-    "1st": "1st_prize", "1st Prize": "1st_prize",
-    "Cons": "consolation_prize", "Cons Prize": "consolation_prize",
-    "Cons Prize-Rs": "consolation_prize", "Consolation": "consolation_prize",
-    "Consolation Prize": "consolation_prize", "2nd": "2nd_prize", "2nd Prize": "2nd_prize",
-    "3rd": "3rd_prize", "3rd Prize": "3rd_prize", "4th": "4th_prize", "4th Prize": "4th_prize",
-    "5th": "5th_prize", "5th Prize": "5th_prize", "6th": "6th_prize", "6th Prize": "6th_prize",
-    "7th": "7th_prize", "7th Prize": "7th_prize", "8th": "8th_prize", "8th Prize": "8th_prize",
-    "9th": "9th_prize", "9th Prize": "9th_prize"
-}
-prize_amounts = {
-    "1st_prize": 10000000, "consolation_prize": 5000, "2nd_prize": 3000000,
-    "3rd_prize": 500000, "4th_prize": 5000, "5th_prize": 2000,
-    "6th_prize": 1000, "7th_prize": 500, "8th_prize": 200, "9th_prize": 100
-}
-standard_labels = {
-    "1st_prize": "1st Prize", "consolation_prize": "Consolation Prize",
-    "2nd_prize": "2nd Prize", "3rd_prize": "3rd Prize", "4th_prize": "4th Prize",
-    "5th_prize": "5th Prize", "6th_prize": "6th Prize", "7th_prize": "7th Prize",
-    "8th_prize": "8th Prize", "9th_prize": "9th Prize"
-}
+def todays_draws(today=None, manifest_path=MANIFEST_FILE):
+    """Today's expected draws from the draw calendar built from result_manifest.json:
+    the weekly draw, a postponed one and any bumper that is due."""
+    return expected_draws(today or datetime.now(IST).date(), manifest_path)
+
+def predict_todays_draw(today=None, manifest_path=MANIFEST_FILE):
+    """Guess today's weekly (lottery_code, draw_number) from the draw calendar."""
+    draws = [d for d in todays_draws(today, manifest_path) if not d.bumper]
+    return (draws[0].code, draws[0].number) if draws else None
+
+def note_complete(filepath):
+    try:
+        return is_complete(jsonio.load(filepath))
+    except (OSError, ValueError):
+        return False
+
+def fetch_todays_result(today=None):
+    """Fetch today's expected result pages directly; a due bumper only once the weekly
+    draw is complete. Returns True if today's weekly draw was processed (or already
+    complete)."""
+    global request_count
+    draws = todays_draws(today)
+    weekly = draws[0] if draws and not draws[0].bumper else None
+    done = False
+    for draw in draws:
+        if note_complete(f"note/{draw.filename}"):
+            print(f"Fast path: {draw.key} is already complete")
+            done = done or draw is weekly
+            continue
+        # Most days a bumper is due it is not drawn; race it once the weekly result is
+        # in rather than on every poll while that is still coming
+        if draw.bumper and weekly is not None and not note_complete(f"note/{weekly.filename}"):
+            print(f"Fast path: {draw.key} waits for {weekly.key}")
+            continue
+        # Race the configured result sources (see result_sources) for the expected draw
+        print(f"Fast path: racing sources for {draw.key}")
+        won = race_draw(draw.code, draw.number)
+        if won is None:
+            print(f"Fast path: no source has {draw.key} yet")
+            continue
+        request_count += won.requests
+        print(f"Fast path: {won.source} answered in {won.elapsed:.2f}s ({'complete' if won.complete else 'partial'})")
+        snapshots.store(won.url, won.html, won.parser)
+        save_note(f"note/{won.filename}", won.data)
+        done = done or draw is weekly
+    return done
 
 def process_result_page(result_soup, result_url):
-    title_text = ""
-    title_tag = result_soup.find("h1")
-    if title_tag and title_tag.text.strip().lower() not in ["lottery results", "kerala lottery results"]:
-        title_text = title_tag.text.strip()
-    if not title_text:
-        title_tag = result_soup.find("title")
-        if title_tag and title_tag.text.strip():
-            title_text = title_tag.text.strip()
-    if not title_text:
-        for tag in ["h2", "h3"]:
-            t = result_soup.find(tag)
-            if t and t.text.strip():
-                title_text = t.text.strip()
-                break
-    if not title_text:
-        title_text = "Unknown Lottery"
-    print(f"TITLE TEXT: '{title_text}'")
-
-    date_match = re.search(r"(\d{2})[./-](\d{2})[./-](\d{4})", title_text)
-    draw_date = f"{date_match.group(3)}-{date_match.group(2)}-{date_match.group(1)}" if date_match else "Unknown-Date"
-
-    draw_number_match = re.search(r"\(([^)]+)\)", title_text)
-    draw_number = draw_number_match.group(1) if draw_number_match else "XX"
-
-    lottery_name_match = re.search(r"([A-Za-z\s]+)\s*\(", title_text)
-    lottery_name = lottery_name_match.group(1).strip().upper() if lottery_name_match else "Unknown"
-    
-    # Extract lottery code from URL
-    lottery_code_match = re.search(r'/kerala-lottery-result-([A-Z]+)-', result_url)
-    lottery_code = lottery_code_match.group(1) if lottery_code_match else "XX"
-
-    # Try to extract venue
-    venue = ""
-    venue_tag = result_soup.find(string=re.compile(r"Venue|At", re.I))
-    if venue_tag and isinstance(venue_tag, str):
-        venue_line = venue_tag.strip()
-        venue_match = re.search(r"(?:Venue|At)[:\-]?\s*([A-Za-z0-9, .()]+)", venue_line)
-        if venue_match:
-            venue = venue_match.group(1).strip()
-
-    # Get download link
-    download_link = ""
-    for a_tag in result_soup.find_all("a", href=True):
-        href = a_tag["href"]
-        if any(href.lower().endswith(ext) for ext in [".pdf", ".jpg", ".jpeg", ".png"]):
-            if not href.startswith("http"):
-                href = "https://www.kllotteryresult.com" + href
-            download_link = href
-            break
-
-    prizes = {}
-    current_key = None
-    result_table = result_soup.find("table", class_="w-full")
-    if result_table and isinstance(result_table, Tag):
-        for row in result_table.find_all("tr"):
-            th = row.find("th")
-            if th:
-                label = th.get_text(strip=True)
-                key = None
-                for k, v in prize_map.items():
-                    if k in label:
-                        key = v
-                        break
-                if key:
-                    current_key = key
-                    prizes[current_key] = {
-                        "amount": prize_amounts.get(current_key, 0),
-                        "label": standard_labels.get(current_key, label),
-                        "winners": []
-                    }
-            tds = row.find_all("td")
-            if tds and current_key:
-                numbers = [td.get_text(strip=True) for td in tds if td.get_text(strip=True)]
-                prizes[current_key]["winners"].extend(numbers)
-
-    # If no prizes found, initialize with default structure
-    if not prizes:
-        for key, label in standard_labels.items():
-            prizes[key] = {
-                "amount": prize_amounts.get(key, 0),
-                "label": label,
-                "winners": ["Please wait, results will be published at 3 PM."]
-            }
-    else:
-        # Add "Please wait" message to any prize category that has no winners
-        for key, prize in prizes.items():
-            if not prize["winners"]:
-                prize["winners"].append("Please wait, results will be published at 3 PM.")
-
-    data = {
-        "lottery_name": lottery_name,
-        "draw_number": draw_number,
-        "draw_date": draw_date,
-        "venue": venue,
-        "prizes": prizes,
-        "downloadLink": download_link
-    }
+    with span("process_result_page", url=result_url):
+        return _process_result_page(result_soup, result_url)
+
+def refetch_result_page(result_url):
+    """Fetch and parse a result page again, for a retry after failed validation."""
+    return parse_result_page(pages.refresh(result_url), result_url)[1]
+
+def _process_result_page(result_soup, result_url):
+    filepath, data = parse_result_page(result_soup, result_url)
+
+    # Check the parse before it can be published; a bad page is fetched once more
+    data, _ = validate_or_retry(data, lambda: refetch_result_page(result_url), os.path.basename(filepath))
+    if data is None:
+        return []
+
+    return save_note(filepath, data)
 
+def save_note(filepath, data):
     # Create note directory if it doesn't exist
     os.makedirs('note', exist_ok=True)
     
-    # Generate filename in the correct format (e.g., SS-485-2025-09-16.json)
-    # Remove the duplicate lottery code from draw_number if present
-    clean_draw_number = draw_number
-    if draw_number.startswith(lottery_code + "-"):
-        clean_draw_number = draw_number[len(lottery_code) + 1:]
-    
-    filename = f"{lottery_code}-{clean_draw_number}-{draw_date}.json"
-    filepath = f"note/{filename}"
-    
     try:
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        print(f"Saved: {filepath}\n")
+        changed = write_merged(filepath, data)
+        if changed:
+            print(f"Saved: {filepath} (changed: {', '.join(changed)})\n")
+        else:
+            print(f"Unchanged: {filepath}\n")
+        return changed
     except Exception as e:
         print(f"Error saving {filepath}: {e}")
+        return []
 
 # --- MAIN EXECUTION ---
-if __name__ == "__main__":
+def run():
     # Check if we're within the optimal time window
     if not is_within_optimal_time_window():
         current_time = datetime.now(IST).strftime('%H:%M:%S')
         print(f"Current time {current_time} IST is outside the optimal window (2:45 PM - 5:30 PM).")
         print("The script will still attempt to fetch results, but they may be incomplete.")
+    elif fetch_todays_result():
+        print(f"Requests: {request_count}")
+        return
     
     latest_links = get_last_n_result_links(5)  # Get more results to find today's
     if latest_links:
@@ -243,11 +231,15 @@ if __name__ == "__main__":
         for i, result_url in enumerate(latest_links):
             print(f"Processing result {i+1}: {result_url}")
             try:
-                result_res = requests.get(result_url)
-                result_soup = BeautifulSoup(result_res.text, "html.parser")
-                process_result_page(result_soup, result_url)
+                process_result_page(pages.get(result_url), result_url)
             except Exception as e:
                 print(f"Error processing {result_url}: {e}")
                 continue
     else:
-        print("No recent results found.")
\ No newline at end of file
+        print("No recent results found.")
+    print(f"Requests: {request_count} ({pages.hits} saved by the page memo)")
+
+if __name__ == "__main__":
+    write_on_exit()
+    with profiled("main"):
+        run()
@@ -0,0 +1,100 @@
+"""recent.json and numbered manifest pages built from result_manifest.json.
+
+recent.json    the newest RECENT_COUNT draws with their full note data, plus the page table:
+               {"total": 279, "page_size": 50,
+                "pages": [{"page": 1, "count": 50, "from": "2025-05-02", "to": "2025-07-02", "hash": "..."}, ...],
+                "draws": [{"code": "KR", "draw_number": "738", "date": "2026-01-10",
+                           "filename": "KR-738-2026-01-10.json", "result": {...note file...}}, ...],
+                "bumpers": [{"code": "BR", "draw_number": "106", ...manifest entry...}, ...]}
+               "bumpers" lists every bumper draw (DrawCalendar), so the landing page can show
+               its bumper cards whatever page they are on.
+manifest/page-N.json
+               manifest entries numbered from the oldest draw, PAGE_SIZE per page, newest first
+               within a page. New draws only ever touch the last page, so a full page keeps
+               its URL and bytes; clients add ?h=<hash> from the page table to cache it for good.
+
+Landing pages need recent.json only; older pages are fetched on demand.
+
+Usage: python manifest_pages.py
+"""
+import os
+import re
+import hashlib
+
+from draw_calendar import DrawCalendar
+from note_files import NOTE_DIR, MANIFEST_FILE
+import jsonio
+from storage import write_if_changed
+
+RECENT_FILE = "recent.json"
+PAGES_DIR = "manifest"
+# One week of the daily draw rotation
+RECENT_COUNT = 7
+PAGE_SIZE = 50
+
+PAGE_NAME_RE = re.compile(r"^page-(\d+)\.json$")
+
+
+def page_name(page):
+    return f"page-{page}.json"
+
+
+def build_pages(manifest, page_size=PAGE_SIZE):
+    """[(page number, entries)] numbered from the oldest entry; manifest is newest first."""
+    oldest_first = list(reversed(manifest))
+    pages = []
+    for start in range(0, len(oldest_first), page_size):
+        chunk = oldest_first[start:start + page_size]
+        pages.append((len(pages) + 1, list(reversed(chunk))))
+    return pages
+
+
+def load_result(filename, note_dir=NOTE_DIR):
+    try:
+        return jsonio.load(os.path.join(note_dir, filename))
+    except Exception as e:
+        print(f"Could not read {filename}: {e}")
+        return None
+
+
+def write_pages(manifest_file=MANIFEST_FILE, recent_file=RECENT_FILE, pages_dir=PAGES_DIR,
+                note_dir=NOTE_DIR, recent_count=RECENT_COUNT, page_size=PAGE_SIZE):
+    """Write the manifest pages and recent.json. Returns the paths whose content changed."""
+    manifest = jsonio.load(manifest_file)
+    os.makedirs(pages_dir, exist_ok=True)
+    changed = []
+    table = []
+    pages = build_pages(manifest, page_size)
+    for page, entries in pages:
+        data = jsonio.dumps(entries, pretty=False)
+        path = os.path.join(pages_dir, page_name(page))
+        if write_if_changed(path, data):
+            changed.append(path)
+        table.append({
+            "page": page,
+            "count": len(entries),
+            "from": entries[-1].get("date", ""),
+            "to": entries[0].get("date", ""),
+            "hash": hashlib.sha256(data).hexdigest()[:12],
+        })
+    for name in os.listdir(pages_dir):
+        m = PAGE_NAME_RE.match(name)
+        if m and int(m.group(1)) > len(pages):
+            os.remove(os.path.join(pages_dir, name))
+            changed.append(os.path.join(pages_dir, name))
+
+    draws = []
+    for entry in manifest[:recent_count]:
+        draws.append(dict(entry, result=load_result(entry["filename"], note_dir)))
+    codes = DrawCalendar.from_entries(manifest).codes
+    bumpers = [e for e in manifest if e.get("code") in codes and not codes[e["code"]].weekly]
+    recent = {"total": len(manifest), "page_size": page_size, "pages": table, "draws": draws,
+              "bumpers": bumpers}
+    if write_if_changed(recent_file, jsonio.dumps(recent, pretty=False)):
+        changed.append(recent_file)
+    return changed
+
+
+if __name__ == "__main__":
+    changed = write_pages()
+    print(f"Manifest pages: {len(changed)} file(s) updated")
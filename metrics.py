@@ -0,0 +1,140 @@
+import os
+import sys
+import atexit
+import threading
+
+# Cron-style runs write their metrics here on exit (write_on_exit), one file per entry
+# point (e.g. metrics/updateloto.prom), for a node_exporter textfile collector or plain graphing
+METRICS_DIR = os.environ.get("LOTTERY_METRICS_DIR", "metrics")
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+_registry = []
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(n, "")) for n in self.label_names)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, key)} {value}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def remove(self, **labels):
+        with self._lock:
+            self._values.pop(self._key(labels), None)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total, n = self._values.get(key, ([0] * len(self.buckets), 0.0, 0))
+            counts = [c + (value <= b) for c, b in zip(counts, self.buckets)]
+            self._values[key] = (counts, total + value, n + 1)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            for key, (counts, total, n) in sorted(self._values.items()):
+                for bucket, count in zip(self.buckets, counts):
+                    lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, ('le', bucket))} {count}")
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, ('le', '+Inf'))} {n}")
+                lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {total}")
+                lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {n}")
+        return lines
+
+
+def render():
+    """All registered metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in _registry:
+        if metric._values:
+            lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def write_textfile(path=None):
+    """Write the current metrics to a .prom file (atomically, so a collector never sees half a file)."""
+    if not any(m._values for m in _registry):
+        return None
+    if path is None:
+        job = os.path.splitext(os.path.basename(sys.argv[0]))[0]
+        if not job or job.startswith("-"):
+            job = "python"
+        path = os.path.join(METRICS_DIR, f"{job}.prom")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(render())
+    os.replace(tmp, path)
+    return path
+
+
+def write_on_exit(path=None):
+    """Write the metrics file when the process exits. Called by the cron-style entry
+    points, not on import, so tests, benchmarks and pool workers write nothing."""
+    atexit.register(write_textfile, path)
+
+
+# --- Pipeline metrics ---
+FETCHES = Counter("lottery_fetch_total", "HTTP fetches of result pages by status code", ["status"])
+FETCH_BYTES = Counter("lottery_fetch_bytes_total", "Bytes downloaded from result sources")
+CACHE_HITS = Counter("lottery_fetch_cache_hits_total", "Fetches answered from a cache instead of the network")
+PARSE_FAILURES = Counter("lottery_parse_failures_total", "Result pages that could not be parsed")
+VALIDATION_ISSUES = Counter("lottery_validation_issues_total", "Problems found in parsed results before writing", ["check", "severity"])
+SOURCE_FETCHES = Counter("lottery_source_fetch_total", "Result source attempts in a race by outcome", ["source", "outcome"])
+SCRAPE_RETRIES = Counter("lottery_scrape_retries_total", "Result pages fetched again because the parse failed validation")
+# Only draws still coming in have a series; a complete draw's is removed
+PLACEHOLDERS = Gauge("lottery_placeholder_tiers", "Prize tiers still showing a placeholder", ["draw"])
+STAGE_SECONDS = Histogram("lottery_stage_seconds", "Pipeline stage latency", ["stage"])
+COMPLETE_AFTER_3PM = Gauge("lottery_complete_seconds_after_3pm", "Seconds after 15:00 IST when complete results were detected", ["date"])
+
+# --- Server metrics ---
+HTTP_SECONDS = Histogram("lottery_http_request_seconds", "download_server request latency", ["route", "status"])
@@ -0,0 +1,16 @@
+"""Where the archive lives and how its files are named.
+
+Every module that reads note/ or the indexes built from it takes these from here.
+"""
+import re
+
+NOTE_DIR = "note"
+MANIFEST_FILE = "result_manifest.json"
+HISTORY_FILE = "history.json"
+
+# In note/ but not results: the copy of the newest result and a stray manifest
+SKIP_FILES = ("latest.json", "result_manifest.json")
+
+# A result note, "KR-738-2026-01-10.json": code, draw number, draw date. The files
+# generate-manifest.js lists.
+NOTE_NAME_RE = re.compile(r"^([A-Z]{2,3})-(\d+)-(\d{4}-\d{2}-\d{2})\.json$")
@@ -0,0 +1,113 @@
+"""Static, paged listing of the note files for clients that browse the archive.
+
+listing/page-1.json, page-2.json, ... each hold
+  {"page": 1, "pages": 3, "total": 276, "page_size": 100,
+   "entries": [{"filename": "KR-738-2026-01-10.json", "code": "KR", "draw": "738",
+                "date": "2026-01-10", "size": 7421, "hash": "9f2c..."}, ...]}
+newest draw first. Page 1 is the entry point; a page is only rewritten when its
+content changes, so unchanged pages keep their bytes (and HTTP caches) across runs.
+
+Usage: python note_listing.py
+"""
+import os
+import re
+import hashlib
+
+from note_files import NOTE_DIR, SKIP_FILES
+import jsonio
+from storage import atomic_write
+
+LISTING_DIR = "listing"
+PAGE_SIZE = 100
+
+# Looser than note_files.NOTE_NAME_RE: the listing also splits "XX-XX-<date>.json"
+LISTING_NAME_RE = re.compile(r"^([A-Z]{2,3})-([^-]+)-(\d{4}-\d{2}-\d{2})\.json$")
+PAGE_NAME_RE = re.compile(r"^page-(\d+)\.json$")
+
+
+def page_name(page):
+    return f"page-{page}.json"
+
+
+def listing_entry(name, raw):
+    """The listing entry of note file name with content raw (bytes)."""
+    m = LISTING_NAME_RE.match(name)
+    return {
+        "filename": name,
+        "code": m.group(1) if m else "",
+        "draw": m.group(2) if m else "",
+        "date": m.group(3) if m else "",
+        "size": len(raw),
+        "hash": hashlib.sha256(raw).hexdigest()[:16],
+    }
+
+
+def sort_entries(entries):
+    entries.sort(key=lambda e: (e["date"], e["filename"]), reverse=True)
+    return entries
+
+
+def listing_entries(note_dir=NOTE_DIR):
+    """One entry per note file, newest draw first."""
+    entries = []
+    for name in os.listdir(note_dir):
+        if not name.endswith(".json") or name in SKIP_FILES:
+            continue
+        with open(os.path.join(note_dir, name), "rb") as f:
+            entries.append(listing_entry(name, f.read()))
+    return sort_entries(entries)
+
+
+def build_pages(entries, page_size=PAGE_SIZE):
+    pages = max(1, -(-len(entries) // page_size))
+    return [{
+        "page": page,
+        "pages": pages,
+        "total": len(entries),
+        "page_size": page_size,
+        "entries": entries[(page - 1) * page_size:page * page_size],
+    } for page in range(1, pages + 1)]
+
+
+def read_listing(listing_dir=LISTING_DIR):
+    """The entries of the listing pages on disk, newest first, or None if they are missing."""
+    entries = []
+    page = 1
+    try:
+        while True:
+            data = jsonio.load(os.path.join(listing_dir, page_name(page)))
+            entries.extend(data["entries"])
+            if page >= data["pages"]:
+                return entries
+            page += 1
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def write_listing(note_dir=NOTE_DIR, listing_dir=LISTING_DIR, page_size=PAGE_SIZE, entries=None):
+    """Write the listing pages and remove pages past the end. Returns the names written.
+
+    entries (newest first) saves reading every note file when the caller already
+    has them, e.g. from archive_index."""
+    os.makedirs(listing_dir, exist_ok=True)
+    pages = build_pages(listing_entries(note_dir) if entries is None else entries, page_size)
+    written = []
+    for page in pages:
+        path = os.path.join(listing_dir, page_name(page["page"]))
+        data = jsonio.dumps(page, pretty=False)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                if f.read() == data:
+                    continue
+        atomic_write(path, data)
+        written.append(page_name(page["page"]))
+    for name in os.listdir(listing_dir):
+        m = PAGE_NAME_RE.match(name)
+        if m and int(m.group(1)) > len(pages):
+            os.remove(os.path.join(listing_dir, name))
+    return written
+
+
+if __name__ == "__main__":
+    written = write_listing()
+    print(f"Listing: {len(written)} page(s) updated in {LISTING_DIR}/")
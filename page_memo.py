@@ -0,0 +1,104 @@
+"""Per-run memo of fetched pages: each URL is downloaded and parsed at most once.
+
+The scrapers look at a result page twice in one run (the link finder reads its date,
+then the page is processed). PageMemo(load) wraps the load(url) -> parsed page
+function both go through:
+
+  pages = PageMemo(load_soup)
+  soup = pages.get(url)        # loads on the first call, memoized afterwards
+
+Concurrent get() calls for the same URL share one load (the later callers wait for
+it). The newest MAX_PAGES results are kept (least recently used go first); a load
+that raises is not kept, so the next get() tries again. refresh(url) always loads
+anew, for retries that must not see the memoized copy. A long-running process keeps
+one memo across runs and prune()s the pages that may have changed since.
+"""
+import threading
+from collections import OrderedDict
+
+from metrics import CACHE_HITS
+
+# Enough for the longest link list a run walks (lottery_scraper's 50) plus index pages
+MAX_PAGES = 64
+
+
+class _Pending:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class PageMemo:
+    def __init__(self, load, maxsize=MAX_PAGES):
+        self.load = load
+        self.maxsize = maxsize
+        self.pages = OrderedDict()
+        self.pending = {}
+        self.lock = threading.Lock()
+        # Requests saved: answered from the memo or by joining a load in flight
+        self.hits = 0
+        self.loads = 0
+
+    def get(self, url):
+        with self.lock:
+            if url in self.pages:
+                self.pages.move_to_end(url)
+                self._hit()
+                return self.pages[url]
+            waiting = self.pending.get(url)
+            if waiting is None:
+                waiting = self.pending[url] = _Pending()
+                owner = True
+            else:
+                self._hit()
+                owner = False
+        if owner:
+            return self._load(url, waiting)
+        waiting.done.wait()
+        if waiting.error is not None:
+            raise waiting.error
+        return waiting.value
+
+    def refresh(self, url):
+        """Load url again, bypassing (and then replacing) the memoized copy."""
+        with self.lock:
+            self.pages.pop(url, None)
+        return self._load(url, _Pending())
+
+    def _hit(self):
+        self.hits += 1
+        CACHE_HITS.inc()
+
+    def _load(self, url, waiting):
+        try:
+            self.loads += 1
+            waiting.value = self.load(url)
+        except Exception as e:
+            waiting.error = e
+            raise
+        else:
+            with self.lock:
+                self.pages[url] = waiting.value
+                self.pages.move_to_end(url)
+                while len(self.pages) > self.maxsize:
+                    self.pages.popitem(last=False)
+        finally:
+            with self.lock:
+                if self.pending.get(url) is waiting:
+                    del self.pending[url]
+            waiting.done.set()
+        return waiting.value
+
+    def prune(self, keep):
+        """Forget every memoized page whose url keep(url) rejects."""
+        with self.lock:
+            for url in [u for u in self.pages if not keep(u)]:
+                del self.pages[url]
+
+    def clear(self):
+        with self.lock:
+            self.pages.clear()
+        self.hits = self.loads = 0
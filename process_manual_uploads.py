@@ -1,218 +1,312 @@
-import os
-import json
-import re
-from datetime import datetime
-from typing import Dict, Any, Optional
-
-def load_existing_manifest():
-    """Load existing manifest or create empty one."""
-    manifest_path = "result_manifest.json"
-    if os.path.exists(manifest_path):
-        try:
-            with open(manifest_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                # The manifest is a list, not a dict
-                return data
-        except Exception as e:
-            print(f"Error loading manifest: {e}")
-            return []
-    return []
-
-def load_existing_history():
-    """Load existing history or create empty one."""
-    history_path = "history.json"
-    if os.path.exists(history_path):
-        try:
-            with open(history_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                # The history is a list, not a dict with "draws" key
-                return data
-        except Exception as e:
-            print(f"Error loading history: {e}")
-            return []
-    return []
-
-def save_manifest(manifest):
-    """Save manifest to file."""
-    try:
-        with open("result_manifest.json", 'w', encoding='utf-8') as f:
-            # Save as a list directly, not as a dict with "results" key
-            json.dump(manifest, f, indent=2, ensure_ascii=False)
-        print("Manifest written successfully")
-    except Exception as e:
-        print(f"Error saving manifest: {e}")
-
-def save_history(history):
-    """Save history to file."""
-    try:
-        with open("history.json", 'w', encoding='utf-8') as f:
-            # Save as a list directly, not as a dict with "draws" key
-            json.dump(history, f, indent=2, ensure_ascii=False)
-        print("History written successfully")
-    except Exception as e:
-        print(f"Error saving history: {e}")
-
-def parse_filename(filename: str) -> Optional[Dict[str, str]]:
-    """Parse filename to extract lottery code, draw number, and date."""
-    # Expected format: XX-XXX-YYYY-MM-DD.json
-    pattern = r'^([A-Z]{2,3})-(\d+)-(\d{4}-\d{2}-\d{2})\.json$'
-    match = re.match(pattern, filename)
-    if match:
-        return {
-            "lottery_code": match.group(1),
-            "draw_number": match.group(2),
-            "date": match.group(3)
-        }
-    return None
-
-def process_manual_uploads():
-    """Process manually uploaded JSON files and update manifest/history."""
-    note_dir = "note"
-    if not os.path.exists(note_dir):
-        print("Note directory doesn't exist")
-        return
-    
-    # Load existing data
-    manifest = load_existing_manifest()
-    history = load_existing_history()
-    
-    # Get existing filenames in manifest to avoid duplicates
-    existing_files = {result["filename"] for result in manifest}
-    
-    # Process each JSON file in note directory
-    note_files = [f for f in os.listdir(note_dir) if f.endswith('.json') and f != 'latest.json']
-    
-    new_entries = []
-    for filename in note_files:
-        if filename in existing_files:
-            continue  # Skip existing entries
-            
-        filepath = os.path.join(note_dir, filename)
-        try:
-            # Parse filename
-            file_info = parse_filename(filename)
-            if not file_info:
-                print(f"Skipping invalid filename format: {filename}")
-                continue
-                
-            # Load file content
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # Create manifest entry
-            manifest_entry = {
-                "filename": filename,
-                "lottery_code": file_info["lottery_code"],
-                "draw_number": file_info["draw_number"],
-                "date": file_info["date"],
-                "title": f"{data.get('lottery_name', 'Unknown')} {file_info['lottery_code']}-{file_info['draw_number']}"
-            }
-            manifest.append(manifest_entry)
-            
-            # Create history entry (matching the structure from generate-history.js)
-            history_entry = {
-                "date": file_info["date"],
-                "lottery": data.get("lottery_name", "Unknown"),
-                "draw": file_info["draw_number"],
-                "filename": filename,
-                "github_url": f"https://raw.githubusercontent.com/santhkhd/kerala_loto/main/note/{filename}",
-                "prizes": [],
-                "numbers4": [],
-                "numbers6": [],
-                "downloadLink": data.get("downloadLink", "")
-            }
-            
-            # Add prize information
-            prizes = data.get("prizes", {})
-            for prize_key, prize_data in prizes.items():
-                # Debug: Check types
-                if not isinstance(prize_data, dict):
-                    print(f"ERROR: prize_data is not a dict! Type: {type(prize_data)}, Value: {prize_data}")
-                    continue
-                    
-                history_entry["prizes"].append({
-                    "prize_key": prize_key,
-                    "label": prize_data.get("label", prize_key),
-                    "amount": prize_data.get("amount", 0),
-                    "winners": prize_data.get("winners", [])
-                })
-            
-            history.append(history_entry)
-            new_entries.append(filename)
-            print(f"Processed: {filename}")
-            
-        except Exception as e:
-            print(f"Error processing {filename}: {e}")
-            import traceback
-            traceback.print_exc()
-    
-    if new_entries:
-        # Sort manifest by date (newest first)
-        manifest.sort(key=lambda x: x["date"], reverse=True)
-        
-        # Sort history by date (newest first)
-        history.sort(key=lambda x: x["date"], reverse=True)
-        
-        # Save updated files
-        save_manifest(manifest)
-        save_history(history)
-        
-        print(f"Added {len(new_entries)} new entries:")
-        for entry in new_entries:
-            print(f"  - {entry}")
-    else:
-        print("No new files to process")
-
-def update_latest_result():
-    """Update latest.json with the most recent result."""
-    note_dir = "note"
-    if not os.path.exists(note_dir):
-        print("Note directory doesn't exist")
-        return
-    
-    # Find the most recent file
-    note_files = [f for f in os.listdir(note_dir) if f.endswith('.json') and f != 'latest.json']
-    if not note_files:
-        print("No result files found")
-        return
-    
-    # Parse dates and sort
-    file_dates = []
-    for filename in note_files:
-        file_info = parse_filename(filename)
-        if file_info:
-            file_dates.append((filename, file_info["date"]))
-    
-    if not file_dates:
-        print("No valid files found")
-        return
-    
-    # Sort by date and get the most recent
-    file_dates.sort(key=lambda x: x[1], reverse=True)
-    latest_filename = file_dates[0][0]
-    
-    # Copy the latest file to latest.json
-    source_path = os.path.join(note_dir, latest_filename)
-    dest_path = os.path.join(note_dir, "latest.json")
-    
-    try:
-        with open(source_path, 'r', encoding='utf-8') as src:
-            data = json.load(src)
-        
-        with open(dest_path, 'w', encoding='utf-8') as dst:
-            json.dump(data, dst, indent=2, ensure_ascii=False)
-        
-        print(f"Updated latest.json with {latest_filename}")
-    except Exception as e:
-        print(f"Error updating latest.json: {e}")
-
-if __name__ == "__main__":
-    print("Processing manually uploaded JSON files...")
-    
-    # Process new files and update manifest/history
-    process_manual_uploads()
-    
-    # Update latest.json
-    update_latest_result()
-    
-    print("Processing complete!")
+"""Merge uploaded note files into the manifest, history, lookup tables and listing.
+
+Usage:
+  python process_manual_uploads.py                      # note files missing from the manifest
+  python process_manual_uploads.py --since <git rev>    # note files changed since a commit
+  python process_manual_uploads.py note/KR-738-2026-01-10.json ...
+  python process_manual_uploads.py --full               # rebuild from every note file
+
+The changed files are read, checked (result_validator) and given their lookup
+table on a process pool; their manifest and history entries (built like
+generate-manifest.js and generate-history.js, see archive_index) are then merged
+into result_manifest.json and history.json with one write each. Only the changed
+files are read, so a batch costs the same whatever the size of the archive.
+"""
+import os
+import sys
+import time
+import argparse
+import subprocess
+from datetime import date
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+from tracing import span, profiled
+from draw_lookup import write_lookup, lookup_path
+from result_validator import validate, errors, record_reports
+from archive_index import ArchiveIndex, manifest_entry, history_entry, build_manifest, build_history
+import jsonio
+from storage import pipeline_lock, write_if_changed
+from note_files import NOTE_DIR, MANIFEST_FILE, HISTORY_FILE, SKIP_FILES, NOTE_NAME_RE
+from note_listing import listing_entry, read_listing, sort_entries, write_listing
+from manifest_pages import write_pages
+
+LATEST_FILE = os.path.join(NOTE_DIR, "latest.json")
+
+# Below this many files per worker the pool costs more than it saves
+MIN_FILES_PER_WORKER = 8
+
+def load_existing_manifest():
+    """Load existing manifest or create empty one."""
+    manifest_path = MANIFEST_FILE
+    if os.path.exists(manifest_path):
+        try:
+            # The manifest is a list, not a dict
+            return jsonio.load(manifest_path)
+        except Exception as e:
+            print(f"Error loading manifest: {e}")
+            return []
+    return []
+
+def load_existing_history():
+    """Load existing history or create empty one."""
+    history_path = HISTORY_FILE
+    if os.path.exists(history_path):
+        try:
+            # The history is a list, not a dict with "draws" key
+            return jsonio.load(history_path)
+        except Exception as e:
+            print(f"Error loading history: {e}")
+            return []
+    return []
+
+def save_manifest(manifest):
+    """Save manifest to file. Returns True if it changed."""
+    with span("manifest", entries=len(manifest)) as s:
+        # Save as a list directly, not as a dict with "results" key
+        data = jsonio.dumps(manifest)
+        s.set("bytes", len(data))
+        return write_if_changed(MANIFEST_FILE, data)
+
+def save_history(history):
+    """Save history to file. Returns True if it changed."""
+    with span("history", entries=len(history)) as s:
+        # Save as a list directly, not as a dict with "draws" key
+        data = jsonio.dumps(history)
+        s.set("bytes", len(data))
+        return write_if_changed(HISTORY_FILE, data)
+
+def parse_filename(filename: str) -> Optional[Dict[str, str]]:
+    """Parse filename to extract lottery code, draw number, and date."""
+    match = NOTE_NAME_RE.match(filename)
+    if match:
+        return {
+            "lottery_code": match.group(1),
+            "draw_number": match.group(2),
+            "date": match.group(3)
+        }
+    return None
+
+def changed_since(rev):
+    """Note file names changed (added, modified or deleted) between rev and HEAD, or None if git cannot tell."""
+    try:
+        out = subprocess.run(["git", "diff", "--name-only", "--no-renames", rev, "HEAD", "--", NOTE_DIR],
+                             capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"Could not list the files changed since {rev}: {getattr(e, 'stderr', '') or e}")
+        return None
+    return [os.path.basename(p) for p in out.splitlines() if p.endswith(".json")]
+
+def new_files(manifest):
+    """Result files in note/ that the manifest does not list yet."""
+    listed = {entry["filename"] for entry in manifest}
+    return [f for f in os.listdir(NOTE_DIR) if parse_filename(f) and f not in listed]
+
+def due_entries(manifest, processed, today=None):
+    """Manifest entries of the unlisted note files dated today or earlier, other than
+    processed. build_manifest leaves out notes dated after today, so a note uploaded
+    ahead of its date is listed by the first run on or after that date. Reads only
+    the unlisted files (mostly prediction notes without prizes, which stay out)."""
+    today = (today or date.today()).isoformat()
+    entries = []
+    for filename in sorted(new_files(manifest)):
+        if filename in processed or parse_filename(filename)["date"] > today:
+            continue
+        try:
+            entry = manifest_entry(filename, jsonio.load(os.path.join(NOTE_DIR, filename)))
+        except (OSError, ValueError):
+            continue
+        if entry is not None:
+            entries.append(entry)
+    return entries
+
+def process_upload(filename):
+    """Worker: check and index one note file. Runs in a child process.
+
+    Returns {"filename", "raw", "data", "manifest", "history", "report", "error"}.
+    """
+    result = {"filename": filename, "raw": None, "data": None, "manifest": None,
+              "history": None, "report": None, "error": None}
+    filepath = os.path.join(NOTE_DIR, filename)
+    try:
+        with open(filepath, "rb") as f:
+            raw = f.read()
+        data = jsonio.loads(raw)
+        if not isinstance(data, dict) or not isinstance(data.get("prizes"), dict):
+            result["error"] = "not a result file"
+            return result
+        jsonio.validate_note(data)
+        # Prediction pages are uploaded before the draw with no prizes; nothing to check yet
+        if data["prizes"]:
+            result["report"] = validate(data, filename)
+        lookup = write_lookup(filepath, data)
+        result.update(raw=raw, data=data, manifest=manifest_entry(filename, data),
+                      history=history_entry(filename, data, lookup))
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+def pool_size(count, workers):
+    return max(1, min(workers, -(-count // MIN_FILES_PER_WORKER)))
+
+def process_all(filenames, workers):
+    """Yield process_upload() results, across a process pool for larger batches."""
+    workers = pool_size(len(filenames), workers)
+    if workers <= 1:
+        for filename in filenames:
+            yield process_upload(filename)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(process_upload, filenames, chunksize=max(1, len(filenames) // (workers * 4)))
+
+def merge_entries(existing, results, field):
+    """Existing manifest/history entries with those of the processed files replaced,
+    in file name order (the order the node generators read note/ in)."""
+    processed = {r["filename"] for r in results}
+    merged = {e["filename"]: e for e in existing if e["filename"] not in processed}
+    for r in results:
+        if r[field] is not None:
+            merged[r["filename"]] = r[field]
+    return [merged[name] for name in sorted(merged)]
+
+def update_latest_result(manifest, results):
+    """Point latest.json at the newest draw in the manifest: the newest note with prizes
+    dated today or earlier, whichever files were processed. Returns True if it changed."""
+    if not manifest:
+        print("No result files found")
+        return False
+    latest_filename = manifest[0]["filename"]
+    data = next((r["data"] for r in results if r["filename"] == latest_filename), None)
+    try:
+        if data is None:
+            data = jsonio.load(os.path.join(NOTE_DIR, latest_filename))
+        changed = write_if_changed(LATEST_FILE, jsonio.dumps(data))
+    except Exception as e:
+        print(f"Error updating latest.json: {e}")
+        return False
+    if changed:
+        print(f"Updated latest.json with {latest_filename}")
+    return changed
+
+def process_manual_uploads(filenames=None, workers=None):
+    """Process uploaded note files and merge them into manifest/history.
+
+    filenames: changed note file names; None processes the files missing from the manifest.
+    """
+    if not os.path.exists(NOTE_DIR):
+        print("Note directory doesn't exist")
+        return
+    workers = workers or os.cpu_count() or 1
+    timings = {}
+    start = time.perf_counter()
+
+    manifest = load_existing_manifest()
+    history = load_existing_history()
+    if filenames is None:
+        filenames = new_files(manifest)
+    filenames = sorted({os.path.basename(f) for f in filenames if f.endswith(".json")} - set(SKIP_FILES))
+    present = [f for f in filenames if os.path.exists(os.path.join(NOTE_DIR, f))]
+    removed = [f for f in filenames if f not in present]
+    if not filenames:
+        print("No new files to process")
+        return
+    timings["load"] = time.perf_counter() - start
+
+    # Read, check and index the changed files
+    mark = time.perf_counter()
+    results = list(process_all(present, workers))
+    results += [{"filename": f, "raw": None, "data": None, "manifest": None, "history": None,
+                 "report": None, "error": None} for f in removed]
+    timings["process"] = time.perf_counter() - mark
+
+    mark = time.perf_counter()
+    reports = [r["report"] for r in results if r["report"]]
+    if reports:
+        record_reports(reports)
+    timings["validate"] = time.perf_counter() - mark
+
+    # One merge and one write each for the manifest and history
+    mark = time.perf_counter()
+    index = None
+    if removed:
+        # A deleted file can uncover a same-date draw the history left out, so
+        # deletions rebuild from every note file
+        for filename in removed:
+            if os.path.exists(lookup_path(filename)):
+                os.remove(lookup_path(filename))
+        index = ArchiveIndex()
+        index.refresh()
+        manifest, history = index.manifest(), index.history()
+    else:
+        due = due_entries(manifest, {r["filename"] for r in results})
+        manifest = build_manifest(merge_entries(manifest + due, results, "manifest"))
+        history = build_history(merge_entries(history, results, "history"))
+    manifest_changed = save_manifest(manifest)
+    history_changed = save_history(history)
+    update_latest_result(manifest, results)
+    timings["merge"] = time.perf_counter() - mark
+
+    mark = time.perf_counter()
+    listing = read_listing() if index is None else index.listing()
+    if listing is None:
+        written = write_listing()
+    elif index is not None:
+        written = write_listing(entries=listing)
+    else:
+        processed = {r["filename"] for r in results}
+        listing = [e for e in listing if e["filename"] not in processed]
+        listing += [listing_entry(r["filename"], r["raw"]) for r in results if r["raw"] is not None]
+        written = write_listing(entries=sort_entries(listing))
+    print(f"Listing: {len(written)} page(s) updated")
+    print(f"Manifest pages: {len(write_pages())} file(s) updated")
+    timings["artifacts"] = time.perf_counter() - mark
+
+    elapsed = time.perf_counter() - start
+    failed = [r for r in results if r["error"]]
+    invalid = {r["filename"] for r in results if r["report"] and errors(r["report"])}
+    for r in results:
+        if r["error"]:
+            print(f"  skipped {r['filename']}: {r['error']}")
+        elif r["filename"] in removed:
+            print(f"  removed {r['filename']}")
+        else:
+            print(f"  processed {r['filename']}" + (" (failed validation, see validation_report.json)"
+                                                   if r["filename"] in invalid else ""))
+    print(f"{len(results)} file(s) in {elapsed:.2f}s with {pool_size(len(present), workers)} worker(s): "
+          f"{len(results) / elapsed:.0f} files/s; {len(failed)} skipped, {len(invalid)} failed validation, "
+          f"{len(removed)} removed; manifest {'updated' if manifest_changed else 'unchanged'}, "
+          f"history {'updated' if history_changed else 'unchanged'}")
+    print("  " + ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in timings.items()))
+
+def rebuild_all():
+    """Manifest, history, latest.json and listing from every note file."""
+    index = ArchiveIndex()
+    index.refresh()
+    written = index.write()
+    update_latest_result(index.manifest(), [])
+    print(f"Rebuilt from {len(index.records)} note files: {', '.join(written) or 'nothing changed'}")
+    print(f"Listing: {len(write_listing(entries=index.listing()))} page(s) updated")
+    print(f"Manifest pages: {len(write_pages())} file(s) updated")
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge uploaded note files into the manifest and history")
+    parser.add_argument("files", nargs="*", help="changed note files (default: files missing from the manifest)")
+    parser.add_argument("--since", help="process the note files changed since this git revision")
+    parser.add_argument("--full", action="store_true", help="rebuild everything from every note file")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    print("Processing manually uploaded JSON files...")
+    # The lock keeps a scheduler run from rewriting manifest/history underneath us
+    with profiled("process_manual_uploads"), pipeline_lock():
+        if args.full:
+            rebuild_all()
+        else:
+            filenames = args.files or None
+            if args.since and not filenames:
+                filenames = changed_since(args.since)
+            process_manual_uploads(filenames, args.workers)
+    print("Processing complete!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import os
+import re
+import time
+import logging
+import subprocess
+from datetime import datetime
+
+# Generated from the note folder on every publish (lookup/ is written next to each note),
+# and the raw page snapshots (snapshots.py) reparse.py rebuilds note/ from. The update
+# workflow stages the same paths.
+ARTIFACT_FILES = ["result_manifest.json", "history.json", "note/latest.json", "lookup", "listing", "manifest",
+                  "recent.json", "snapshots"]
+
+# Polls staged within this many seconds are squashed into one commit
+BATCH_WINDOW = 600
+
+_UNITS = {"bytes": 1, "B": 1, "KiB": 1024, "MiB": 1024 ** 2, "GiB": 1024 ** 3}
+
+
+def parse_transfer_bytes(output):
+    """Bytes reported by git's "Writing objects"/"Receiving objects" progress lines."""
+    total = 0
+    for m in re.finditer(r"(?:Writing|Receiving) objects: 100% \([^)]*\), ([\d.]+) (bytes|B|KiB|MiB|GiB)", output or ""):
+        total = max(total, int(float(m.group(1)) * _UNITS[m.group(2)]))
+    return total
+
+
+def git(*args, check=True):
+    return subprocess.run(['git'] + list(args), capture_output=True, text=True, check=check)
+
+
+def sync_clone(url, path, branch="main"):
+    """Reuse a shallow clone at path, fetching only new commits. Clones on first use."""
+    start = time.time()
+    if os.path.isdir(os.path.join(path, ".git")):
+        fetch = git('-C', path, 'fetch', '--depth', '1', '--progress', 'origin', branch)
+        git('-C', path, 'reset', '--hard', 'FETCH_HEAD')
+        output = fetch.stderr
+        action = "Fetched"
+    else:
+        clone = git('clone', '--depth', '1', '--branch', branch, '--progress', url, path)
+        output = clone.stderr
+        action = "Cloned"
+    logging.info(f"{action} {path} in {time.time() - start:.2f}s, {parse_transfer_bytes(output)} bytes received")
+
+
+class Publisher:
+    """Stages only the files the pipeline changed and batches them into one commit per window."""
+
+    def __init__(self, batch_window=BATCH_WINDOW, remote="origin"):
+        self.batch_window = batch_window
+        self.remote = remote
+        self.pending = set()
+        self.first_staged = None
+
+    def stage(self, paths):
+        paths = sorted({p.replace(os.sep, "/") for p in paths})
+        if not paths:
+            return
+        tracked = set(git('ls-files', '--', *paths).stdout.split())
+        paths = [p for p in paths if os.path.exists(p) or p in tracked]
+        if not paths:
+            return
+        git('add', '-A', '--', *paths)
+        self.pending.update(paths)
+        if self.first_staged is None:
+            self.first_staged = time.time()
+        logging.info(f"Staged {len(paths)} file(s): {', '.join(paths)}")
+
+    def due(self):
+        return bool(self.pending) and time.time() - self.first_staged >= self.batch_window
+
+    def ahead(self):
+        """Local commits the remote branch does not have yet (0 if it is not known)."""
+        res = git('rev-list', '--count', '@{u}..HEAD', check=False)
+        if res.returncode != 0:
+            # No upstream configured: the remote branch of the same name
+            branch = git('rev-parse', '--abbrev-ref', 'HEAD', check=False).stdout.strip()
+            res = git('rev-list', '--count', f'{self.remote}/{branch}..HEAD', check=False)
+        count = res.stdout.strip()
+        return int(count) if res.returncode == 0 and count.isdigit() else 0
+
+    def flush(self, message=None):
+        """Commit everything staged since the last flush and push it, along with any
+        earlier commits a failed push left behind. Pending paths are kept until the
+        push succeeds, so due() retries it on the next poll."""
+        start = time.time()
+        commit_time = 0.0
+        if git('diff', '--cached', '--quiet', check=False).returncode != 0:
+            message = message or f"Update lottery results - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+            git('commit', '-m', message)
+            commit_time = time.time() - start
+        ahead = self.ahead()
+        if not ahead:
+            if self.pending:
+                logging.info("No changes to commit")
+            self.pending = set()
+            self.first_staged = None
+            return False
+
+        push = git('push', '--progress', self.remote, 'HEAD', check=False)
+        total = time.time() - start
+        if push.returncode != 0:
+            logging.error(f"Git push failed, {ahead} commit(s) not pushed: {push.stderr.strip()}")
+            if self.first_staged is None:
+                self.first_staged = time.time()
+            return False
+        self.pending = set()
+        self.first_staged = None
+        logging.info(f"Published {ahead} commit(s) in {total:.2f}s (commit {commit_time:.2f}s), "
+                     f"{parse_transfer_bytes(push.stderr)} bytes sent")
+        return True
+
+    def publish(self, paths, message=None, force=False):
+        """Stage paths and flush if the batch window has elapsed (or force is set)."""
+        self.stage(paths)
+        if force or self.due():
+            return self.flush(message)
+        if self.pending:
+            logging.info(f"Batching {len(self.pending)} file(s) until the window closes")
+        return False
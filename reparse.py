@@ -0,0 +1,127 @@
+"""Rebuild note/ offline from the raw page snapshots, parsing on every core.
+
+Each snapshot is parsed with the parser it was fetched for (see snapshots.py), so a
+page main.py fetched gets main.py's prize amounts and winners. Snapshots stored
+before the parser was recorded are parsed with --legacy-parser.
+
+Usage:
+  python reparse.py [--workers N] [--overwrite] [--only SS-498 ...] [--legacy-parser table|text]
+  python reparse.py --bench            # parse-only speedup curve for 1, 2, 4 and 8 workers
+"""
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import updateloto
+import snapshots
+from result_sources import PARSERS
+from result_merge import write_merged
+from draw_lookup import write_lookup
+import jsonio
+from storage import pipeline_lock
+
+# Snapshots stored before the parser was recorded were all re-parsed with updateloto's
+LEGACY_PARSER = "text"
+
+
+def snapshot_tasks(root=snapshots.SNAPSHOT_DIR, only=None, legacy_parser=LEGACY_PARSER):
+    """(key, url, sha, parser, root) of the newest snapshot per draw, sorted in draw order."""
+    tasks = []
+    for key, versions in snapshots.load_index(root).items():
+        if only and key not in only:
+            continue
+        code, number = key.rsplit("-", 1)
+        newest = versions[-1]
+        tasks.append(((code, int(number)),
+                      (key, newest["url"], newest["sha"], newest.get("parser") or legacy_parser, root)))
+    tasks.sort()
+    return [task for _, task in tasks]
+
+
+def parse_snapshot(task):
+    """Worker: decompress and parse one snapshot. Runs in a child process.
+    Returns (key, (note filename, note dict) or None)."""
+    key, url, sha, parser, root = task
+    try:
+        return key, PARSERS[parser](snapshots.load(sha, root), url)
+    except Exception as e:
+        print(f"Error parsing {key}: {e}")
+        return key, None
+
+
+def parse_all(tasks, workers, chunksize=None):
+    """Yield (key, parsed) in the order of tasks, parsing across a process pool."""
+    if workers <= 1:
+        for task in tasks:
+            yield parse_snapshot(task)
+        return
+    chunksize = chunksize or max(1, len(tasks) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # map() hands out chunks of tasks and returns results in submission order
+        yield from pool.map(parse_snapshot, tasks, chunksize=chunksize)
+
+
+def write_note(filename, data, overwrite=False):
+    fpath = os.path.join(updateloto.NOTE_DIR, filename)
+    if overwrite:
+        jsonio.dump(data, fpath)
+        write_lookup(fpath, data)
+        return True
+    return bool(write_merged(fpath, data))
+
+
+def reparse(tasks, workers, overwrite=False):
+    os.makedirs(updateloto.NOTE_DIR, exist_ok=True)
+    written = failed = 0
+    start = time.perf_counter()
+    for key, parsed in parse_all(tasks, workers):
+        if not parsed:
+            failed += 1
+            continue
+        with pipeline_lock():
+            if write_note(*parsed, overwrite=overwrite):
+                written += 1
+    elapsed = time.perf_counter() - start
+    print(f"Re-parsed {len(tasks)} snapshots with {workers} worker(s) in {elapsed:.2f}s: "
+          f"{written} note files written, {failed} failed")
+
+
+def bench(tasks, worker_counts=(1, 2, 4, 8)):
+    """Parse-only timings for each worker count."""
+    base = None
+    print(f"{len(tasks)} snapshots, {os.cpu_count()} CPU(s)")
+    for workers in worker_counts:
+        start = time.perf_counter()
+        for _ in parse_all(tasks, workers):
+            pass
+        elapsed = time.perf_counter() - start
+        base = base or elapsed
+        print(f"  {workers} worker(s): {elapsed:7.2f}s  speedup {base / elapsed:4.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild note/ from raw page snapshots")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--snapshot-dir", default=snapshots.SNAPSHOT_DIR)
+    parser.add_argument("--only", nargs="+", help="draws to rebuild, e.g. SS-498 KR-731")
+    parser.add_argument("--overwrite", action="store_true", help="replace note files instead of merging into them")
+    parser.add_argument("--legacy-parser", choices=sorted(PARSERS), default=LEGACY_PARSER,
+                        help="parser for snapshots stored without one (default: %(default)s)")
+    parser.add_argument("--bench", action="store_true", help="report the speedup for 1, 2, 4 and 8 workers")
+    args = parser.parse_args()
+
+    tasks = snapshot_tasks(args.snapshot_dir, set(args.only) if args.only else None, args.legacy_parser)
+    if not tasks:
+        print(f"No snapshots in {args.snapshot_dir}/")
+        return 1
+    if args.bench:
+        bench(tasks)
+    else:
+        reparse(tasks, args.workers, args.overwrite)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
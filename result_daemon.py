@@ -0,0 +1,176 @@
+"""Long-running scheduler that keeps its state warm between ticks.
+
+`python auto_scheduler.py` starts lottery_scraper.py and the two node generators as
+subprocesses on every tick, so each tick imports everything again and rereads the
+whole note/ archive. `python auto_scheduler.py --daemon` runs the ticks in this
+process instead and keeps between them:
+  - an ArchiveIndex of note/ (manifest, history and listing entry per file), so a
+    tick rereads only the notes that changed;
+  - main.py's HTTP session (kept-alive connections) and page memo: pages of draws
+    whose note is complete stay memoized, the others are fetched again each tick.
+A tick scrapes with main.run() (fast path first, then the recent links), refreshes
+the index, writes the manifest, history, listing and manifest pages that changed
+and publishes the changed notes.
+
+Control, by POSIX signal (Windows has only Ctrl+C):
+  SIGUSR1          run a tick now
+  SIGHUP           reload: drop the warm state and rebuild it from disk
+  SIGTERM, SIGINT  finish the current tick, checkpoint and exit
+The index is checkpointed to STATE_FILE after every tick and at shutdown, so a
+restarted daemon rereads only the notes that changed while it was down.
+"""
+import time
+import signal
+import logging
+import threading
+
+import schedule
+
+import main
+from archive_index import ArchiveIndex
+from manifest_pages import write_pages
+from note_listing import write_listing
+from result_merge import load_changes, clear_changes
+from snapshots import draw_key
+from storage import pipeline_lock
+from tracing import span
+from metrics import STAGE_SECONDS, write_textfile
+
+STATE_FILE = "daemon_state.json"
+# Same times as auto_scheduler.run_scheduler
+TICK_TIMES = ("15:15", "15:30", "15:45", "16:15", "16:30")
+# Longest sleep between checks of the schedule
+MAX_IDLE = 60
+
+
+class ResultDaemon:
+    def __init__(self, publish=None, state_file=STATE_FILE, tick_times=TICK_TIMES):
+        self.publish = publish
+        self.state_file = state_file
+        self.tick_times = tick_times
+        self.index = ArchiveIndex.load(state_file)
+        self.wake = threading.Event()
+        self.tick_requested = False
+        self.reload_requested = False
+        self.stopping = False
+        self.ticks = 0
+
+    # --- control ---
+
+    def request_tick(self, *_):
+        self.tick_requested = True
+        self.wake.set()
+
+    def request_reload(self, *_):
+        self.reload_requested = True
+        self.wake.set()
+
+    def request_stop(self, *_):
+        self.stopping = True
+        self.wake.set()
+
+    def install_signal_handlers(self):
+        signal.signal(signal.SIGINT, self.request_stop)
+        signal.signal(signal.SIGTERM, self.request_stop)
+        if hasattr(signal, "SIGHUP"):
+            signal.signal(signal.SIGHUP, self.request_reload)
+            signal.signal(signal.SIGUSR1, self.request_tick)
+
+    # --- state ---
+
+    def reload(self):
+        """Forget the warm state and rebuild the index from note/."""
+        self.reload_requested = False
+        self.index = ArchiveIndex(self.index.note_dir)
+        main.pages.clear()
+        start = time.perf_counter()
+        self.index.refresh()
+        logging.info(f"Reloaded: indexed {len(self.index.records)} notes in {time.perf_counter() - start:.2f}s")
+
+    def checkpoint(self):
+        self.index.save(self.state_file)
+        write_textfile()
+
+    # --- work ---
+
+    def scrape(self):
+        # Complete results do not change; everything else may have moved on since the last tick
+        complete = self.index.complete_draws()
+        main.pages.prune(lambda url: draw_key(url) in complete)
+        main.request_count = 0
+        main.run()
+
+    def tick(self):
+        """One scrape and publish. Returns the changed note paths."""
+        self.tick_requested = False
+        self.ticks += 1
+        start = time.perf_counter()
+        with span("daemon_tick", tick=self.ticks) as s:
+            try:
+                self.scrape()
+            except Exception as e:
+                logging.error(f"Scrape failed: {e}")
+            with pipeline_lock():
+                # Also picks up notes written by manual uploads since the last tick
+                reread = self.index.refresh()
+                changes = load_changes()
+                s.set("reread", len(reread))
+                s.set("changed", len(changes))
+                if not changes:
+                    logging.info(f"Tick {self.ticks}: no result changes ({len(reread)} note(s) reread)")
+                else:
+                    logging.info(f"Tick {self.ticks}: changed results {changes}")
+                    self.write_artifacts()
+                    if self.publish is not None:
+                        self.publish(changes)
+                    clear_changes()
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage="daemon_tick")
+        self.checkpoint()
+        logging.info(f"Tick {self.ticks} done in {time.perf_counter() - start:.2f}s "
+                     f"({main.request_count} requests, {main.pages.hits} saved by the page memo)")
+        return changes
+
+    def write_artifacts(self):
+        with span("manifest_history"):
+            written = self.index.write()
+        with span("listing"):
+            listing = write_listing(entries=self.index.listing())
+        with span("manifest_pages"):
+            pages = write_pages()
+        logging.info(f"Artifacts: {', '.join(written) or 'manifest and history unchanged'}, "
+                     f"{len(listing)} listing page(s), {len(pages)} manifest page file(s)")
+
+    def run(self):
+        """Tick at tick_times (and on SIGUSR1) until stopped."""
+        start = time.perf_counter()
+        reread = self.index.refresh()
+        logging.info(f"Daemon started: {len(self.index.records)} notes indexed, {len(reread)} reread "
+                     f"in {time.perf_counter() - start:.2f}s")
+        jobs = schedule.Scheduler()
+        for at in self.tick_times:
+            jobs.every().day.at(at).do(self.request_tick)
+        logging.info(f"Ticks at {', '.join(self.tick_times)}; SIGUSR1 ticks now, SIGHUP reloads, SIGTERM stops")
+        self.tick_requested = True  # one initial check, like the plain scheduler
+        while not self.stopping:
+            # Cleared before the flags are read, so a signal from here on ends the wait
+            self.wake.clear()
+            if self.reload_requested:
+                self.reload()
+            jobs.run_pending()
+            if self.tick_requested:
+                try:
+                    self.tick()
+                except Exception as e:
+                    logging.error(f"Tick {self.ticks} failed: {e}")
+                continue
+            idle = jobs.idle_seconds
+            self.wake.wait(MAX_IDLE if idle is None else max(0, min(idle, MAX_IDLE)))
+        self.checkpoint()
+        logging.info(f"Daemon stopped after {self.ticks} tick(s); state saved to {self.state_file}")
+
+
+def run_daemon(publish=None):
+    daemon = ResultDaemon(publish)
+    daemon.install_signal_handlers()
+    daemon.run()
+    return daemon
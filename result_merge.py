@@ -0,0 +1,143 @@
+import os
+import json
+
+from tracing import span
+from metrics import PLACEHOLDERS
+from draw_lookup import write_lookup
+import jsonio
+from storage import atomic_write, pipeline_lock
+
+PLACEHOLDER_TEXT = "please wait"
+
+# Written by the scrapers, read by the schedulers to decide whether to regenerate and publish
+CHANGES_FILE = "pipeline_changes.json"
+
+# Metadata values the scrapers use when a field could not be parsed
+UNKNOWN_VALUES = ("", "XX", "Unknown", "Unknown-Date", "UNKNOWN", "UNKNOWN LOTTERY")
+
+
+def is_placeholder(winner):
+    return PLACEHOLDER_TEXT in str(winner).lower()
+
+
+def real_winners(prize):
+    """Winners of a prize tier without the "Please wait" placeholders."""
+    if not isinstance(prize, dict):
+        return []
+    return [w for w in prize.get("winners", []) if not is_placeholder(w)]
+
+
+# Pages fill in tier by tier, so a note that lists fewer tiers than every current draw
+# has (9 or 10) is still coming in
+MIN_COMPLETE_TIERS = 9
+
+
+def is_complete(data):
+    """A note's result is final: at least MIN_COMPLETE_TIERS tiers, each with its winners
+    and none still showing the "Please wait" placeholder. The one rule the scrapers, the
+    source race, the schedulers and the archive index use."""
+    prizes = data.get("prizes") if isinstance(data, dict) else None
+    if not isinstance(prizes, dict) or len(prizes) < MIN_COMPLETE_TIERS:
+        return False
+    for prize in prizes.values():
+        winners = prize.get("winners") if isinstance(prize, dict) else None
+        if not winners or any(is_placeholder(w) for w in winners):
+            return False
+    return True
+
+
+def merge_result(existing, new):
+    """Merge a freshly scraped result into the stored one, tier by tier.
+
+    Real winners are never replaced by placeholders or an empty tier.
+    Returns (merged, changed) where changed lists the tier keys and metadata
+    fields whose value differs from the stored result.
+    """
+    if not isinstance(existing, dict):
+        existing = {}
+    merged = dict(existing)
+    changed = []
+
+    for field, value in new.items():
+        if field == "prizes":
+            continue
+        if value in UNKNOWN_VALUES and existing.get(field) not in (None,) + UNKNOWN_VALUES:
+            continue
+        if existing.get(field) != value:
+            merged[field] = value
+            changed.append(field)
+
+    old_prizes = existing.get("prizes") if isinstance(existing.get("prizes"), dict) else {}
+    new_prizes = new.get("prizes") if isinstance(new.get("prizes"), dict) else {}
+    prizes = dict(old_prizes)
+    for key, prize in new_prizes.items():
+        old = old_prizes.get(key)
+        if not real_winners(prize) and real_winners(old):
+            continue
+        if old != prize:
+            prizes[key] = prize
+            changed.append(key)
+    merged["prizes"] = prizes
+    return merged, changed
+
+
+def load_note(filepath):
+    if not os.path.exists(filepath):
+        return None
+    try:
+        return jsonio.load_note(filepath)
+    except Exception as e:
+        print(f"Could not read existing {filepath}: {e}")
+        return None
+
+
+def write_merged(filepath, data):
+    """Merge data into the note file at filepath and write it only if something changed.
+
+    The draw's lookup table (see draw_lookup) is rewritten along with the note.
+    Returns the list of changed tiers/fields (empty when the file was left alone).
+    """
+    with pipeline_lock(), span("note_write", path=filepath) as s:
+        existing = load_note(filepath)
+        merged, changed = merge_result(existing, data)
+        pending = sum(1 for p in merged["prizes"].values() if not real_winners(p))
+        draw = os.path.splitext(os.path.basename(filepath))[0]
+        if pending:
+            PLACEHOLDERS.set(pending, draw=draw)
+        else:
+            PLACEHOLDERS.remove(draw=draw)
+        if existing is not None and not changed:
+            s.set("changed", 0)
+            return []
+        if existing is None:
+            changed = list(merged.get("prizes", {})) or ["prizes"]
+        s.set("bytes", jsonio.dump(merged, filepath))
+        write_lookup(filepath, merged)
+        s.set("changed", len(changed))
+        record_changes(filepath, changed)
+        return changed
+
+
+def load_changes():
+    """Return {note path: [changed tiers]} recorded since the last publish."""
+    if not os.path.exists(CHANGES_FILE):
+        return {}
+    try:
+        with open(CHANGES_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def record_changes(filepath, changed):
+    changes = load_changes()
+    tiers = changes.setdefault(filepath.replace(os.sep, "/"), [])
+    for key in changed:
+        if key not in tiers:
+            tiers.append(key)
+    atomic_write(CHANGES_FILE, json.dumps(changes, indent=2))
+
+
+def clear_changes():
+    if os.path.exists(CHANGES_FILE):
+        os.remove(CHANGES_FILE)
@@ -0,0 +1,103 @@
+import re
+
+# All patterns used on result pages, compiled once
+DATE_RE = re.compile(r"(\d{2})[./-](\d{2})[./-](\d{4})")
+PAREN_RE = re.compile(r"\(([^)]+)\)")
+NAME_RE = re.compile(r"([A-Za-z\s]+)\s*\(")
+URL_CODE_RE = re.compile(r"/kerala-lottery-result-([A-Z]+)-")
+VENUE_TEXT_RE = re.compile(r"Venue|At", re.I)
+VENUE_RE = re.compile(r"(?:Venue|At)[:\-]?\s*([A-Za-z0-9, .()]+)")
+
+# updateloto title handling
+DRAW_CODE_RE = re.compile(r"\(([A-Z]+)-(\d+)\)")
+TODAY_PREFIX_RE = re.compile(r"Kerala Lottery Result Today", re.IGNORECASE)
+ANY_DATE_RE = re.compile(r"\d+[./-]\d+[./-]\d+")
+ANY_PAREN_RE = re.compile(r"\([^\)]+\)")
+
+# updateloto winner lines
+SERIES_NUMBER_RE = re.compile(r"\b([A-Z]{1,3})[\s-]?(\d{6})\b", re.IGNORECASE)
+PLAIN_NUMBER_RE = re.compile(r"\b\d{4,6}\b")
+NON_ALNUM_RE = re.compile(r"[^A-Z0-9]")
+
+GENERIC_TITLES = ("lottery results", "kerala lottery results")
+
+CODE_NAMES = {
+    'SS': 'STHREE SAKTHI', 'DL': 'DHANALEKSHMI', 'AK': 'AKSHAYA',
+    'KR': 'KARUNYA', 'KN': 'KARUNYA PLUS', 'NR': 'NIRMAL', 'FF': 'FIFTY FIFTY',
+    'SK': 'SUVARNA KERALAM', 'BT': 'BHAGYATHARA', 'SM': 'SAMRUDHI'
+}
+
+
+def page_title(soup):
+    """Title text as main.process_result_page picks it: h1, then <title>, then h2/h3.
+
+    Each tag is only looked up if the previous one gave nothing; the headers sit at the
+    top of the page so every find() returns after a few nodes.
+    """
+    h1 = soup.find("h1")
+    if h1 and h1.text.strip().lower() not in GENERIC_TITLES:
+        return h1.text.strip()
+    title = soup.find("title")
+    if title and title.text.strip():
+        return title.text.strip()
+    for tag in ("h2", "h3"):
+        t = soup.find(tag)
+        if t and t.text.strip():
+            return t.text.strip()
+    return "Unknown Lottery"
+
+
+def page_venue(soup):
+    """Venue from the first text matching VENUE_TEXT_RE, as soup.find(string=...) picks it,
+    but only in the header: the walk stops at the result table (table.w-full) instead of
+    going through every winner and the rest of the page."""
+    for node in soup.descendants:
+        if node.name is None:
+            if VENUE_TEXT_RE.search(node):
+                m = VENUE_RE.search(node.strip())
+                return m.group(1).strip() if m else ""
+        elif node.name == "table" and "w-full" in (node.get("class") or ()):
+            break
+    return ""
+
+
+def extract_page_metadata(soup, result_url):
+    """Title, date, draw number, lottery name, code and venue of a result page."""
+    title_text = page_title(soup)
+
+    date_match = DATE_RE.search(title_text)
+    draw_number_match = PAREN_RE.search(title_text)
+    name_match = NAME_RE.search(title_text)
+    code_match = URL_CODE_RE.search(result_url)
+
+    return {
+        "title": title_text,
+        "draw_date": f"{date_match.group(3)}-{date_match.group(2)}-{date_match.group(1)}" if date_match else "Unknown-Date",
+        "draw_number": draw_number_match.group(1) if draw_number_match else "XX",
+        "lottery_name": name_match.group(1).strip().upper() if name_match else "Unknown",
+        "lottery_code": code_match.group(1) if code_match else "XX",
+        "venue": page_venue(soup),
+    }
+
+
+def extract_title_metadata(title_text):
+    """Code, draw number and lottery name from a <title> such as "... Sthree Sakthi (SS-498) 16.12.2025"."""
+    code = "XX"
+    number = None
+    draw_number = "XX"
+    m_draw = DRAW_CODE_RE.search(title_text)
+    if m_draw:
+        code = m_draw.group(1)
+        number = m_draw.group(2)
+        draw_number = f"{code}-{number}"
+
+    clean_title = TODAY_PREFIX_RE.sub('', title_text)
+    clean_title = ANY_DATE_RE.sub('', clean_title)
+    clean_title = ANY_PAREN_RE.sub('', clean_title)
+    clean_title = clean_title.replace('|', '').replace('-', '').strip()
+
+    lottery_name = clean_title.upper() if clean_title else "Unknown Lottery"
+    if lottery_name == "UNKNOWN LOTTERY" or len(lottery_name) < 3:
+        lottery_name = CODE_NAMES.get(code, lottery_name)
+
+    return {"code": code, "number": number, "draw_number": draw_number, "lottery_name": lottery_name}
@@ -0,0 +1,273 @@
+"""Typed, compact model of a draw result: Draw -> PrizeTier -> Winner.
+
+Winners are parsed once into an int number plus separate series and district
+fields instead of being carried around as "BA 274234 (IRINJALAKUDA)" strings;
+each tier keeps them in compact columns (see PrizeTier).
+The classes use __slots__ (not dataclass(slots=True), which needs Python 3.10;
+the manual-upload workflow runs 3.9).
+
+Note files keep the display strings only; the parsed form lives in memory (load_draw)
+and, per draw, in the lookup tables draw_lookup writes next to the note.
+
+to_dict() reproduces the note file it was loaded from: key order is kept and a
+winner whose text is not in the canonical "KA 649494 (KOLLAM)" / "0487" form
+keeps its original text.
+"""
+import os
+import re
+from array import array
+
+from note_files import NOTE_DIR, SKIP_FILES
+from result_metadata import SERIES_NUMBER_RE
+import jsonio
+
+# Canonical winner text: optional series, 4 or 6 digits, optional "(DISTRICT)"
+WINNER_RE = re.compile(r"^(?:([A-Z]{1,3}) )?(\d{6}|\d{4})(?: \(([^()]+)\))?$")
+NUMBER_RE = re.compile(r"\b(\d{6}|\d{4})\b")
+DISTRICT_RE = re.compile(r"\(\s*([^)]*?)\s*\)")
+
+# Tiers of full tickets; the lower tiers (4th prize on) list 4-digit endings, and
+# bumpers full tickets as well
+TOP_TIERS = ("1st_prize", "consolation_prize", "2nd_prize", "3rd_prize")
+# The endings of a lower tier are listed in ascending order (a few tiers in two runs).
+# Ascending runs shorter than this after the last longer one are text from below the
+# list - prize amounts, years - not winners.
+MIN_RUN = 3
+
+DRAW_FIELDS = ("lottery_name", "draw_number", "draw_date", "venue", "prizes", "downloadLink")
+
+# Note files use a handful of key orders; share one tuple per order
+_key_orders = {}
+
+
+class Winner:
+    __slots__ = ("number", "digits", "series", "district", "raw")
+
+    def __init__(self, number, digits=6, series="", district="", raw=None):
+        self.number = number        # int, or None if the text holds no ticket number
+        self.digits = digits        # 6 for full numbers, 4 for the lower-tier endings
+        self.series = series
+        self.district = district
+        self.raw = raw              # original text when it is not in canonical form
+
+    @classmethod
+    def parse(cls, text):
+        text = str(text)
+        m = WINNER_RE.match(text)
+        if m:
+            return cls(int(m.group(2)), len(m.group(2)), m.group(1) or "", m.group(3) or "")
+        district = DISTRICT_RE.search(text)
+        district = district.group(1).upper() if district else ""
+        m = SERIES_NUMBER_RE.search(text)
+        if m:
+            return cls(int(m.group(2)), 6, m.group(1).upper(), district, text)
+        m = NUMBER_RE.search(text)
+        if m:
+            return cls(int(m.group(1)), len(m.group(1)), "", district, text)
+        return cls(None, 0, "", "", text)
+
+    @property
+    def text(self):
+        """Number as zero-padded digits, e.g. "0487"."""
+        return f"{self.number:0{self.digits}d}" if self.number is not None else ""
+
+    def __str__(self):
+        if self.raw is not None:
+            return self.raw
+        s = f"{self.series} {self.text}" if self.series else self.text
+        return f"{s} ({self.district})" if self.district else s
+
+    def __repr__(self):
+        return f"Winner({str(self)!r})"
+
+
+class PrizeTier:
+    """One prize tier. Winners are stored column-wise and handed out as Winner objects.
+
+    numbers/digits are compact arrays; series and districts are only allocated for
+    tiers that have them (the 4th-9th prize tiers are bare four-digit endings), and
+    raw holds the original text of the few non-canonical winners by position.
+    """
+    __slots__ = ("key", "label", "amount", "numbers", "digits", "series", "districts", "raw")
+
+    def __init__(self, key, label="", amount=0, winners=()):
+        self.key = key
+        self.label = label
+        self.amount = amount
+        self.numbers = array("l")
+        self.digits = array("b")
+        self.series = None
+        self.districts = None
+        self.raw = None
+        for w in winners:
+            self.add(w)
+
+    def add(self, winner):
+        i = len(self.numbers)
+        self.numbers.append(winner.number if winner.number is not None else -1)
+        self.digits.append(winner.digits)
+        if winner.series and self.series is None:
+            self.series = [""] * i
+        if self.series is not None:
+            self.series.append(winner.series)
+        if winner.district and self.districts is None:
+            self.districts = [""] * i
+        if self.districts is not None:
+            self.districts.append(winner.district)
+        if winner.raw is not None:
+            if self.raw is None:
+                self.raw = {}
+            self.raw[i] = winner.raw
+
+    def __len__(self):
+        return len(self.numbers)
+
+    def __iter__(self):
+        series, districts, raw = self.series, self.districts, self.raw
+        for i, number in enumerate(self.numbers):
+            yield Winner(number if number >= 0 else None, self.digits[i],
+                         series[i] if series else "", districts[i] if districts else "",
+                         raw.get(i) if raw else None)
+
+    @property
+    def winners(self):
+        return list(self)
+
+    @classmethod
+    def from_dict(cls, key, data):
+        tier = cls(key, data.get("label", ""), data.get("amount", 0))
+        for text in data.get("winners", []):
+            # Bare "0487" / "649494" (nearly every winner) skip the regexes and the Winner
+            if isinstance(text, str) and len(text) in (4, 6) and text.isdigit() and text.isascii():
+                tier.numbers.append(int(text))
+                tier.digits.append(len(text))
+                if tier.series is not None:
+                    tier.series.append("")
+                if tier.districts is not None:
+                    tier.districts.append("")
+            else:
+                tier.add(Winner.parse(text))
+        return tier
+
+    def screen(self):
+        """Why each winner, by position, is not one a ticket can match: None for a winner,
+        else "malformed" (no ticket number, or a 6-digit number without its series),
+        "repeated" (a second copy of an entry) or "trailing" (an ending after the sorted
+        list of a lower tier, see MIN_RUN). result_validator reports the same entries.
+        """
+        winners = list(self)
+        end = len(winners) if self.key in TOP_TIERS else _endings_end(winners)
+        reasons = []
+        seen = set()
+        for i, w in enumerate(winners):
+            text = str(w)
+            if w.number is None or (w.digits == 6 and not w.series):
+                reasons.append("malformed")
+            elif i >= end and w.digits == 4:
+                reasons.append("trailing")
+            elif text in seen:
+                reasons.append("repeated")
+            else:
+                reasons.append(None)
+            seen.add(text)
+        return reasons
+
+    def to_dict(self):
+        return {"amount": self.amount, "label": self.label, "winners": [str(w) for w in self]}
+
+    def __repr__(self):
+        return f"PrizeTier({self.key!r}, amount={self.amount!r}, winners={len(self)})"
+
+
+def _endings_end(winners):
+    """Index after the last ascending run of at least MIN_RUN 4-digit endings, or
+    len(winners) when there is none."""
+    end = None
+    run, last = 0, -1
+    for i, w in enumerate(winners):
+        if w.digits != 4 or w.number is None:
+            continue
+        run = run + 1 if w.number > last else 1
+        last = w.number
+        if run >= MIN_RUN:
+            end = i + 1
+    return len(winners) if end is None else end
+
+
+class Draw:
+    __slots__ = ("lottery_name", "draw_number", "draw_date", "venue", "tiers", "download_link", "extra", "keys")
+
+    def __init__(self, lottery_name="", draw_number="", draw_date="", venue="", tiers=None,
+                 download_link="", extra=None, keys=DRAW_FIELDS):
+        self.lottery_name = lottery_name
+        self.draw_number = draw_number
+        self.draw_date = draw_date
+        self.venue = venue
+        self.tiers = tiers if tiers is not None else []
+        self.download_link = download_link
+        self.extra = extra          # other keys (filename, github_url) or None
+        self.keys = keys            # key order of the source file
+
+    @classmethod
+    def from_dict(cls, data):
+        prizes = data.get("prizes") if isinstance(data.get("prizes"), dict) else {}
+        extra = {k: v for k, v in data.items() if k not in DRAW_FIELDS} or None
+        keys = tuple(data)
+        return cls(data.get("lottery_name", ""), data.get("draw_number", ""), data.get("draw_date", ""),
+                   data.get("venue", ""),
+                   [PrizeTier.from_dict(k, p) for k, p in prizes.items() if isinstance(p, dict)],
+                   data.get("downloadLink", ""), extra, _key_orders.setdefault(keys, keys))
+
+    def to_dict(self):
+        values = {
+            "lottery_name": self.lottery_name,
+            "draw_number": self.draw_number,
+            "draw_date": self.draw_date,
+            "venue": self.venue,
+            "prizes": {t.key: t.to_dict() for t in self.tiers},
+            "downloadLink": self.download_link,
+        }
+        if self.extra:
+            values.update(self.extra)
+        out = {k: values[k] for k in self.keys if k in values}
+        for k, v in (self.extra or {}).items():
+            out.setdefault(k, v)
+        return out
+
+    def tier(self, key):
+        for t in self.tiers:
+            if t.key == key:
+                return t
+        return None
+
+    def __repr__(self):
+        return f"Draw({self.draw_number!r}, {self.draw_date!r}, tiers={len(self.tiers)})"
+
+
+def load_draw(path):
+    """Draw from a note file, or None if it is not a result. Raises ValueError for malformed notes."""
+    data = jsonio.load(path)
+    if not isinstance(data, dict):
+        return None
+    jsonio.validate_note(data)
+    return Draw.from_dict(data)
+
+
+def write_draw(path, draw):
+    jsonio.dump(draw.to_dict(), path)
+
+
+def load_archive(note_dir=NOTE_DIR):
+    """{filename: Draw} for every result file in note_dir."""
+    draws = {}
+    for name in sorted(os.listdir(note_dir)):
+        if not name.endswith(".json") or name in SKIP_FILES:
+            continue
+        try:
+            draw = load_draw(os.path.join(note_dir, name))
+        except Exception as e:
+            print(f"Skipping {name}: {e}")
+            continue
+        if draw is not None:
+            draws[name] = draw
+    return draws
@@ -0,0 +1,113 @@
+"""The result table parser shared by main.py, lottery_scraper.py and the "table"
+source adapter in result_sources.py.
+
+parse_result_page(soup, url) turns a kllotteryresult-style page (a table.w-full with
+one <th> per prize tier and the winners in <td>s) into (note path, note dict). It
+keeps no state, so it is safe to call from the source race's worker threads.
+"""
+from urllib.parse import urljoin
+
+from result_metadata import extract_page_metadata
+
+# Prize tier key by the text of its table heading, and the default amount and label per key
+prize_map = {
+    "1st": "1st_prize", "1st Prize": "1st_prize",
+    "Cons": "consolation_prize", "Cons Prize": "consolation_prize",
+    "Cons Prize-Rs": "consolation_prize", "Consolation": "consolation_prize",
+    "Consolation Prize": "consolation_prize", "2nd": "2nd_prize", "2nd Prize": "2nd_prize",
+    "3rd": "3rd_prize", "3rd Prize": "3rd_prize", "4th": "4th_prize", "4th Prize": "4th_prize",
+    "5th": "5th_prize", "5th Prize": "5th_prize", "6th": "6th_prize", "6th Prize": "6th_prize",
+    "7th": "7th_prize", "7th Prize": "7th_prize", "8th": "8th_prize", "8th Prize": "8th_prize",
+    "9th": "9th_prize", "9th Prize": "9th_prize"
+}
+prize_amounts = {
+    "1st_prize": 10000000, "consolation_prize": 5000, "2nd_prize": 3000000,
+    "3rd_prize": 500000, "4th_prize": 5000, "5th_prize": 2000,
+    "6th_prize": 1000, "7th_prize": 500, "8th_prize": 200, "9th_prize": 100
+}
+standard_labels = {
+    "1st_prize": "1st Prize", "consolation_prize": "Consolation Prize",
+    "2nd_prize": "2nd Prize", "3rd_prize": "3rd Prize", "4th_prize": "4th Prize",
+    "5th_prize": "5th Prize", "6th_prize": "6th Prize", "7th_prize": "7th Prize",
+    "8th_prize": "8th Prize", "9th_prize": "9th Prize"
+}
+
+
+def parse_result_page(result_soup, result_url):
+    """(note path, note dict) for a result page; result_url is the page's address."""
+    from bs4 import Tag
+    meta = extract_page_metadata(result_soup, result_url)
+    title_text = meta["title"]
+    print(f"TITLE TEXT: '{title_text}'")
+
+    draw_date = meta["draw_date"]
+    draw_number = meta["draw_number"]
+    lottery_name = meta["lottery_name"]
+    lottery_code = meta["lottery_code"]
+    venue = meta["venue"]
+
+    # Get download link
+    download_link = ""
+    for a_tag in result_soup.find_all("a", href=True):
+        href = a_tag["href"]
+        if any(href.lower().endswith(ext) for ext in [".pdf", ".jpg", ".jpeg", ".png"]):
+            # Relative links point at the site the page came from
+            download_link = urljoin(result_url, href)
+            break
+
+    prizes = {}
+    current_key = None
+    result_table = result_soup.find("table", class_="w-full")
+    if result_table and isinstance(result_table, Tag):
+        for row in result_table.find_all("tr"):
+            th = row.find("th")
+            if th:
+                label = th.get_text(strip=True)
+                key = None
+                for k, v in prize_map.items():
+                    if k in label:
+                        key = v
+                        break
+                if key:
+                    current_key = key
+                    prizes[current_key] = {
+                        "amount": prize_amounts.get(current_key, 0),
+                        "label": standard_labels.get(current_key, label),
+                        "winners": []
+                    }
+            tds = row.find_all("td")
+            if tds and current_key:
+                numbers = [td.get_text(strip=True) for td in tds if td.get_text(strip=True)]
+                prizes[current_key]["winners"].extend(numbers)
+
+    # If no prizes found, initialize with default structure
+    if not prizes:
+        for key, label in standard_labels.items():
+            prizes[key] = {
+                "amount": prize_amounts.get(key, 0),
+                "label": label,
+                "winners": ["Please wait, results will be published at 3 PM."]
+            }
+    else:
+        # Add "Please wait" message to any prize category that has no winners
+        for key, prize in prizes.items():
+            if not prize["winners"]:
+                prize["winners"].append("Please wait, results will be published at 3 PM.")
+
+    data = {
+        "lottery_name": lottery_name,
+        "draw_number": draw_number,
+        "draw_date": draw_date,
+        "venue": venue,
+        "prizes": prizes,
+        "downloadLink": download_link
+    }
+
+    # Generate filename in the correct format (e.g., SS-485-2025-09-16.json)
+    # Remove the duplicate lottery code from draw_number if present
+    clean_draw_number = draw_number
+    if draw_number.startswith(lottery_code + "-"):
+        clean_draw_number = draw_number[len(lottery_code) + 1:]
+    
+    filename = f"{lottery_code}-{clean_draw_number}-{draw_date}.json"
+    return f"note/{filename}", data
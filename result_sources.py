@@ -0,0 +1,251 @@
+"""Result sources: where a draw's result page can be fetched and how to parse it.
+
+A source is a site (base_url), the path of a draw's result page on it and a parser
+adapter that turns the page into (note filename, note dict). The sources come from
+SOURCES_FILE when it exists, e.g.
+
+  [{"name": "kllotteryresult", "base_url": "https://www.kllotteryresult.com", "parser": "table"},
+   {"name": "mirror", "base_url": "https://mirror.example", "parser": "text",
+    "path": "/results/{code}-{draw}"}]
+
+and DEFAULT_SOURCES otherwise. Parsers: "table" (result_page.py's result table parser) and
+"text" (updateloto.py's line-based parser).
+
+race_draw() fetches one draw from the best-ranked sources at once and returns the first
+result that is the requested draw, passes result_validator and has every tier filled;
+the other downloads are cancelled. When no source has a complete result, the fullest
+valid one wins once all have answered. Each attempt is scored in SCORES_FILE (success
+rate and latency per source), which ranks the sources on later runs.
+"""
+import os
+import time
+import queue
+import threading
+
+from metrics import SOURCE_FETCHES, STAGE_SECONDS
+from result_merge import is_complete
+from result_validator import validate, errors, record_reports, strip_invalid
+import jsonio
+from storage import atomic_write
+
+SOURCES_FILE = "sources.json"
+SCORES_FILE = "source_scores.json"
+
+DEFAULT_SOURCES = [
+    {"name": "kllotteryresult", "base_url": "https://www.kllotteryresult.com", "parser": "table"},
+]
+DEFAULT_PATH = "/kerala-lottery-result-{code}-{draw}"
+
+# Sources raced per draw; the rest are only tried when all of these fail
+RACE_WIDTH = 3
+# Per-request connect/read timeout and the deadline for the whole race, in seconds
+FETCH_TIMEOUT = 15
+RACE_TIMEOUT = 30
+CHUNK_SIZE = 16384
+# Weight of the newest sample in the latency average
+LATENCY_ALPHA = 0.3
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+}
+
+
+# --- Parser adapters: (html, url) -> (note filename, note dict), or None ---
+
+def parse_table(html, url):
+    from bs4 import BeautifulSoup
+    from result_page import parse_result_page
+    filepath, data = parse_result_page(BeautifulSoup(html, "html.parser"), url)
+    return os.path.basename(filepath), data
+
+
+def parse_text(html, url):
+    from updateloto import scrape_lottery_result
+    data = scrape_lottery_result(url, html)
+    return (data["filename"], data) if data else None
+
+
+PARSERS = {"table": parse_table, "text": parse_text}
+
+
+class Source:
+    __slots__ = ("name", "base_url", "path", "parser")
+
+    def __init__(self, name, base_url, parser="table", path=DEFAULT_PATH):
+        if parser not in PARSERS:
+            raise ValueError(f"source {name}: unknown parser {parser!r} (known: {', '.join(PARSERS)})")
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.path = path
+        self.parser = parser
+
+    def url_for(self, code, draw):
+        return self.base_url + self.path.format(code=code, draw=draw)
+
+    def parse(self, html, url):
+        return PARSERS[self.parser](html, url)
+
+    def __repr__(self):
+        return f"Source({self.name!r}, {self.base_url!r}, parser={self.parser!r})"
+
+
+def load_sources(path=SOURCES_FILE):
+    entries = DEFAULT_SOURCES
+    if os.path.exists(path):
+        entries = jsonio.load(path)
+    return [Source(**entry) for entry in entries]
+
+
+class Scoreboard:
+    """Per-source attempts, valid results, wins and average latency, kept in SCORES_FILE."""
+
+    def __init__(self, path=SCORES_FILE):
+        self.path = path
+        self.scores = {}
+        if path and os.path.exists(path):
+            try:
+                self.scores = jsonio.load(path)
+            except Exception:
+                self.scores = {}
+
+    def record(self, name, outcome, elapsed=None):
+        """outcome: "win", "valid" (usable but not first), "invalid", "error" or
+        "cancelled" (still loading when the race was decided; counts as a lost attempt)."""
+        s = self.scores.setdefault(name, {"attempts": 0, "valid": 0, "wins": 0, "latency": None})
+        s["attempts"] += 1
+        if outcome in ("win", "valid"):
+            s["valid"] += 1
+        if outcome == "win":
+            s["wins"] += 1
+        if elapsed is not None and outcome in ("win", "valid"):
+            old = s["latency"]
+            s["latency"] = round(elapsed if old is None else old + LATENCY_ALPHA * (elapsed - old), 3)
+
+    def rank(self, sources):
+        """Sources ordered by success rate, then latency. Untried sources go first."""
+        def key(source):
+            s = self.scores.get(source.name)
+            if not s or not s["attempts"]:
+                return (0, 0.0, 0.0)
+            latency = s["latency"] if s["latency"] is not None else FETCH_TIMEOUT
+            return (1, -s["valid"] / s["attempts"], latency)
+        return sorted(sources, key=key)
+
+    def save(self):
+        if self.path:
+            atomic_write(self.path, jsonio.dumps(self.scores))
+
+
+class RaceResult:
+    __slots__ = ("source", "parser", "url", "filename", "data", "html", "elapsed", "complete", "report", "requests")
+
+    def __init__(self, source, parser, url, filename, data, html, elapsed, complete, report):
+        self.source = source
+        self.parser = parser
+        self.url = url
+        self.filename = filename
+        self.data = data
+        self.html = html
+        self.elapsed = elapsed
+        self.complete = complete
+        self.report = report
+        self.requests = 0
+
+
+def _download(url, cancel, timeout):
+    """Page text, or None when cancel was set mid-download."""
+    import requests
+    with requests.get(url, headers=HEADERS, timeout=timeout, stream=True) as res:
+        if res.status_code != 200:
+            raise IOError(f"status {res.status_code}")
+        chunks = []
+        for chunk in res.iter_content(CHUNK_SIZE):
+            if cancel.is_set():
+                return None
+            chunks.append(chunk)
+        return b"".join(chunks).decode(res.encoding or "utf-8", errors="replace")
+
+
+def _attempt(source, code, draw, cancel, answers, timeout):
+    url = source.url_for(code, draw)
+    start = time.perf_counter()
+    try:
+        html = _download(url, cancel, timeout)
+        if html is None:
+            answers.put((source, "cancelled", None, time.perf_counter() - start))
+            return
+        parsed = source.parse(html, url)
+        elapsed = time.perf_counter() - start
+        if not parsed or not parsed[0].startswith(f"{code}-{draw}-"):
+            # Not published there yet, or a different draw's page
+            answers.put((source, "invalid", None, elapsed))
+            return
+        filename, data = parsed
+        data, _ = strip_invalid(data)
+        report = validate(data, filename)
+        if errors(report):
+            answers.put((source, "invalid", None, elapsed))
+            return
+        answers.put((source, "valid", RaceResult(source.name, source.parser, url, filename, data, html, elapsed,
+                                                 is_complete(data), report), elapsed))
+    except Exception as e:
+        print(f"Source {source.name} failed for {code}-{draw}: {e}")
+        answers.put((source, "error", None, time.perf_counter() - start))
+
+
+def race_draw(code, draw, sources=None, scoreboard=None, width=RACE_WIDTH,
+              timeout=FETCH_TIMEOUT, deadline=RACE_TIMEOUT):
+    """Fetch draw code-draw from several sources at once. Returns a RaceResult or None."""
+    sources = sources if sources is not None else load_sources()
+    scoreboard = scoreboard if scoreboard is not None else Scoreboard()
+    ranked = scoreboard.rank(sources)
+    best = None
+    requests_made = 0
+    start = time.perf_counter()
+    # The top `width` sources race; the rest are a fallback round if none of them answers
+    for batch in (ranked[:width], ranked[width:]):
+        if not batch or (best is not None):
+            continue
+        cancel = threading.Event()
+        answers = queue.Queue()
+        for source in batch:
+            # Daemon threads: a source that hangs past the race cannot hold up the run
+            threading.Thread(target=_attempt, args=(source, code, draw, cancel, answers, timeout),
+                             daemon=True).start()
+        requests_made += len(batch)
+        pending = {s.name for s in batch}
+        while pending:
+            remaining = deadline - (time.perf_counter() - start)
+            try:
+                source, outcome, result, elapsed = answers.get(timeout=max(remaining, 0))
+            except queue.Empty:
+                break
+            pending.discard(source.name)
+            SOURCE_FETCHES.inc(source=source.name, outcome=outcome)
+            if result is not None and (best is None or _better(result, best)):
+                if best is not None:
+                    scoreboard.record(best.source, "valid", best.elapsed)
+                best = result
+            elif outcome == "valid":
+                scoreboard.record(source.name, "valid", elapsed)
+            else:
+                scoreboard.record(source.name, outcome, elapsed)
+            if best is not None and best.complete:
+                break
+        cancel.set()
+        for name in pending:
+            scoreboard.record(name, "cancelled")
+            SOURCE_FETCHES.inc(source=name, outcome="cancelled")
+    STAGE_SECONDS.observe(time.perf_counter() - start, stage="source_race")
+    if best is not None:
+        scoreboard.record(best.source, "win", best.elapsed)
+        best.requests = requests_made
+        record_reports([dict(best.report, attempts=1, source=best.source)])
+    scoreboard.save()
+    return best
+
+
+def _better(result, best):
+    if result.complete != best.complete:
+        return result.complete
+    return result.report["winners"] > best.report["winners"]
@@ -0,0 +1,233 @@
+"""Checks on a freshly parsed result, run in memory before the note file is written.
+
+validate(data) looks at the scraped note dict only (no file reads) and returns a
+report:
+
+  {"draw": "SK-35-2026-01-09.json", "status": "error", "winners": 181,
+   "issues": [{"severity": "error", "check": "count", "tier": "2nd_prize",
+               "detail": "2 winners, expected 1"}, ...]}
+
+Checks:
+  tiers      the result has prize tiers at all
+  count      winners per tier against EXPECTED_COUNTS for the lottery code
+  format     each winner is a ticket ("KA 649494", optionally with a district, or a
+             4-digit ending), the endings of a lower tier end with their sorted list
+             (PrizeTier.screen) and a tier does not mix 6-digit tickets with endings
+  duplicate  a ticket appears once in its tier; a 4-digit ending wins one lower tier only
+Tiers still showing the "Please wait" placeholder are pending, not wrong, and are skipped.
+
+Every issue is an error: the page or the parse is broken. validate_or_retry() first
+strips the entries PrizeTier.screen() rejects (the result pages carry prize amounts
+and years below the last list, which the parsers pick up as winners), then fetches and
+parses the page once more if errors are left, and leaves the stored note alone if that
+fails too.
+
+Reports are kept per draw in REPORT_FILE; `python result_validator.py` checks the
+whole note/ archive and writes the same report.
+"""
+import os
+import re
+import sys
+import time
+from datetime import datetime
+
+from metrics import SCRAPE_RETRIES, VALIDATION_ISSUES
+from result_merge import is_placeholder
+from note_files import NOTE_DIR, SKIP_FILES
+from result_model import PrizeTier
+import jsonio
+from storage import atomic_write
+
+REPORT_FILE = "validation_report.json"
+
+WEEKLY_CODES = ("BT", "DL", "KN", "KR", "SK", "SM", "SS")
+
+# Winners per tier. Only the top tiers are fixed; the lower tiers change size with the
+# prize structure (e.g. 4th prize went 12 -> 20 -> 19 during 2025). 3rd prize had 12 or
+# 18 winners before June 2025. Consolation prize goes to every other series of the
+# first prize's block, which is 10 when a block has 11 series (SK-30: RN-RZ, no RQ/RS).
+WEEKLY_COUNTS = {"1st_prize": (1,), "consolation_prize": (10, 11), "2nd_prize": (1,), "3rd_prize": (1, 12, 18)}
+EXPECTED_COUNTS = {code: WEEKLY_COUNTS for code in WEEKLY_CODES}
+# Bumpers and unrecognised codes: one first prize, the rest varies per draw
+DEFAULT_COUNTS = {"1st_prize": (1,)}
+
+DRAW_CODE_RE = re.compile(r"^([A-Z]{1,3})-")
+
+
+def lottery_code(data):
+    m = DRAW_CODE_RE.match(str(data.get("draw_number", ""))) or DRAW_CODE_RE.match(str(data.get("filename", "")))
+    return m.group(1) if m else ""
+
+
+def draw_name(data):
+    if data.get("filename"):
+        return data["filename"]
+    return f"{data.get('draw_number', 'XX')}-{data.get('draw_date', 'Unknown-Date')}.json"
+
+
+def _issue(issues, severity, check, tier, detail):
+    issues.append({"severity": severity, "check": check, "tier": tier, "detail": detail})
+
+
+def validate(data, name=None):
+    """Report on one parsed result (a note dict). See the module docstring."""
+    issues = []
+    prizes = data.get("prizes") if isinstance(data, dict) else None
+    if not isinstance(prizes, dict) or not prizes:
+        _issue(issues, "error", "tiers", "", "no prize tiers")
+        prizes = {}
+    expected = EXPECTED_COUNTS.get(lottery_code(data), DEFAULT_COUNTS) if prizes else {}
+    endings = {}
+    total = 0
+    for key, prize in prizes.items():
+        winners = prize.get("winners", []) if isinstance(prize, dict) else []
+        if not winners or any(is_placeholder(w) for w in winners):
+            continue
+        total += len(winners)
+        if key in expected and len(winners) not in expected[key]:
+            allowed = " or ".join(map(str, expected[key]))
+            _issue(issues, "error", "count", key, f"{len(winners)} winners, expected {allowed}")
+
+        tier = PrizeTier.from_dict(key, prize)
+        found = {"malformed": [], "trailing": [], "repeated": []}
+        digits = set()
+        for w, reason in zip(tier, tier.screen()):
+            if reason is None:
+                digits.add(w.digits)
+            elif str(w) not in found[reason]:
+                found[reason].append(str(w))
+        if found["malformed"]:
+            _issue(issues, "error", "format", key,
+                   f"{len(found['malformed'])} malformed: {', '.join(found['malformed'][:5])}")
+        if found["trailing"]:
+            _issue(issues, "error", "format", key,
+                   f"after the sorted endings: {', '.join(found['trailing'][:5])}")
+        if len(digits) > 1:
+            _issue(issues, "error", "format", key, "mixes 6-digit tickets and 4-digit endings")
+        if found["repeated"]:
+            _issue(issues, "error", "duplicate", key, f"repeated: {', '.join(found['repeated'][:5])}")
+        for text in set(winners):
+            if isinstance(text, str) and len(text) == 4 and text.isdigit() and text not in found["trailing"]:
+                other = endings.setdefault(text, key)
+                if other != key:
+                    _issue(issues, "error", "duplicate", key, f"{text} also in {other}")
+
+    status = "ok"
+    if issues:
+        status = "error" if any(i["severity"] == "error" for i in issues) else "warning"
+    for i in issues:
+        VALIDATION_ISSUES.inc(check=i["check"], severity=i["severity"])
+    return {"draw": name or draw_name(data), "status": status, "winners": total, "issues": issues}
+
+
+def errors(report):
+    return [i for i in report["issues"] if i["severity"] == "error"]
+
+
+def load_reports(path=REPORT_FILE):
+    if not os.path.exists(path):
+        return {}
+    try:
+        return jsonio.load(path)
+    except Exception:
+        return {}
+
+
+def record_reports(reports, path=REPORT_FILE):
+    """Merge reports into REPORT_FILE, one entry per draw."""
+    stored = load_reports(path)
+    checked = datetime.now().isoformat(timespec="seconds")
+    for report in reports:
+        stored[report["draw"]] = dict(report, checked=checked)
+    atomic_write(path, jsonio.dumps(dict(sorted(stored.items()))))
+
+
+def strip_invalid(data):
+    """(data, dropped): a copy of data without the entries PrizeTier.screen() rejects,
+    and {tier: [entry, ...]} of what was dropped. data is returned as is when nothing is."""
+    prizes = data.get("prizes") if isinstance(data, dict) else None
+    if not isinstance(prizes, dict):
+        return data, {}
+    cleaned = {}
+    dropped = {}
+    for key, prize in prizes.items():
+        winners = prize.get("winners", []) if isinstance(prize, dict) else []
+        if not winners or any(is_placeholder(w) for w in winners):
+            continue
+        reasons = PrizeTier.from_dict(key, prize).screen()
+        if any(reasons):
+            dropped[key] = [str(w) for w, reason in zip(winners, reasons) if reason]
+            cleaned[key] = dict(prize, winners=[w for w, reason in zip(winners, reasons) if not reason])
+    if not cleaned:
+        return data, {}
+    prizes = {k: cleaned.get(k, p) for k, p in prizes.items()}
+    return {k: (prizes if k == "prizes" else v) for k, v in data.items()}, dropped
+
+
+def _stripped(data, name):
+    data, dropped = strip_invalid(data)
+    if dropped:
+        detail = "; ".join(f"{k} {', '.join(v[:5])}" for k, v in dropped.items())
+        print(f"Dropped entries that are not winners from {name or draw_name(data)}: {detail}")
+    return data
+
+
+def validate_or_retry(data, refetch=None, name=None):
+    """Strip the entries that are not winners (strip_invalid) and validate data; on errors
+    fetch and parse the page again once (refetch() returns a new note dict or None) and
+    keep whichever parse is better.
+
+    Returns (data, report). data is None when the result still has errors and must not
+    be written; the report is recorded either way.
+    """
+    data = _stripped(data, name)
+    report = validate(data, name)
+    report["attempts"] = 1
+    if errors(report) and refetch is not None:
+        SCRAPE_RETRIES.inc()
+        print(f"Validation failed for {report['draw']}: "
+              f"{'; '.join(i['tier'] + ' ' + i['detail'] for i in errors(report))}. Retrying...")
+        try:
+            retried = refetch()
+        except Exception as e:
+            print(f"Retry failed: {e}")
+            retried = None
+        if retried:
+            retried = _stripped(retried, name)
+            second = validate(retried, name)
+            if len(errors(second)) <= len(errors(report)):
+                data, report = retried, second
+            report["attempts"] = 2
+    record_reports([report])
+    if errors(report):
+        print(f"Not writing {report['draw']}: {'; '.join(i['tier'] + ' ' + i['detail'] for i in errors(report))}")
+        return None, report
+    return data, report
+
+
+def validate_archive(note_dir=NOTE_DIR):
+    """Reports for every note file in note_dir."""
+    reports = []
+    for name in sorted(os.listdir(note_dir)):
+        if not name.endswith(".json") or name in SKIP_FILES:
+            continue
+        try:
+            data = jsonio.load(os.path.join(note_dir, name))
+        except ValueError:
+            continue
+        if isinstance(data, dict):
+            reports.append(validate(data, name))
+    return reports
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    reports = validate_archive(sys.argv[1] if len(sys.argv) > 1 else NOTE_DIR)
+    elapsed = time.perf_counter() - start
+    record_reports(reports)
+    by_status = {s: sum(r["status"] == s for r in reports) for s in ("ok", "warning", "error")}
+    print(f"Validated {len(reports)} notes in {elapsed * 1000:.1f} ms "
+          f"({elapsed / max(len(reports), 1) * 1e6:.0f} us each, including the read): {by_status}")
+    for r in reports:
+        if r["status"] == "error":
+            print(f"  {r['draw']}: {'; '.join(i['tier'] + ' ' + i['detail'] for i in errors(r))}")
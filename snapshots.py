@@ -0,0 +1,87 @@
+"""Compressed, content-addressed snapshots of every fetched result page.
+
+Layout:
+  snapshots/objects/ab/abcdef....html.gz   raw page, named by the SHA-256 of its bytes
+  snapshots/index.json                     {"SS-498": [{"sha": ..., "url": ..., "fetched": ...,
+                                                        "parser": "table"}, ...]}
+
+Identical pages are stored once; each draw keeps the list of distinct versions it was
+fetched as (e.g. the partial and complete pages), newest last. "parser" names the
+result_sources parser the page was fetched for ("table": main.py and lottery_scraper.py,
+"text": updateloto.py), so reparse.py parses it the same way.
+"""
+import os
+import re
+import gzip
+import json
+import hashlib
+from datetime import datetime
+
+from storage import atomic_write, pipeline_lock
+
+SNAPSHOT_DIR = "snapshots"
+
+SLUG_RE = re.compile(r"kerala-lottery-result-([A-Za-z]+)-(\d+)")
+
+
+def draw_key(url):
+    """"SS-498" for a result page URL, or None for any other page."""
+    m = SLUG_RE.search(url)
+    return f"{m.group(1).upper()}-{m.group(2)}" if m else None
+
+
+def _object_path(sha, root=SNAPSHOT_DIR):
+    return os.path.join(root, "objects", sha[:2], sha + ".html.gz")
+
+
+def _index_path(root=SNAPSHOT_DIR):
+    return os.path.join(root, "index.json")
+
+
+def load_index(root=SNAPSHOT_DIR):
+    path = _index_path(root)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_index(index, root=SNAPSHOT_DIR):
+    atomic_write(_index_path(root), json.dumps(index, indent=1, sort_keys=True))
+
+
+def store(url, text, parser, root=SNAPSHOT_DIR):
+    """Snapshot a result page fetched for parser. Returns its SHA-256, or None if url is not a result page."""
+    key = draw_key(url)
+    if not key:
+        return None
+    raw = text.encode("utf-8")
+    sha = hashlib.sha256(raw).hexdigest()
+    path = _object_path(sha, root)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # mtime=0 keeps the compressed bytes stable for identical pages
+        atomic_write(path, gzip.compress(raw, compresslevel=9, mtime=0))
+
+    with pipeline_lock():
+        index = load_index(root)
+        versions = index.setdefault(key, [])
+        if not versions or (versions[-1]["sha"], versions[-1].get("parser")) != (sha, parser):
+            versions.append({"sha": sha, "url": url, "fetched": datetime.now().isoformat(timespec="seconds"),
+                             "parser": parser})
+            _save_index(index, root)
+    return sha
+
+
+def load(sha, root=SNAPSHOT_DIR):
+    with gzip.open(_object_path(sha, root), "rb") as f:
+        return f.read().decode("utf-8")
+
+
+def latest(key, root=SNAPSHOT_DIR, index=None):
+    """(url, html) of the newest snapshot of a draw, or None."""
+    index = index if index is not None else load_index(root)
+    versions = index.get(key)
+    if not versions:
+        return None
+    return versions[-1]["url"], load(versions[-1]["sha"], root)
@@ -0,0 +1,140 @@
+"""Crash-safe file writes and the lock that keeps pipeline runs from interleaving.
+
+atomic_write() writes to a temp file in the target's directory, fsyncs it and
+renames it over the target, so a timeout or crash leaves either the old file or
+the new one, never a truncated one. Readers that already opened the old file keep
+reading it; new readers see the new one.
+
+pipeline_lock() serializes the scheduler, cron and manual-upload runs that share
+one checkout. It is an OS file lock (fcntl on POSIX, msvcrt on Windows) on
+LOCK_FILE and is reentrant within a process.
+"""
+import os
+import time
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+LOCK_FILE = ".pipeline.lock"
+
+# A full scrape and publish finishes well within this
+LOCK_TIMEOUT = 600
+
+# mkstemp creates files 0600; give written files the usual permissions
+_umask = os.umask(0)
+os.umask(_umask)
+FILE_MODE = 0o666 & ~_umask
+
+_thread_lock = threading.RLock()
+_depth = 0
+_lock_file = None
+
+
+def _fsync_dir(directory):
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _replace(src, dst, attempts=5):
+    # On Windows the rename fails while another process has the target open
+    for attempt in range(attempts):
+        try:
+            os.replace(src, dst)
+            return
+        except PermissionError:
+            if os.name != "nt" or attempt == attempts - 1:
+                raise
+            time.sleep(0.1 * (attempt + 1))
+
+
+def atomic_write(path, data):
+    """Replace path with data (bytes or str, written as UTF-8) in one rename."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix="." + os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp, FILE_MODE)
+        _replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    _fsync_dir(directory)
+    return len(data)
+
+
+def write_if_changed(path, data):
+    """atomic_write unless path already holds exactly data. Returns True if written."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return False
+    atomic_write(path, data)
+    return True
+
+
+def _try_lock(f):
+    try:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def _unlock(f):
+    if fcntl:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def pipeline_lock(timeout=LOCK_TIMEOUT, path=LOCK_FILE):
+    """Hold the pipeline lock for the duration of the block. Raises TimeoutError."""
+    global _depth, _lock_file
+    with _thread_lock:
+        if _depth == 0:
+            f = open(path, "a+")
+            deadline = time.monotonic() + timeout
+            waited = False
+            while not _try_lock(f):
+                if time.monotonic() >= deadline:
+                    f.close()
+                    raise TimeoutError(f"{path} is held by another run")
+                if not waited:
+                    print(f"Waiting for {path} held by another run...")
+                    waited = True
+                time.sleep(0.5)
+            _lock_file = f
+        _depth += 1
+        try:
+            yield
+        finally:
+            _depth -= 1
+            if _depth == 0:
+                _unlock(_lock_file)
+                _lock_file.close()
+                _lock_file = None
@@ -0,0 +1,49 @@
+import io
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import contextlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import jsonio
+import draw_lookup
+
+
+class CoverageTest(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.work = tempfile.mkdtemp(prefix="test_lookup_")
+        shutil.copytree(os.path.join(ROOT, "note"), os.path.join(self.work, "note"))
+        shutil.copytree(os.path.join(ROOT, "lookup"), os.path.join(self.work, "lookup"))
+        os.chdir(self.work)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.work, ignore_errors=True)
+
+    def coverage(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return draw_lookup.coverage()
+
+    def test_every_result_note_has_its_table(self):
+        self.assertEqual(self.coverage(), [])
+
+    def test_missing_stale_and_orphaned_tables(self):
+        os.remove(os.path.join("lookup", "SK-30-2025-12-05.json"))
+        table = jsonio.load(os.path.join("lookup", "KR-738-2026-01-10.json"))
+        table["tiers"][0][3] += 1
+        jsonio.dump(table, os.path.join("lookup", "KR-738-2026-01-10.json"), pretty=False)
+        os.rename(os.path.join("note", "SM-37-2026-01-11.json"), os.path.join("note", "SM-37-2026-01-11"))
+        self.assertEqual(self.coverage(), [
+            ("KR-738-2026-01-10.json", "stale lookup table"),
+            ("SK-30-2025-12-05.json", "no lookup table"),
+            ("SM-37-2026-01-11.json", "lookup table without a note"),
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import io
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import contextlib
+from datetime import date
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import jsonio
+import process_manual_uploads as uploads
+from archive_index import ArchiveIndex
+
+
+class DueEntriesTest(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.work = tempfile.mkdtemp(prefix="test_uploads_")
+        shutil.copytree(os.path.join(ROOT, "note"), os.path.join(self.work, "note"))
+        os.chdir(self.work)
+        self.index = ArchiveIndex()
+        self.index.refresh()
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.work, ignore_errors=True)
+
+    def test_note_dated_after_the_last_build_is_listed_when_due(self):
+        # Manifest built on 2026-01-09, before SM-37 (01-11) and KR-738 (01-10) were due
+        jsonio.dump(self.index.manifest(today=date(2026, 1, 9)), "result_manifest.json")
+        jsonio.dump(self.index.history(), "history.json")
+        with contextlib.redirect_stdout(io.StringIO()):
+            uploads.process_manual_uploads(["SK-35-2026-01-09.json"], 1)
+        self.assertEqual(jsonio.load("result_manifest.json"), self.index.manifest())
+
+
+if __name__ == "__main__":
+    unittest.main()
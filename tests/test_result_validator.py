@@ -0,0 +1,30 @@
+import os
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import jsonio
+from result_validator import errors, strip_invalid, validate
+
+# SK-30 is drawn in the RN-RZ block, which has 11 series: 10 consolation winners
+NOTE = os.path.join(ROOT, "note", "SK-30-2025-12-05.json")
+
+
+class ResultValidatorTest(unittest.TestCase):
+    def setUp(self):
+        self.data, _ = strip_invalid(jsonio.load(NOTE))
+
+    def test_ten_consolation_winners_pass(self):
+        self.assertEqual(len(self.data["prizes"]["consolation_prize"]["winners"]), 10)
+        self.assertEqual(errors(validate(self.data)), [])
+
+    def test_count_still_checked(self):
+        prize = self.data["prizes"]["consolation_prize"]
+        data = dict(self.data, prizes=dict(self.data["prizes"], consolation_prize=dict(prize, winners=prize["winners"][:9])))
+        self.assertEqual([i["check"] for i in errors(validate(data))], ["count"])
+
+
+if __name__ == "__main__":
+    unittest.main()
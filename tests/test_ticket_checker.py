@@ -0,0 +1,34 @@
+import os
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from result_model import load_draw
+from ticket_checker import TicketChecker
+
+# 9th prize of KR-738 ends with prize amounts and years from below the list:
+# "..., 9972, 21600, 6480, 32400, 82080, 99360, 155520, 1967, 5000, 2026, 2025, ..."
+NOTE = os.path.join(ROOT, "note", "KR-738-2026-01-10.json")
+
+
+class TicketCheckerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.checker = TicketChecker()
+        cls.checker.add_draw("KR-738", "2026-01-10", load_draw(NOTE))
+
+    def test_page_text_is_not_a_winner(self):
+        for ticket in ("AB 112025", "AB 112026", "AB 115000", "AB 116480", "XY 155520", "AB 101967"):
+            self.assertEqual(self.checker.check(ticket), [], ticket)
+
+    def test_endings_still_win(self):
+        tier = load_draw(NOTE).tier("9th_prize")
+        first = next(iter(tier))
+        matches = self.checker.check("AB 99" + first.text)
+        self.assertEqual([m.prize_key for m in matches], ["9th_prize"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,215 @@
+"""Bulk-check sold tickets against the result archive.
+
+Usage:
+  python ticket_checker.py tickets.csv [--draw KR-738 ...] [--date 2026-01-10]
+                           [--from 2026-01-01] [--to 2026-01-31] [-o results.csv]
+
+The CSV holds one ticket per row ("PA 123456"), either as the first column or
+in a "ticket" column. Optional "draw" (KR-738) or "date" (YYYY-MM-DD) columns
+restrict a row to that draw.
+
+API:
+  checker = TicketChecker.from_notes(start="2026-01-01", end="2026-01-31")
+  checker.check("KM 649494")   # [Match(draw="KR-738", prize_key="1st_prize", ...)]
+
+The winners of every selected draw are indexed once, the way generate-history.js
+splits them into numbers6/numbers4: full series+number for the top tiers and the
+last four digits for the lower tiers. Each ticket then costs three dict lookups
+whatever the number of draws.
+"""
+import os
+import csv
+import sys
+import time
+import argparse
+
+from result_model import load_draw
+from draw_lookup import normalize_ticket
+from note_files import NOTE_DIR, NOTE_NAME_RE
+
+OUTPUT_FIELDS = ["ticket", "draw", "date", "prize_key", "label", "amount"]
+
+
+class Match:
+    __slots__ = ("draw", "date", "prize_key", "label", "amount", "winner")
+
+    def __init__(self, draw, date, prize_key, label, amount, winner):
+        self.draw = draw
+        self.date = date
+        self.prize_key = prize_key
+        self.label = label
+        self.amount = amount
+        self.winner = winner
+
+    def __repr__(self):
+        return f"Match(draw={self.draw!r}, prize_key={self.prize_key!r}, amount={self.amount!r})"
+
+
+def select_notes(note_dir=NOTE_DIR, draws=None, start=None, end=None):
+    """(draw, date, path) of the note files in the selection, oldest first.
+
+    draws is a set like {"KR-738"}; start/end are inclusive YYYY-MM-DD strings.
+    Files are picked by name so nothing outside the selection is read.
+    """
+    selected = []
+    for name in os.listdir(note_dir):
+        m = NOTE_NAME_RE.match(name)
+        if not m:
+            continue
+        draw, date = f"{m.group(1)}-{m.group(2)}", m.group(3)
+        if draws and draw not in draws:
+            continue
+        if (start and date < start) or (end and date > end):
+            continue
+        selected.append((date, draw, os.path.join(note_dir, name)))
+    selected.sort()
+    return [(draw, date, path) for date, draw, path in selected]
+
+
+class TicketChecker:
+    def __init__(self):
+        # "KM649494" -> [Match]: winners listed with their series
+        self.full = {}
+        # "649494" -> [Match]: six-digit winners listed without a series, any series wins
+        self.number6 = {}
+        # "0487" -> [Match]: lower tiers, matched on the last four digits
+        self.suffix4 = {}
+        self.draws = []
+
+    @classmethod
+    def from_notes(cls, note_dir=NOTE_DIR, draws=None, start=None, end=None):
+        checker = cls()
+        for draw, date, path in select_notes(note_dir, draws, start, end):
+            try:
+                result = load_draw(path)
+            except Exception as e:
+                print(f"Skipping {path}: {e}", file=sys.stderr)
+                continue
+            if result is not None:
+                checker.add_draw(draw, date, result)
+        return checker
+
+    def add_draw(self, draw, date, result):
+        """Index the winners of one draw (a result_model.Draw)."""
+        self.draws.append((draw, date))
+        for tier in result.tiers:
+            # Entries that are not winners (amounts, years, repeats; see PrizeTier.screen)
+            for w, reason in zip(tier, tier.screen()):
+                if reason is not None:
+                    continue
+                match = Match(draw, date, tier.key, tier.label, tier.amount, str(w))
+                if w.series:
+                    self.full.setdefault(w.series + w.text, []).append(match)
+                elif w.digits == 6:
+                    self.number6.setdefault(w.text, []).append(match)
+                else:
+                    self.suffix4.setdefault(w.text, []).append(match)
+
+    def check(self, ticket, draw=None, date=None):
+        """Winning prizes of a ticket, at most one per draw (the highest), in draw order.
+
+        Returns None if the ticket number cannot be read.
+        """
+        parsed = normalize_ticket(ticket)
+        if not parsed:
+            return None
+        series, number = parsed
+        hits = []
+        if len(number) == 6:
+            if series:
+                hits += self.full.get(series + number, ())
+            hits += self.number6.get(number, ())
+        hits += self.suffix4.get(number[-4:], ())
+
+        best = {}
+        for hit in hits:
+            if (draw and hit.draw != draw) or (date and hit.date != date):
+                continue
+            current = best.get(hit.draw)
+            if current is None or hit.amount > current.amount:
+                best[hit.draw] = hit
+        return sorted(best.values(), key=lambda h: (h.date, h.draw))
+
+    def check_rows(self, rows):
+        """Yield (ticket, [Match] or None) for each (ticket, draw, date) row."""
+        for ticket, draw, date in rows:
+            yield ticket, self.check(ticket, draw, date)
+
+
+def read_tickets(path):
+    """(ticket, draw, date) rows from a CSV with or without a header."""
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        first = next(reader, None)
+        if first is None:
+            return []
+        header = [c.strip().lower() for c in first]
+        if "ticket" not in header:
+            rows = [first] + list(reader)
+            return [(row[0].strip(), None, None) for row in rows if row and row[0].strip()]
+        tickets = []
+        for row in reader:
+            values = dict(zip(header, (c.strip() for c in row)))
+            if values.get("ticket"):
+                tickets.append((values["ticket"], values.get("draw", "").upper() or None, values.get("date") or None))
+        return tickets
+
+
+def write_report(results, out):
+    """One CSV row per winning (ticket, draw); non-winning tickets get an empty row. Returns totals."""
+    writer = csv.writer(out)
+    writer.writerow(OUTPUT_FIELDS)
+    checked = winning = invalid = 0
+    total = 0
+    for ticket, matches in results:
+        checked += 1
+        if matches is None:
+            invalid += 1
+            writer.writerow([ticket, "", "", "invalid", "", 0])
+        elif not matches:
+            writer.writerow([ticket, "", "", "", "", 0])
+        else:
+            winning += 1
+            for m in matches:
+                total += m.amount
+                writer.writerow([ticket, m.draw, m.date, m.prize_key, m.label, m.amount])
+    return checked, winning, invalid, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check a CSV of tickets against the result archive")
+    parser.add_argument("tickets", help="CSV file with one ticket per row")
+    parser.add_argument("--draw", nargs="+", help="draws to check against, e.g. KR-738")
+    parser.add_argument("--date", help="check against the draw(s) of this date (YYYY-MM-DD)")
+    parser.add_argument("--from", dest="start", help="first draw date (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="end", help="last draw date (YYYY-MM-DD)")
+    parser.add_argument("--note-dir", default=NOTE_DIR)
+    parser.add_argument("-o", "--output", help="write the report here instead of stdout")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    checker = TicketChecker.from_notes(args.note_dir, set(args.draw) if args.draw else None,
+                                       args.date or args.start, args.date or args.end)
+    indexed = time.perf_counter()
+    if not checker.draws:
+        print("No draws match the selection", file=sys.stderr)
+        return 1
+
+    tickets = read_tickets(args.tickets)
+    out = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    try:
+        checked, winning, invalid, total = write_report(checker.check_rows(tickets), out)
+    finally:
+        if args.output:
+            out.close()
+    done = time.perf_counter()
+
+    rate = checked / (done - indexed) if done > indexed else 0
+    print(f"Indexed {len(checker.draws)} draws in {indexed - start:.2f}s; checked {checked} tickets in "
+          f"{done - indexed:.2f}s ({rate:,.0f}/s): {winning} winning, {invalid} invalid, Rs {total:,} total",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+import os
+import json
+import time
+import uuid
+import threading
+from contextlib import contextmanager
+
+from metrics import STAGE_SECONDS, FETCHES, FETCH_BYTES, PARSE_FAILURES
+
+# Set LOTTERY_TRACE=1 to append spans to TRACE_FILE as JSON lines. Once the file
+# reaches TRACE_MAX_BYTES it is moved to TRACE_FILE + ".1" (replacing the previous
+# one) and a new file is started, so at most twice that is kept
+TRACE_FILE = os.environ.get("LOTTERY_TRACE_FILE", "trace.jsonl")
+TRACE_ENABLED = os.environ.get("LOTTERY_TRACE", "0") not in ("", "0")
+TRACE_MAX_BYTES = int(os.environ.get("LOTTERY_TRACE_MAX_BYTES", 10 * 1024 * 1024))
+
+# Set to "cprofile" or "pyinstrument" to dump a profile of each entry point run
+PROFILE_MODE = os.environ.get("LOTTERY_PROFILE", "").lower()
+
+# Subprocesses inherit LOTTERY_RUN_ID so their spans group with the process that launched them
+RUN_ID = os.environ.setdefault("LOTTERY_RUN_ID", uuid.uuid4().hex[:12])
+
+# Spans whose errors count as parse failures
+PARSE_SPANS = ("parse", "process_result_page")
+
+_local = threading.local()
+_write_lock = threading.Lock()
+
+
+class Span:
+    def __init__(self, name, attrs):
+        self.name = name
+        self.attrs = dict(attrs)
+        self.id = uuid.uuid4().hex[:8]
+
+    def set(self, key, value):
+        self.attrs[key] = value
+
+    def add(self, key, amount=1):
+        self.attrs[key] = self.attrs.get(key, 0) + amount
+
+
+def _stack():
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+def _write(record):
+    line = json.dumps(record, ensure_ascii=False, default=str)
+    with _write_lock:
+        try:
+            if os.path.getsize(TRACE_FILE) >= TRACE_MAX_BYTES:
+                os.replace(TRACE_FILE, TRACE_FILE + ".1")
+        except OSError:
+            pass
+        with open(TRACE_FILE, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def _record_metrics(name, duration, attrs):
+    STAGE_SECONDS.observe(duration, stage=name)
+    if name == "fetch":
+        FETCHES.inc(status=attrs.get("status", "error"))
+        FETCH_BYTES.inc(attrs.get("bytes", 0))
+    elif name in PARSE_SPANS and "error" in attrs:
+        PARSE_FAILURES.inc()
+
+
+@contextmanager
+def span(name, **attrs):
+    """Time a pipeline stage. Attributes (bytes, counts, ...) can be added via the yielded Span."""
+    s = Span(name, attrs)
+    stack = _stack()
+    parent = stack[-1].id if stack else None
+    stack.append(s)
+    started = time.time()
+    start = time.perf_counter()
+    try:
+        yield s
+    except BaseException as e:
+        s.set("error", f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        duration = time.perf_counter() - start
+        stack.pop()
+        _record_metrics(name, duration, s.attrs)
+        if TRACE_ENABLED:
+            record = {
+                "run": RUN_ID,
+                "span": name,
+                "id": s.id,
+                "parent": parent,
+                "start": round(started, 3),
+                "duration_ms": round(duration * 1000, 3),
+            }
+            record.update(s.attrs)
+            try:
+                _write(record)
+            except OSError:
+                pass
+
+
+@contextmanager
+def profiled(name):
+    """Run the wrapped block under cProfile or pyinstrument when LOTTERY_PROFILE is set."""
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    if PROFILE_MODE == "cprofile":
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            path = f"profile-{name}-{stamp}.prof"
+            profiler.dump_stats(path)
+            print(f"Profile written to {path}")
+    elif PROFILE_MODE == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            print("pyinstrument is not installed; running without profiling")
+            yield
+            return
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            path = f"profile-{name}-{stamp}.html"
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(profiler.output_html())
+            print(f"Profile written to {path}")
+    else:
+        yield
+
+
+def summarize(path=TRACE_FILE, run=None):
+    """Total duration, bytes and count per span name for one run (the last one by default)."""
+    records = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    if not records:
+        return {}
+    run = run or records[-1]["run"]
+    totals = {}
+    for r in records:
+        if r.get("run") != run:
+            continue
+        t = totals.setdefault(r["span"], {"count": 0, "duration_ms": 0.0, "bytes": 0})
+        t["count"] += 1
+        t["duration_ms"] += r.get("duration_ms", 0)
+        t["bytes"] += r.get("bytes", 0) or 0
+    return totals
+
+
+if __name__ == "__main__":
+    import sys
+    totals = summarize(run=sys.argv[1] if len(sys.argv) > 1 else None)
+    for name, t in sorted(totals.items(), key=lambda kv: -kv[1]["duration_ms"]):
+        print(f"{name:28} {t['count']:5d} x {t['duration_ms']:10.1f} ms {t['bytes']:12d} bytes")
@@ -1,14 +1,20 @@
-import requests
 import re
 import os
 import json
 from datetime import datetime, date
 import time
-from bs4 import BeautifulSoup
-import urllib3
 import random
 
-urllib3.disable_warnings()
+from result_merge import write_merged
+from result_validator import validate_or_retry
+from tracing import span, profiled
+from metrics import PARSE_FAILURES, write_on_exit
+from result_metadata import extract_title_metadata, DATE_RE, SERIES_NUMBER_RE, PLAIN_NUMBER_RE, NON_ALNUM_RE
+from draw_calendar import expected_draws
+import snapshots
+
+# requests, bs4 and cloudscraper are imported where they are used: reparse.py and the
+# other offline callers of scrape_lottery_result never touch the network
 
 # Configuration
 HEADERS = {
@@ -18,17 +24,38 @@ CACHE_DIR = "cache"
 NOTE_DIR = "note"
 MAIN_URL = "https://www.kllotteryresult.com/"
 
+# HTTP client for this run, created on the first fetch (see http_client)
+_client = None
+
+def http_client():
+    """A cloudscraper scraper (better for bypassing blocks) when it is installed,
+    otherwise a requests session without certificate checks. Created once per run."""
+    global _client
+    if _client is None:
+        try:
+            import cloudscraper
+            _client = cloudscraper.create_scraper()
+        except ImportError:
+            import requests
+            import urllib3
+            urllib3.disable_warnings()
+            _client = requests.Session()
+            _client.verify = False
+    return _client
+
 def robust_get(url: str, headers: dict, timeout: int = 20, max_retries: int = 3):
+    with span("fetch", url=url) as s:
+        res = _robust_get(url, headers, timeout, max_retries, s)
+        s.set("status", res.status_code)
+        s.set("bytes", len(res.content))
+        return res
+
+def _robust_get(url, headers, timeout, max_retries, s):
     last_exc = None
-    
-    # Try using cloudscraper first (better for bypassing blocks)
-    try:
-        import cloudscraper
-        scraper = cloudscraper.create_scraper()
-    except ImportError:
-        scraper = None
+    client = http_client()
 
     for attempt in range(1, max_retries + 1):
+        s.set("attempts", attempt)
         try:
              # Random UA
             current_headers = headers.copy()
@@ -37,10 +64,7 @@ def robust_get(url: str, headers: dict, timeout: int = 20, max_retries: int = 3)
                 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
             ])
             
-            if scraper:
-                res = scraper.get(url, headers=current_headers, timeout=timeout)
-            else:
-                res = requests.get(url, headers=current_headers, timeout=timeout, verify=False)
+            res = client.get(url, headers=current_headers, timeout=timeout)
                 
             if res.status_code == 200:
                 return res
@@ -56,11 +80,13 @@ def robust_get(url: str, headers: dict, timeout: int = 20, max_retries: int = 3)
 def fetch_page_text(url: str) -> str:
     print(f"Fetching {url}...")
     res = robust_get(url, HEADERS)
+    # Keep the raw page so reparse.py can rebuild note/ without fetching again
+    snapshots.store(url, res.text, "text")
     return res.text
 
 def parse_date_from_text(text: str):
     # 16.12.2025 or 16-12-2025
-    m = re.search(r"(\d{2})[./-](\d{2})[./-](\d{4})", text)
+    m = DATE_RE.search(text)
     if m:
         try:
             return datetime.strptime(f"{m.group(3)}-{m.group(2)}-{m.group(1)}", "%Y-%m-%d").date()
@@ -68,6 +94,17 @@ def parse_date_from_text(text: str):
     return None
 
 def scrape_lottery_result(url, html):
+    with span("parse", url=url, bytes=len(html)) as s:
+        data = _scrape_lottery_result(url, html)
+        if data:
+            s.set("tiers", len(data["prizes"]))
+            s.set("winners", sum(len(p["winners"]) for p in data["prizes"].values()))
+        else:
+            PARSE_FAILURES.inc()
+        return data
+
+def _scrape_lottery_result(url, html):
+    from bs4 import BeautifulSoup
     soup = BeautifulSoup(html, 'html.parser')
     
     # 1. Metadata
@@ -75,11 +112,6 @@ def scrape_lottery_result(url, html):
     if soup.title:
         title_text = soup.title.string.strip()
     
-    # Try getting title from h1 if not suitable in title tag
-    h1 = soup.find("h1")
-    if h1 and "lottery result" not in h1.text.lower():
-        pass 
-    
     # Date
     result_date = parse_date_from_text(title_text)
     if not result_date:
@@ -93,36 +125,10 @@ def scrape_lottery_result(url, html):
     
     # Parse Name and Draw Number
     # Pattern: "Kerala Lottery Result ... Sthree Sakthi (SS-498)"
-    lottery_name = "Unknown Lottery"
-    draw_number = "XX"
-    code = "XX"
-    
-    # Extract Draw Code/Number e.g. (SS-498)
-    m_draw = re.search(r"\(([A-Z]+)-(\d+)\)", title_text)
-    if m_draw:
-        code = m_draw.group(1)
-        draw_number = f"{code}-{m_draw.group(2)}"
-    
-    # Extract Name: "Sthree Sakthi (SS-498)"
-    # Fallback: Remove known prefixes
-    clean_title = title_text
-    clean_title = re.sub(r'Kerala Lottery Result Today', '', clean_title, flags=re.IGNORECASE)
-    clean_title = re.sub(r'\d+[./-]\d+[./-]\d+', '', clean_title) # Remove date
-    clean_title = re.sub(r'\([^\)]+\)', '', clean_title) # Remove (SS-498)
-    clean_title = clean_title.replace('|', '').replace('-', '').strip()
-    
-    if clean_title:
-        lottery_name = clean_title.upper()
-    
-    if lottery_name == "UNKNOWN LOTTERY" or len(lottery_name) < 3:
-        # Try map from code
-        code_map = {
-             'SS': 'STHREE SAKTHI', 'DL': 'DHANALEKSHMI', 'AK': 'AKSHAYA', 
-             'KR': 'KARUNYA', 'KN': 'KARUNYA PLUS', 'NR': 'NIRMAL', 'FF': 'FIFTY FIFTY',
-             'SK': 'SUVARNA KERALAM', 'BT': 'BHAGYATHARA', 'SM': 'SAMRUDHI'
-        }
-        if code in code_map:
-            lottery_name = code_map[code]
+    meta = extract_title_metadata(title_text)
+    code = meta["code"]
+    draw_number = meta["draw_number"]
+    lottery_name = meta["lottery_name"]
     
     # 2. Prizes keys
     prizes = {}
@@ -160,7 +166,7 @@ def scrape_lottery_result(url, html):
         if current_key:
             valid = []
             for w in current_winners:
-                w_clean = re.sub(r'[^A-Z0-9]', '', w.upper())
+                w_clean = NON_ALNUM_RE.sub('', w.upper())
                 if len(w_clean) >= 4:
                     valid.append(w)
             
@@ -205,7 +211,7 @@ def scrape_lottery_result(url, html):
             
             # Pattern 1: Series + Digits (e.g. WA 123456, WA-123456, WA123456)
             # Allowing 1-3 letters, optional separator, 6 digits.
-            series_matches = list(re.finditer(r'\b([A-Z]{1,3})[\s-]?(\d{6})\b', line, re.IGNORECASE))
+            series_matches = list(SERIES_NUMBER_RE.finditer(line))
             
             # We also need to capture plain numbers (4 digits, 6 digits) that are NOT part of the above.
             # So, we can replace the found series_matches in the line with spaces, then look for remaining numbers?
@@ -220,7 +226,7 @@ def scrape_lottery_result(url, html):
             else:
                 # Fallback: look for simple numbers (4 to 6 digits)
                 # This covers lower prizes which often don't have series
-                nums = re.findall(r'\b\d{4,6}\b', line)
+                nums = PLAIN_NUMBER_RE.findall(line)
                 for n in nums:
                     current_winners.append(n)
 
@@ -230,7 +236,7 @@ def scrape_lottery_result(url, html):
     # Filename
     # If SS-498 exists, fine.
     # We use code-num-date format
-    num_part = m_draw.group(2) if m_draw else 'XX'
+    num_part = meta["number"] or 'XX'
     filename = f"{code}-{num_part}-{str_date}.json"
 
     return {
@@ -246,6 +252,7 @@ def scrape_lottery_result(url, html):
 
 def get_last_n_result_links(n=15):
     text = fetch_page_text(MAIN_URL)
+    from bs4 import BeautifulSoup
     soup = BeautifulSoup(text, 'html.parser')
     links = set()
     
@@ -260,25 +267,35 @@ def get_last_n_result_links(n=15):
 
 def main():
     os.makedirs(NOTE_DIR, exist_ok=True)
+    today = date.today()
+    # Today's expected draws go first, straight to their result pages: the home
+    # page may not link them yet
+    expected = [MAIN_URL.rstrip('/') + d.path for d in expected_draws(today)]
     links = get_last_n_result_links()
     print(f"Found {len(links)} links")
-    
-    today = date.today()
+    links = expected + [l for l in links if l not in expected]
     
     for url in links:
         try:
             print(f"Processing {url}")
             text = fetch_page_text(url)
             data = scrape_lottery_result(url, text)
+            if data:
+                # Check the parse before it can be published; a bad page is fetched once more
+                data, _ = validate_or_retry(data, lambda: scrape_lottery_result(url, fetch_page_text(url)))
             
             if data:
                 fpath = os.path.join(NOTE_DIR, data['filename'])
-                with open(fpath, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=2)
-                print(f"Saved {fpath}")
+                changed = write_merged(fpath, data)
+                if changed:
+                    print(f"Saved {fpath} (changed: {', '.join(changed)})")
+                else:
+                    print(f"Unchanged {fpath}")
                 
         except Exception as e:
             print(f"Error processing {url}: {e}")
 
 if __name__ == "__main__":
-    main()
+    write_on_exit()
+    with profiled("updateloto"):
+        main()